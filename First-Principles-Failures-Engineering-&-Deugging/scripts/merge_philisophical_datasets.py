@@ -1,5 +1,13 @@
 # scripts/merge_philosophy_datasets.py
 
+import sys
+import json
+from pathlib import Path
+
+# near_dedup lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from near_dedup import NearDuplicateFilter
+
 def philosophical_quality_check(example):
     """Stricter than technical examples"""
     score = 0
@@ -43,13 +51,22 @@ def merge_philosophy_datasets(sources):
             all_examples.extend(quality_sorted[:keep_count])
     
     # Deduplicate by similar thinking patterns
-    unique_examples = deduplicate_by_reasoning(all_examples)
+    unique_examples, _ = deduplicate_by_reasoning(all_examples)
     
     return unique_examples
 
 def deduplicate_by_reasoning(examples):
-    """Remove examples with similar philosophical arguments"""
-    # Use embedding similarity on <think> blocks
-    # Keep only one example per philosophical pattern
-    # Implementation left as exercise (use sentence transformers)
-    pass
+    """Remove examples with similar philosophical arguments
+
+    Returns the kept examples and the mapping of each dropped example's
+    index in examples to the index of the example kept for its cluster.
+    """
+    # MinHash + LSH over <think> block shingles (CPU only, sub-quadratic)
+    # Keep only one example per philosophical pattern: the first, i.e. the
+    # best after the quality sort above
+    dedup = NearDuplicateFilter()
+    unique_examples = [ex for ex in examples if dedup.add(ex["text"])]
+
+    print(f"Dropped {len(dedup.kept_for)} near-duplicates in {len(dedup.clusters())} clusters")
+
+    return unique_examples, dedup.kept_for
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Async Ingest - Concurrent read-ahead of source files for the extractors
+An asyncio loop on a background thread keeps up to N file reads in flight
+ahead of the consumer, so NFS / network latency overlaps with extraction.
+Files are handed over in input order, and a byte budget caps how much
+read-but-unprocessed text is held in memory at once
+"""
+
+import time
+import queue
+import asyncio
+import argparse
+import threading
+from collections import deque
+from pathlib import Path
+from concurrent.futures import Future
+
+DEFAULT_READ_CONCURRENCY = 16
+DEFAULT_MAX_IN_FLIGHT_BYTES = 64 * 1024 * 1024
+
+class _ByteBudget:
+    """Bytes reserved by files read ahead and not yet consumed
+
+    A file larger than the whole budget is still admitted once nothing
+    else is in flight, so it can't stall the reader forever.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    async def acquire(self, size: int):
+        while self.used and self.used + size > self.limit and not self.closed:
+            self._changed.clear()
+            await self._changed.wait()
+        self.used += size
+
+    def release(self, size: int):
+        self.used -= size
+        self._changed.set()
+
+    def close(self):
+        """Stop waiting for bytes (the consumer has gone away)"""
+        self.closed = True
+        self._changed.set()
+
+class AsyncFileReader:
+    """Reads files ahead of a synchronous consumer on an asyncio loop
+
+    latency adds an artificial delay before every read, to simulate a
+    networked store when testing on a local directory.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_READ_CONCURRENCY,
+                 max_in_flight_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES,
+                 latency: float = 0.0):
+        self.concurrency = max(1, concurrency)
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self.latency = latency
+        self.peak_in_flight_bytes = 0
+
+    def _read(self, path: Path) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        # Same decoding (and newline translation) as Path.read_text
+        return path.read_text(encoding='utf-8', errors='ignore')
+
+    def _stat(self, path: Path) -> int:
+        if self.latency:
+            time.sleep(self.latency)
+        return path.stat().st_size
+
+    async def _pump(self, paths: list, handoff: queue.Queue, budget: _ByteBudget,
+                    stop: threading.Event):
+        """Start reads in input order while the concurrency and byte budgets allow"""
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def read(path, future):
+            try:
+                future.set_result(await asyncio.to_thread(self._read, path))
+            except BaseException as exc:
+                future.set_exception(exc)
+            finally:
+                slots.release()
+
+        # Sizes are looked up a window ahead, since a stat costs a round trip too
+        remaining = iter(paths)
+        sizes = deque()
+
+        def stat_ahead():
+            for path in remaining:
+                sizes.append((path, asyncio.ensure_future(asyncio.to_thread(self._stat, path))))
+                if len(sizes) >= self.concurrency:
+                    break
+
+        tasks = set()
+        stat_ahead()
+        while sizes and not stop.is_set():
+            path, stat = sizes.popleft()
+            stat_ahead()
+            try:
+                size = await stat
+            except OSError:
+                size = 0        # The read reports the error
+            await budget.acquire(size)
+            await slots.acquire()
+            self.peak_in_flight_bytes = max(self.peak_in_flight_bytes, budget.used)
+            future = Future()
+            task = asyncio.ensure_future(read(path, future))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            handoff.put((path, size, future))
+        await asyncio.gather(*tasks, *(stat for _, stat in sizes), return_exceptions=True)
+        handoff.put(None)
+
+    def read_all(self, paths, manual_release: bool = False):
+        """Yield (path, content) for every path, in order, reading ahead concurrently
+
+        A file's bytes stay reserved until the next one is requested, so
+        the budget also covers the file being processed. With
+        manual_release, (path, content, release) is yielded instead and the
+        bytes stay reserved until release() is called, from any thread: for
+        content processed after the consumer moves on, e.g. in a process
+        pool, release can be a future's done callback.
+        """
+        paths = list(paths)
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="async-ingest", daemon=True)
+        thread.start()
+        handoff = queue.Queue()
+        stop = threading.Event()
+        budget = asyncio.run_coroutine_threadsafe(self._make_budget(), loop).result()
+        pump = asyncio.run_coroutine_threadsafe(self._pump(paths, handoff, budget, stop), loop)
+        held = 0
+        try:
+            while True:
+                # The previous file is done with once the next one is requested
+                loop.call_soon_threadsafe(budget.release, held)
+                held = 0
+                item = handoff.get()
+                if item is None:
+                    break
+                path, size, future = item
+                if manual_release:
+                    yield path, future.result(), self._releaser(loop, budget, size)
+                else:
+                    held = size
+                    yield path, future.result()
+        finally:
+            # Consumer stopped early (or raised): let the pump finish quietly
+            stop.set()
+            loop.call_soon_threadsafe(budget.close)
+            while not pump.done():
+                try:
+                    handoff.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    @staticmethod
+    def _releaser(loop, budget: _ByteBudget, size: int):
+        """release() for one file's bytes: thread-safe, idempotent, a no-op once reading is over"""
+        lock = threading.Lock()
+
+        def release(*_):
+            nonlocal size
+            with lock:
+                released, size = size, 0
+            if released:
+                try:
+                    loop.call_soon_threadsafe(budget.release, released)
+                except RuntimeError:    # Loop already closed
+                    pass
+        return release
+
+    async def _make_budget(self) -> _ByteBudget:
+        return _ByteBudget(self.max_in_flight_bytes)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('directory', type=Path,
+                            help="Directory whose *.md files are read (recursively)")
+    arg_parser.add_argument('--concurrency', type=int, default=DEFAULT_READ_CONCURRENCY,
+                            help=f"Reads in flight at once (default: {DEFAULT_READ_CONCURRENCY})")
+    arg_parser.add_argument('--max-in-flight-bytes', type=int, default=DEFAULT_MAX_IN_FLIGHT_BYTES,
+                            help=f"Byte budget of files read ahead (default: {DEFAULT_MAX_IN_FLIGHT_BYTES})")
+    arg_parser.add_argument('--latency', type=float, default=0.0,
+                            help="Artificial seconds of latency per stat and read, to simulate a network store")
+    args = arg_parser.parse_args()
+
+    paths = sorted(args.directory.rglob("*.md"))
+    serial = AsyncFileReader(concurrency=1, latency=args.latency)
+    start = time.perf_counter()
+    expected = []
+    for path in paths:
+        serial._stat(path)
+        expected.append(serial._read(path))
+    serial_seconds = time.perf_counter() - start
+
+    reader = AsyncFileReader(args.concurrency, args.max_in_flight_bytes, args.latency)
+    start = time.perf_counter()
+    contents = [content for _, content in reader.read_all(paths)]
+    async_seconds = time.perf_counter() - start
+
+    status = "✅" if contents == expected else "❌"
+    print(f"{status} {len(paths)} files, {sum(map(len, contents))} chars")
+    print(f"  Sequential reads: {serial_seconds:8.3f}s")
+    print(f"  Async read-ahead: {async_seconds:8.3f}s "
+          f"(concurrency {reader.concurrency}, peak {reader.peak_in_flight_bytes} bytes in flight)")
+
+if __name__ == "__main__":
+    main()
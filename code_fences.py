@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Code Fences - Linear-time scanners for code review examples in markdown
+Code fences are located first, then the ❌/✅ markers and Violates/Respects
+labels after them are paired with forward-only searches. Each step takes the
+first occurrence after the previous one, and once a step finds nothing no
+later fence can succeed either, so a file full of code without review markers
+costs one pass instead of a backtracking regex
+"""
+
+import patterns
+
+PYTHON_FENCE = '```python\n'
+FENCE = '```'
+
+def find_code_reviews(content: str) -> list:
+    """(bad_code, violation, good_code, principle) for each python fence pair
+
+    Same matches as CP_CODE_REVIEW.findall(content): a ```python block, a ❌
+    marker and Violates label, a second ```python block, then a ✅ marker and
+    Respects label whose text runs to the end of its line.
+    """
+    reviews = []
+    pos = 0
+    while True:
+        # Bad code block
+        bad_fence = content.find(PYTHON_FENCE, pos)
+        if bad_fence == -1:
+            break
+        bad_start = bad_fence + len(PYTHON_FENCE)
+        bad_end = content.find(FENCE, bad_start)
+        if bad_end == -1:
+            break
+
+        # ❌ marker, then the violation text up to the end of its line (or
+        # up to the good fence, if that comes first on the same line)
+        cross = content.find('❌', bad_end + len(FENCE))
+        if cross == -1:
+            break
+        violates = patterns.CR_VIOLATES_LABEL.search(content, cross + 1)
+        if not violates:
+            break
+        good_fence = content.find(PYTHON_FENCE, violates.end())
+        if good_fence == -1:
+            break
+        violation_end = content.find('\n', violates.end(), good_fence)
+        if violation_end == -1:
+            violation_end = good_fence
+
+        # Good code block
+        good_start = good_fence + len(PYTHON_FENCE)
+        good_end = content.find(FENCE, good_start)
+        if good_end == -1:
+            break
+
+        # ✅ marker, then the principle text up to the end of its line
+        check = content.find('✅', good_end + len(FENCE))
+        if check == -1:
+            break
+        respects = patterns.CR_RESPECTS_LABEL.search(content, check + 1)
+        if not respects:
+            break
+        principle_end = content.find('\n', respects.end())
+        if principle_end == -1:
+            principle_end = pos = len(content)
+        else:
+            pos = principle_end + 1
+
+        reviews.append((
+            content[bad_start:bad_end],
+            content[violates.end():violation_end],
+            content[good_start:good_end],
+            content[respects.end():principle_end],
+        ))
+
+    return reviews
+
+def _after_comment_candidates(content: str, start: int) -> list:
+    """(violation_end, after_match) choices for the text between Violates and # AFTER
+
+    The violation runs to the first newline that is followed by a comment
+    line, as long as a separate # AFTER comment comes later, otherwise up to
+    the first # AFTER itself. Candidates are in the order the reference
+    pattern tries them; they only differ when that newline sits right
+    before the first # AFTER.
+    """
+    after = patterns.CR_AFTER_COMMENT.search(content, start)
+    if not after:
+        return []
+
+    comment_line = content.find('\n#', start, after.start() + 1)
+    if comment_line == -1:
+        return [(after.start(), after)]
+    if comment_line + 2 <= after.start():
+        return [(comment_line, after)]
+
+    # The first # AFTER is that comment line; prefer a later one if present
+    candidates = []
+    later_after = patterns.CR_AFTER_COMMENT.search(content, comment_line + 2)
+    if later_after:
+        candidates.append((comment_line, later_after))
+    candidates.append((after.start(), after))
+    return candidates
+
+def _principle_span(content: str, respects) -> tuple:
+    """(start, end) of the Respects text, ending at the closing fence, or None"""
+    close = content.find('\n' + FENCE, respects.end())
+    if close != -1:
+        return respects.end(), close
+
+    # The label's trailing whitespace may already have reached the closing
+    # fence; the text is then empty and ends at that whitespace's newline
+    close = respects.end() - 1
+    if close >= respects.start(1) and content[close] == '\n' and \
+       content.startswith(FENCE, respects.end()):
+        return close, close
+    return None
+
+def find_inline_code_reviews(content: str) -> list:
+    """(lang, title, bad_code, violation, good_code, principle) per review fence
+
+    Same matches as MP_INLINE_CODE_REVIEW.findall(content): a ```lang fence
+    opening with a "# N. title" comment, then # BEFORE code up to a # ❌
+    marker and Violates label, # AFTER code up to a # ✅ marker and Respects
+    label, closed by the fence.
+    """
+    reviews = []
+    pos = 0
+    while True:
+        header = patterns.CR_NUMBERED_FENCE.search(content, pos)
+        if not header:
+            break
+        title_end = content.find('\n', header.end())
+        if title_end == -1:
+            break
+
+        # BEFORE block up to the ❌ marker
+        before = patterns.CR_BEFORE_COMMENT.search(content, title_end + 1)
+        if not before:
+            break
+        bad_marker = patterns.CR_BAD_MARKER.search(content, before.end())
+        if not bad_marker:
+            break
+        violates = patterns.CR_STRICT_VIOLATES_LABEL.search(content, bad_marker.end())
+        if not violates:
+            break
+
+        # AFTER block up to the ✅ marker, then the Respects text up to the fence
+        review = None
+        for violation_end, after in _after_comment_candidates(content, violates.end()):
+            good_marker = patterns.CR_GOOD_MARKER.search(content, after.end())
+            if not good_marker:
+                continue
+            respects = patterns.CR_STRICT_RESPECTS_LABEL.search(content, good_marker.end())
+            if not respects:
+                continue
+            principle = _principle_span(content, respects)
+            if principle is None:
+                continue
+
+            review = (
+                header.group(1),
+                content[header.start(2):title_end],
+                content[before.end():bad_marker.start()],
+                content[violates.end():violation_end],
+                content[after.end():good_marker.start()],
+                content[principle[0]:principle[1]],
+            )
+            pos = principle[1] + len('\n' + FENCE)
+            break
+
+        if review is None:
+            break
+        reviews.append(review)
+
+    return reviews
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Columnar Export - Typed Arrow IPC / Parquet copy of the curated examples
+text, source, category and quality_score become typed columns (source and
+category dictionary-encoded), written in row groups as examples stream in.
+Parquet keeps per-row-group min/max statistics, so metadata filters skip
+groups and never read the text column; an Arrow IPC file can instead be
+memory-mapped and read zero-copy. Requires pyarrow
+"""
+
+import os
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Rows buffered before a row group (Parquet) / record batch (Arrow) is written
+DEFAULT_ROW_GROUP_SIZE = 10000
+
+# Extension per format
+COLUMNAR_FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+COLUMNS = ('text', 'source', 'category', 'quality_score')
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("columnar export needs the pyarrow package (pip install pyarrow)")
+
+def require_columnar(columnar: str):
+    """Raise ImportError now if a columnar format was requested without pyarrow"""
+    if columnar:
+        _require_pyarrow()
+
+def example_schema():
+    """Arrow schema of the exported examples"""
+    _require_pyarrow()
+    return pa.schema([
+        ('text', pa.large_string()),
+        ('source', pa.dictionary(pa.int32(), pa.string())),
+        ('category', pa.dictionary(pa.int32(), pa.string())),
+        ('quality_score', pa.int8()),
+    ])
+
+class ColumnarWriter:
+    """Streams examples into an Arrow IPC (.arrow) or Parquet (.parquet) file
+
+    The file is written under a temp name and renamed into place when the
+    writer closes cleanly, like the atomic JSONL outputs.
+    """
+
+    def __init__(self, path: Path, row_group_size: int = DEFAULT_ROW_GROUP_SIZE):
+        self.schema = example_schema()
+        self.path = Path(path)
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._columns = {name: [] for name in COLUMNS}
+
+        self.temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        self.parquet = self.path.suffix == COLUMNAR_FORMATS['parquet']
+        if self.parquet:
+            self._writer = pq.ParquetWriter(self.temp_path, self.schema, compression='zstd',
+                                            use_dictionary=['source', 'category'],
+                                            write_statistics=True)
+        elif self.path.suffix == COLUMNAR_FORMATS['arrow']:
+            self._sink = pa.OSFile(str(self.temp_path), 'wb')
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+        else:
+            raise ValueError(f"{self.path} is neither .arrow nor .parquet")
+
+    def write(self, example: dict):
+        """Buffer one example, flushing a row group when the buffer is full"""
+        for name in COLUMNS:
+            self._columns[name].append(example[name])
+        if len(self._columns['text']) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._columns['text']:
+            return
+        batch = pa.record_batch([pa.array(self._columns[name], type=field.type)
+                                 for name, field in zip(COLUMNS, self.schema)],
+                                schema=self.schema)
+        if self.parquet:
+            self._writer.write_batch(batch, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+        self._columns = {name: [] for name in COLUMNS}
+
+    def close(self, commit: bool = True):
+        """Write the last row group and move the file into place (or discard it)"""
+        try:
+            if commit:
+                self._flush()
+        finally:
+            self._writer.close()
+            if not self.parquet:
+                self._sink.close()
+        if commit:
+            os.replace(self.temp_path, self.path)
+        else:
+            self.temp_path.unlink(missing_ok=True)
+
+    def summary(self) -> str:
+        """One-line export report"""
+        return f"🗃️  Columnar export: {self.rows} rows -> {self.path}"
+
+def read_examples(path: Path, columns: list = None, filters=None):
+    """Read an exported file as a pyarrow Table
+
+    Parquet applies filters (e.g. [('quality_score', '>=', 8)]) against the
+    row-group statistics and only reads the requested columns. Arrow IPC is
+    memory-mapped, so the returned columns are zero-copy views of the file.
+    """
+    _require_pyarrow()
+    path = Path(path)
+    if path.suffix == COLUMNAR_FORMATS['parquet']:
+        return pq.read_table(path, columns=columns, filters=filters)
+
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+    if filters:
+        table = table.filter(pq.filters_to_expression(filters))
+    return table.select(columns) if columns else table
@@ -1,90 +1,194 @@
 #!/usr/bin/env python3
 """
 Comprehensive Parser - Extracts and converts ALL content types to training format
-Handles: pre-formatted conversations, technical mappings, code reviews, raw principles
+Handles: pre-formatted conversations, technical mappings, code reviews, raw principles,
+messages-format JSON chats
 """
 
 import os
 import json
-import re
+import bisect
+import signal
+import argparse
+import threading
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import Future, ProcessPoolExecutor
+from extraction_cache import ExtractionCache
+from dataset_outputs import DatasetOutputs, add_output_arguments, output_options
+from json_stream import iter_json_values
+from near_dedup import NearDuplicateFilter, DEFAULT_THRESHOLD
+from stage_profiler import EventStream, StageProfiler
+from async_ingest import AsyncFileReader, DEFAULT_MAX_IN_FLIGHT_BYTES
+from file_discovery import discover, ENGINEERING_DIR, PHILOSOPHY_DIR
+import patterns
+import code_fences
+import markdown_blocks
+
+# Seconds a single file may spend in extraction before it is skipped
+DEFAULT_FILE_TIMEOUT = 60.0
+
+# Per-process parser instance used by the extraction pool
+_worker_parser = None
+
+class ExtractionTimeout(Exception):
+    """A file's extraction ran past the per-file time budget"""
+
+@contextmanager
+def time_budget(seconds: float):
+    """Raise ExtractionTimeout inside the block once it has run for seconds
+
+    Uses SIGALRM, which also interrupts a long-running regex, so it only
+    applies on the main thread of platforms that have it (pool workers run
+    extraction on their main thread). Elsewhere the block runs unbounded.
+    """
+    if not seconds or not hasattr(signal, 'setitimer') or \
+       threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expired(signum, frame):
+        raise ExtractionTimeout(f"exceeded {seconds:g}s extraction budget")
+
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def _init_worker(parser_cls, base_dir: str, file_timeout: float, profile: bool = False):
+    """Build one parser per pool process so it isn't pickled for every file"""
+    global _worker_parser
+    _worker_parser = parser_cls(base_dir, file_timeout=file_timeout, profile=profile)
+
+def _extract_in_worker(filepath: Path, content: str = None):
+    """Pool entry point: extract a single file in the worker process
+
+    Returns (result, stages), stages being the worker's per-stage timings
+    for this file when profiling (else None), for the parent to merge.
+    """
+    result = _worker_parser.extract_file(filepath, content)
+    profiler = _worker_parser.profiler
+    return result, profiler.take_stages() if profiler else None
 
 class ComprehensiveParser:
-    def __init__(self, base_dir: str):
+    # Methods timed as stages under --profile
+    PROFILED_STAGES = ('read_file', 'extract_cached', 'extract_file', 'run_extractors',
+                       'extract_pre_formatted_conversations', 'extract_dialogue_sections',
+                       'extract_code_reviews', 'extract_numbered_principles',
+                       'determine_category', 'calculate_quality_score')
+
+    # file_discovery groups read by this parser
+    SOURCE_GROUPS = ('engineering', 'philosophy_curated', 'messages')
+
+    def __init__(self, base_dir: str, workers: int = 1, cache_dir: str = None,
+                 file_timeout: float = DEFAULT_FILE_TIMEOUT, dedup_threshold: float = None,
+                 profile: bool = False, profile_dump: str = None,
+                 read_concurrency: int = None,
+                 max_in_flight_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES,
+                 manifest: str = None, **output_options):
         self.base_dir = Path(base_dir)
         self.examples = []
+        self.workers = workers
+        self.cache = ExtractionCache(cache_dir, type(self)) if cache_dir else None
+        self.file_timeout = file_timeout
+        self.dedup_threshold = dedup_threshold  # None disables near-duplicate removal
+        # Exact-repeat filter, shards, compression, columnar copy and offset
+        # indexes of the outputs; fails here if one needs a missing package
+        self.outputs = DatasetOutputs(**output_options)
+        # Concurrent read-ahead of source files (None reads each file when it is extracted)
+        self.read_concurrency = read_concurrency
+        self.max_in_flight_bytes = max_in_flight_bytes
+        # Discovery manifest (path, size, mtime, sha256); its hashes also key the cache
+        self.manifest = manifest
+        self.discovery = None
+        # Per-stage timers and events, reported next to dataset_stats.json
+        self.profiler = StageProfiler(profile_dump) if profile or profile_dump else None
+        if self.profiler:
+            self.profiler.instrument(self, self.PROFILED_STAGES)
+        # Per-file progress events (kept in the profile report when profiling)
+        self.progress = self.profiler or EventStream()
+        self.progress.subscribe(self.print_progress)
+
+    def segment_numbered_items(self, content: str) -> list:
+        """Split content into (title, chunk) pairs, one per numbered item
+
+        A chunk runs from the end of its item match to the next boundary (a
+        newline, optional whitespace, then a numbered item or ## heading),
+        or 1500 chars if there is none. Boundaries are collected in one pass
+        up front, so segmenting is linear in the document size.
+        """
+        # Whitespace runs (from their first newline up to a boundary marker).
+        # The marker never starts with whitespace, so every newline in a run
+        # starts a boundary match, but finditer only reports the first one
+        run_starts = []
+        run_ends = []
+        for boundary in patterns.CP_NUMBERED_ITEM_BOUNDARY.finditer(content):
+            run_starts.append(boundary.start())
+            run_ends.append(boundary.start(1))
+
+        segments = []
+        for match in patterns.CP_NUMBERED_ITEM.finditer(content):
+            title = match.group(2) or match.group(4)
+            pos = match.end()
+
+            # First boundary at or after pos: a newline later in the run pos
+            # falls inside, otherwise the start of the next run
+            boundary = -1
+            k = bisect.bisect_right(run_ends, pos)
+            if k < len(run_ends):
+                if run_starts[k] >= pos:
+                    boundary = run_starts[k]
+                else:
+                    boundary = content.find('\n', pos, run_ends[k])
+                    if boundary == -1 and k + 1 < len(run_starts):
+                        boundary = run_starts[k + 1]
+
+            if boundary != -1:
+                chunk = content[pos:boundary]
+            else:
+                chunk = content[pos:pos+1500]  # Limit size
+
+            segments.append((title.strip().rstrip('*'), chunk))
+
+        return segments
 
     def extract_numbered_principles(self, content: str, section_title: str) -> list:
         """Extract numbered principle lists (1. Principle, 2. Principle, etc.)"""
         examples = []
 
         # Find numbered sections (1. **Title** or **1. Title**)
-        pattern = r'(?:^|\n)\s*(?:\*?\*?(\d+)\.\s*\*?\*?(.+?)\*?\*?|\*?\*?(\d+)\.\s+(.+?)\n)'
-        matches = re.finditer(pattern, content, re.MULTILINE)
-
-        current_num = None
-        current_title = None
-        current_content = []
-
-        for match in matches:
-            num = match.group(1) or match.group(3)
-            title = match.group(2) or match.group(4)
-
-            if num:
-                # Save previous principle
-                if current_title and current_content:
-                    example_text = self._create_principle_example(
-                        current_title, '\n'.join(current_content), section_title
-                    )
-                    if example_text:
-                        examples.append(example_text)
-
-                # Start new principle
-                current_num = num
-                current_title = title.strip().rstrip('*')
-                current_content = []
-
-                # Get content after this match
-                pos = match.end()
-                next_match = re.search(r'\n\s*(?:\*?\*?\d+\.|\#\#)', content[pos:])
-                if next_match:
-                    chunk = content[pos:pos+next_match.start()]
-                else:
-                    chunk = content[pos:pos+1500]  # Limit size
-
-                current_content.append(chunk)
-
-        # Save last principle
-        if current_title and current_content:
-            example_text = self._create_principle_example(
-                current_title, '\n'.join(current_content), section_title
-            )
-            if example_text:
-                examples.append(example_text)
+        for title, chunk in self.segment_numbered_items(content):
+            if title:
+                example_text = self._create_principle_example(title, chunk, section_title)
+                if example_text:
+                    examples.append(example_text)
 
         return examples
 
     def _create_principle_example(self, title: str, content: str, context: str) -> str:
         """Convert a principle description into Q&A format"""
         # Extract components
-        principle_match = re.search(r'(?:principle|equation|law)[:：]?\s*(.*?)(?=\n|$)', content, re.IGNORECASE)
+        principle_match = patterns.CP_PRINCIPLE_LINE.search(content)
         principle = principle_match.group(1).strip() if principle_match else ""
 
         # Extract variable mapping
-        var_match = re.search(r'[Vv]ariable mapping:?\s*(.*?)(?=\n\s*[-\*]|\n[A-Z]|\Z)', content, re.DOTALL)
+        var_match = patterns.CP_VARIABLE_MAPPING.search(content)
         variables = var_match.group(1).strip() if var_match else ""
 
         # Extract failure scenario
-        failure_match = re.search(r'[Ff]ailure.*?:?\s*(.*?)(?=\n\s*[-\*]|\n[A-Z]|\Z)', content, re.DOTALL)
+        failure_match = patterns.CP_FAILURE.search(content)
         failure = failure_match.group(1).strip() if failure_match else ""
 
         # Extract constraint
-        constraint_match = re.search(r'(?:[Rr]eal|[Cc]onstraint).*?:?\s*(.*?)(?=\n\s*[-\*]|\n[A-Z]|\Z)', content, re.DOTALL)
+        constraint_match = patterns.CP_CONSTRAINT.search(content)
         constraint = constraint_match.group(1).strip() if constraint_match else ""
 
         # Extract EE analogy
-        ee_match = re.search(r'EE analogy:?\s*(.*?)(?=\n\n|\Z)', content, re.DOTALL)
+        ee_match = patterns.CP_EE_ANALOGY.search(content)
         ee_analogy = ee_match.group(1).strip() if ee_match else ""
 
         # Must have some substance
@@ -141,8 +245,7 @@ class ComprehensiveParser:
         examples = []
 
         # Find code blocks with before/after patterns
-        code_pattern = r'```python\n(.*?)```.*?(?:❌|#\s*❌).*?(?:Violates|violates):?\s*(.*?)(?:\n.*?)?```python\n(.*?)```.*?(?:✅|#\s*✅).*?(?:Respects|respects):?\s*(.*?)(?:\n|$)'
-        matches = re.findall(code_pattern, content, re.DOTALL)
+        matches = code_fences.find_code_reviews(content)
 
         for bad_code, violation, good_code, principle in matches:
             # Create Q&A
@@ -159,24 +262,20 @@ class ComprehensiveParser:
 
         return examples
 
-    def extract_pre_formatted_conversations(self, content: str) -> list:
+    def extract_pre_formatted_conversations(self, content: str, blocks: list) -> list:
         """Extract already-formatted conversations"""
-        pattern = r'```\s*\n(<\|user\|>.*?<\|end\|>)\s*\n```'
-        matches = re.findall(pattern, content, re.DOTALL)
-        return matches
+        return markdown_blocks.fence_conversations(content, blocks, patterns.FENCED_CONVERSATION)
 
-    def extract_dialogue_sections(self, content: str) -> list:
+    def extract_dialogue_sections(self, content: str, blocks: list) -> list:
         """Extract multi-turn dialogues"""
         examples = []
 
         # Find dialogue blocks
-        dialogue_pattern = r'####?\s+Dialogue\s+\d+:.*?\n(.*?)(?=####?\s+Dialogue|\Z)'
-        dialogues = re.findall(dialogue_pattern, content, re.DOTALL)
+        dialogues = markdown_blocks.dialogue_sections(content, blocks)
 
         for dialogue_content in dialogues:
             # Extract turns
-            turn_pattern = r'\*\s+\*\*Turn\s+\d+.*?\*\*User:\*\*\s*["\u201c]?(.*?)["\u201d]?\s*\*\*AI:\*\*\s*["\u201c]?(.*?)["\u201d]?(?=\n\s*\*\s+\*\*Turn|\n\*\*Rating|\Z)'
-            turns = re.findall(turn_pattern, dialogue_content, re.DOTALL)
+            turns = patterns.DIALOGUE_TURN.findall(dialogue_content)
 
             if not turns:
                 continue
@@ -187,10 +286,7 @@ class ComprehensiveParser:
                 ai_text = ai_text.strip()
 
                 # Extract or generate thinking
-                thinking_match = re.search(
-                    r'((?:We should|This is|Starting from|Applying|model).*?(?:equation|principle|theorem).*?\.)',
-                    ai_text, re.DOTALL
-                )
+                thinking_match = patterns.CP_THINKING_SENTENCE.search(ai_text)
                 if thinking_match:
                     thinking = thinking_match.group(1)
                     response = ai_text.replace(thinking, '').strip()
@@ -206,25 +302,113 @@ class ComprehensiveParser:
 
         return examples
 
+    def split_assistant_content(self, content: str) -> tuple:
+        """Split an assistant message into (thinking, response)"""
+        # Explicit <think> block
+        thinking_match = patterns.THINK_BLOCK.search(content)
+        if thinking_match:
+            response = content[:thinking_match.start()] + content[thinking_match.end():]
+            return thinking_match.group(1).strip(), response.strip()
+
+        # Structured agent output: {"evaluation": ..., "reasoning": ..., "action": ...}
+        if content.startswith('{') and '"reasoning"' in content:
+            try:
+                structured = json.loads(content)
+            except json.JSONDecodeError:
+                structured = None
+            if isinstance(structured, dict) and isinstance(structured.get('reasoning'), str):
+                thinking_parts = [structured.get('evaluation'), structured['reasoning']]
+                return "\n\n".join(p for p in thinking_parts if isinstance(p, str)), content
+
+        # Same heuristic as dialogue sections
+        thinking_match = patterns.CP_THINKING_SENTENCE.search(content)
+        if thinking_match:
+            thinking = thinking_match.group(1)
+            return thinking, content.replace(thinking, '').strip()
+        return "Applying first principles to derive the solution", content
+
+    def format_messages(self, messages: list) -> str:
+        """Render a messages-format chat as <|user|>/<|assistant|> turns
+
+        System prompts are dropped and tool results are carried into the
+        thinking of the assistant turn that reads them. Returns '' unless the
+        assistant answers at least one user turn.
+        """
+        conversation_parts = []
+        tool_results = []
+        answered = False
+
+        for message in messages:
+            if not isinstance(message, dict):
+                continue
+            role = message.get('role')
+            content = message.get('content')
+            content = content.strip() if isinstance(content, str) else ''
+
+            if role == 'user':
+                conversation_parts.append(f"<|user|>\n{content}\n<|end|>")
+            elif role == 'tool':
+                tool_results.append(f"Tool result: {content}")
+            elif role == 'assistant' and conversation_parts:
+                if content:
+                    thinking, response = self.split_assistant_content(content)
+                else:
+                    # Pure tool call turn
+                    calls = [call.get('function', {}) for call in message.get('tool_calls') or []
+                             if isinstance(call, dict)]
+                    thinking = "Calling tools to gather the information needed"
+                    response = "\n".join(f"{call.get('name')}({call.get('arguments', '')})"
+                                         for call in calls)
+                if tool_results:
+                    thinking = "\n\n".join(tool_results + [thinking])
+                    tool_results = []
+                conversation_parts.append(f"<|assistant|>\n<think>\n{thinking}\n</think>\n{response}\n<|end|>")
+                answered = True
+
+        return "\n".join(conversation_parts) if answered else ''
+
+    def extract_message_conversations(self, filepath: Path):
+        """Yield examples from a messages-format JSON file, one record at a time
+
+        The file holds {"messages": [{"role": ..., "content": ...}]} records,
+        concatenated or in a top-level array; it is decoded incrementally.
+        """
+        source = self.determine_source(filepath)
+        for record in iter_json_values(filepath):
+            messages = record.get('messages') if isinstance(record, dict) else None
+            if not isinstance(messages, list):
+                continue
+            text = self.format_messages(messages)
+            if text:
+                yield {
+                    "text": text,
+                    "source": source,
+                    "category": self.determine_category(text, filepath),
+                    "quality_score": self.calculate_quality_score(text)
+                }
+
     def calculate_quality_score(self, text: str) -> int:
         """Calculate quality score"""
         score = 6
 
+        # Equation, references, failure mode and <think> block in one scan
+        found = patterns.CP_QUALITY.scan(text)
+
         # Has equation/formula
-        if re.search(r'\$\$.*?\$\$|\$.*?\$|=.*?[A-Za-z]|→|∝|≈', text):
+        if 'equation' in found:
             score += 1
 
         # Has principle/constraint reference
-        if re.search(r'NEC|IEEE|Shannon|Nyquist|Ohm|Kirchhoff|Carnot|Reynolds|Bernoulli|theorem|principle|law|constraint', text, re.IGNORECASE):
+        if 'reference' in found:
             score += 1
 
         # Has failure mode
-        if re.search(r'failure|fail|error|fault|violate|break|cascade', text, re.IGNORECASE):
+        if 'failure' in found:
             score += 1
 
         # Has substantial thinking
-        thinking_match = re.search(r'<think>(.*?)</think>', text, re.DOTALL)
-        if thinking_match and len(thinking_match.group(1)) > 200:
+        thinking = found.get('thinking', '')[len('<think>'):-len('</think>')]
+        if len(thinking) > 200:
             score += 1
 
         # Multi-turn
@@ -232,7 +416,7 @@ class ComprehensiveParser:
             score += 1
 
         # Has code
-        if '```python' in text or '```go' in text or '```' in text:
+        if '```' in text:
             score += 1
 
         return min(score, 10)
@@ -244,9 +428,11 @@ class ComprehensiveParser:
 
         if 'philosophy' in filepath_str or any(term in text_lower for term in ['epistemology', 'phenomenology', 'ontology', 'consciousness']):
             return 'philosophy'
-        elif '```python' in text or '```go' in text:
-            if 'review' in text_lower or '❌' in text or 'violates' in text_lower:
-                return 'code_review'
+        # Code without review markers falls through to the categories below
+        # (a nested if here used to return None for it)
+        elif ('```python' in text or '```go' in text) and \
+             ('review' in text_lower or '❌' in text or 'violates' in text_lower):
+            return 'code_review'
         elif 'failure' in text_lower or 'error' in text_lower or 'fault' in text_lower:
             return 'failure_analysis'
         elif 'electrical' in text_lower or 'voltage' in text_lower or 'circuit' in text_lower or 'ohm' in text_lower:
@@ -272,147 +458,402 @@ class ComprehensiveParser:
         else:
             return 'first_principles_generated'
 
+    def run_extractors(self, content: str, filepath: Path) -> list:
+        """Run every extraction method, returning (label, texts) pairs in output order"""
+        blocks = markdown_blocks.tokenize(content)
+        principles = self.extract_numbered_principles(content, filepath.stem)
+        return [
+            ("pre-formatted conversations", self.extract_pre_formatted_conversations(content, blocks)),
+            ("dialogue sections", self.extract_dialogue_sections(content, blocks)),
+            ("code review examples", self.extract_code_reviews(content)),
+            ("principle mappings", [p for p in principles if p]),
+        ]
+
+    def read_file(self, filepath: Path) -> str:
+        """Read a source file"""
+        return filepath.read_text(encoding='utf-8', errors='ignore')
+
+    def extract_file(self, filepath: Path, content: str = None) -> tuple:
+        """Extract examples from a single file without touching self.examples
+
+        Returns (counts, examples) where counts is a list of (label, count) pairs,
+        or (None, []) if the file ran past the time budget and was skipped.
+        Safe to call from a worker process.
+        """
+        if content is None:
+            content = self.read_file(filepath)
+        source = self.determine_source(filepath)
+        try:
+            with time_budget(self.file_timeout):
+                groups = self.run_extractors(content, filepath)
+        except ExtractionTimeout:
+            return None, []
+
+        examples = []
+        for _, texts in groups:
+            examples.extend(self.make_examples(texts, filepath, source))
+
+        counts = [(label, len(texts)) for label, texts in groups]
+        return counts, examples
+
+    def make_examples(self, texts: list, filepath: Path, source: str = None) -> list:
+        """Scored and categorized examples for the texts extracted from one file"""
+        if source is None:
+            source = self.determine_source(filepath)
+        return [{
+            "text": text,
+            "source": source,
+            "category": self.determine_category(text, filepath),
+            "quality_score": self.calculate_quality_score(text)
+        } for text in texts]
+
+    def report_file(self, filepath: Path, counts: list):
+        """Emit the per-extractor yield of one file as a progress event"""
+        fields = dict(file=str(filepath), skipped=counts is None, counts=dict(counts or []))
+        if self.profiler:
+            # extract_cached in this process, or extract_file as merged from a pool
+            # worker; None for a cache hit in a pooled run
+            cached = self.profiler.pop_last('extract_cached')
+            extracted = self.profiler.pop_last('extract_file')
+            fields['seconds'] = cached if cached is not None else extracted
+        self.progress.event("file", **fields)
+
+    def print_progress(self, event: dict):
+        """Console listener for progress events"""
+        if event['event'] == 'file':
+            print(f"Processing: {Path(event['file']).name}")
+            if event['skipped']:
+                print(f"  ⚠️  Skipped: extraction exceeded the {self.file_timeout:g}s time budget")
+                return
+            for label, count in event['counts'].items():
+                if count:
+                    print(f"  → {count} {label}")
+        elif event['event'] == 'messages_file':
+            print(f"Processing: {Path(event['file']).name}")
+            if event['examples']:
+                print(f"  → {event['examples']} message conversations")
+
     def process_file(self, filepath: Path):
         """Process a single file with all extraction methods"""
-        print(f"Processing: {filepath.name}")
+        counts, examples = self.extract_cached(filepath)
+        self.report_file(filepath, counts)
+        self.examples.extend(examples)
 
-        content = filepath.read_text(encoding='utf-8', errors='ignore')
-        source = self.determine_source(filepath)
-        extracted = []
-
-        # Extract pre-formatted conversations
-        pre_formatted = self.extract_pre_formatted_conversations(content)
-        extracted.extend(pre_formatted)
-        if pre_formatted:
-            print(f"  → {len(pre_formatted)} pre-formatted conversations")
-
-        # Extract dialogues
-        dialogues = self.extract_dialogue_sections(content)
-        extracted.extend(dialogues)
-        if dialogues:
-            print(f"  → {len(dialogues)} dialogue sections")
-
-        # Extract code reviews
-        code_reviews = self.extract_code_reviews(content)
-        extracted.extend(code_reviews)
-        if code_reviews:
-            print(f"  → {len(code_reviews)} code review examples")
-
-        # Extract numbered principles
-        principles = self.extract_numbered_principles(content, filepath.stem)
-        extracted.extend([p for p in principles if p])
-        if principles:
-            print(f"  → {len([p for p in principles if p])} principle mappings")
-
-        # Create examples
-        for text in extracted:
-            self.examples.append({
-                "text": text,
-                "source": source,
-                "category": self.determine_category(text, filepath),
-                "quality_score": self.calculate_quality_score(text)
-            })
+    def discover_sources(self):
+        """Walk the source roots once, hashing the files into the manifest if one is set"""
+        self.discovery = discover(self.base_dir, self.SOURCE_GROUPS, manifest_path=self.manifest)
+        return self.discovery
 
-    def process_all_files(self):
-        """Process all files"""
+    def discover_files(self) -> list:
+        """List input files as (heading, files) groups in processing order"""
+        discovery = self.discover_sources()
+        groups = []
+
+        # Engineering files
+        if (self.base_dir / ENGINEERING_DIR).exists():
+            files = sorted(discovery.files('engineering'))
+            groups.append(("📁 Engineering/First Principles Files:\n", files))
+
+        # Philosophy files
+        if (self.base_dir / PHILOSOPHY_DIR).exists():
+            files = sorted(discovery.files('philosophy_curated'))
+            groups.append(("📁 Philosophy/Personality Files:\n", files))
+
+        return groups
+
+    def discover_message_files(self) -> list:
+        """List messages-format JSON datasets (plain, .gz or .zst), which are streamed separately"""
+        discovery = self.discovery or self.discover_sources()
+        return sorted(discovery.files('messages'))
+
+    def extract_files(self, filepaths: list):
+        """Yield (filepath, counts, examples) for each file, in input order
+
+        With workers > 1 the files are extracted in a process pool; results are
+        still yielded in input order so output is identical to a serial run.
+        """
+        if self.read_concurrency:
+            yield from self._extract_prefetched(filepaths)
+            return
+
+        if self.workers <= 1 or len(filepaths) <= 1:
+            for filepath in filepaths:
+                yield (filepath, *self.extract_cached(filepath))
+            return
+
+        # Resolve cache hits first so only changed files are sent to the pool
+        keys = [self.cache_key(f) if self.cache else None for f in filepaths]
+        cached = [key is not None and self.cache.contains(key) for key in keys]
+        misses = [f for f, hit in zip(filepaths, cached) if not hit]
+
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_worker,
+                                 initargs=(type(self), str(self.base_dir),
+                                           self.file_timeout, bool(self.profiler))) as pool:
+            fresh = self._bounded_map(pool, misses)
+            for filepath, key, hit in zip(filepaths, keys, cached):
+                result = self.cache.get(key) if hit else None
+                if result is None:
+                    result = next(fresh) if not hit else self.extract_file(filepath)
+                    if self.cache:
+                        if not hit:
+                            self.cache.misses += 1
+                        # Skipped files are retried on the next run
+                        if result[0] is not None:
+                            self.cache.put(key, result)
+                yield (filepath, *result)
+
+    def _extract_prefetched(self, filepaths: list):
+        """extract_files over contents read ahead by an AsyncFileReader
+
+        Reads stay up to read_concurrency files (and max_in_flight_bytes)
+        ahead, so I/O latency overlaps with extraction here or in the pool,
+        which receives the content instead of reading the file again. A
+        file's bytes count against the budget until its extraction finishes.
+        """
+        # Cache hits known from the manifest alone are never read
+        hits = [self.cache is not None and self.cache.contains(key)
+                for key in map(self.manifest_cache_key, filepaths)]
+        reader = AsyncFileReader(self.read_concurrency, self.max_in_flight_bytes)
+        contents = reader.read_all([f for f, hit in zip(filepaths, hits) if not hit],
+                                   manual_release=True)
+        if self.workers <= 1:
+            for filepath, hit in zip(filepaths, hits):
+                if hit:
+                    yield (filepath, *self.extract_cached(filepath))
+                    continue
+                _, content, release = next(contents)
+                result = self.extract_cached(filepath, content)
+                release()
+                yield (filepath, *result)
+            return
+
+        def resolve(filepath, key, result):
+            if isinstance(result, Future):
+                result = self._worker_result(result)
+                # Skipped files are retried on the next run
+                if self.cache and result[0] is not None:
+                    self.cache.put(key, result)
+            return (filepath, *result)
+
+        window = self.workers * 2
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_worker,
+                                 initargs=(type(self), str(self.base_dir),
+                                           self.file_timeout, bool(self.profiler))) as pool:
+            for filepath, hit in zip(filepaths, hits):
+                if hit:
+                    pending.append((filepath, None, self.extract_cached(filepath)))
+                else:
+                    _, content, release = next(contents)
+                    key = self.cache_key(filepath, content) if self.cache else None
+                    result = self.cache.get(key) if self.cache else None
+                    if result is None:
+                        # The content stays on the byte budget until its extraction is done
+                        result = pool.submit(_extract_in_worker, filepath, content)
+                        result.add_done_callback(release)
+                    else:
+                        release()
+                    pending.append((filepath, key, result))
+                if len(pending) >= window:
+                    yield resolve(*pending.popleft())
+            while pending:
+                yield resolve(*pending.popleft())
+
+    def _bounded_map(self, pool, filepaths: list):
+        """Ordered pool.map that keeps only a few files in flight
+
+        Unlike Executor.map this does not submit everything up front, so
+        finished-but-unconsumed results can't pile up in memory while
+        streaming.
+        """
+        window = self.workers * 2
+        pending = deque()
+        for filepath in filepaths:
+            pending.append(pool.submit(_extract_in_worker, filepath))
+            if len(pending) >= window:
+                yield self._worker_result(pending.popleft())
+        while pending:
+            yield self._worker_result(pending.popleft())
+
+    def _worker_result(self, future) -> tuple:
+        """(counts, examples) of a pool extraction, merging its stage timings when profiling"""
+        result, stages = future.result()
+        if stages:
+            self.profiler.merge_stages(stages)
+        return result
+
+    def manifest_cache_key(self, filepath: Path):
+        """Extraction cache key of a file from its manifest hash, None without one"""
+        digest = self.discovery.digest(filepath) if self.cache and self.discovery else None
+        return self.cache.key_for_digest(filepath, digest) if digest else None
+
+    def cache_key(self, filepath: Path, content: str = None) -> str:
+        """Extraction cache key of a file, from its manifest hash when there is one
+
+        Only files without a manifest hash are read (unless content is given).
+        """
+        key = self.manifest_cache_key(filepath)
+        if key:
+            return key
+        if content is None:
+            content = self.read_file(filepath)
+        return self.cache.key_for(filepath, content)
+
+    def extract_cached(self, filepath: Path, content: str = None) -> tuple:
+        """extract_file, served from the extraction cache when the file is unchanged"""
+        if self.cache is None:
+            return self.extract_file(filepath, content)
+
+        key = self.cache_key(filepath, content)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.extract_file(filepath, content)
+            # Skipped files are retried on the next run
+            if result[0] is not None:
+                self.cache.put(key, result)
+        return result
+
+    def iter_examples(self):
+        """Yield examples file by file, without accumulating them"""
         print("="*60)
         print("COMPREHENSIVE DATASET PARSER")
         print("="*60 + "\n")
 
-        # Engineering files
-        eng_dir = self.base_dir / "First-Principles-Failures-Engineering-&-Deugging"
-        if eng_dir.exists():
-            print("📁 Engineering/First Principles Files:\n")
-            for md_file in sorted(eng_dir.glob("*.md")):
-                if md_file.name == 'Weighting-Value-Table.md':
-                    continue
-                self.process_file(md_file)
+        groups = self.discover_files()
+        all_files = [f for _, files in groups for f in files]
+        results = self.extract_files(all_files)
+
+        for heading, files in groups:
+            print(heading)
+            for _ in files:
+                filepath, counts, examples = next(results)
+                self.report_file(filepath, counts)
+                yield from examples
             print()
 
-        # Philosophy files
-        phil_dir = self.base_dir / "Corys-claude-convos-peronality-datasets"
-        if phil_dir.exists():
-            print("📁 Philosophy/Personality Files:\n")
-            for md_file in sorted(phil_dir.glob("*.md")):
-                if any(skip in md_file.name for skip in ['README', 'EXECUTIVE', 'QUICK_START']):
-                    continue
-                self.process_file(md_file)
+        message_files = self.discover_message_files()
+        if message_files:
+            print("📁 Messages-format JSON Files:\n")
+            for filepath in message_files:
+                count = 0
+                for example in self.extract_message_conversations(filepath):
+                    count += 1
+                    yield example
+                self.progress.event("messages_file", file=str(filepath), examples=count)
             print()
 
+        if self.cache:
+            print(self.cache.summary())
+
+    def process_all_files(self):
+        """Process all files"""
+        self.examples.extend(self.iter_examples())
         print(f"✅ TOTAL EXAMPLES EXTRACTED: {len(self.examples)}\n")
 
     def write_jsonl(self, output_path: Path, examples: list):
         """Write JSONL file"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for example in examples:
-                json_line = json.dumps(example, ensure_ascii=False)
-                f.write(json_line + '\n')
-
-    def generate_outputs(self):
-        """Generate output files"""
-        output_dir = self.base_dir / "minimax-m2-aetherpro-training" / "output"
-        output_dir.mkdir(exist_ok=True)
+        self.outputs.write_jsonl(output_path, examples, self.profiler)
 
-        # Filter by quality
-        high_quality = [ex for ex in self.examples if ex['quality_score'] >= 7]
-        medium_quality = [ex for ex in self.examples if ex['quality_score'] >= 6]
-
-        print("="*60)
-        print("QUALITY FILTERING")
-        print("="*60)
-        print(f"High quality (score >= 7):    {len(high_quality):4d} examples")
-        print(f"Medium+ quality (score >= 6): {len(medium_quality):4d} examples")
-        print()
+    def generate_outputs(self, examples=None):
+        """Generate output files
 
-        working_set = medium_quality
+        examples may be any iterable (e.g. iter_examples()); it is consumed
+        once, so streaming runs never hold the dataset in memory.
+        """
+        if examples is None:
+            examples = self.examples
 
-        # Write main dataset
-        self.write_jsonl(output_dir / "training_dataset.jsonl", working_set)
+        output_dir = self.base_dir / "minimax-m2-aetherpro-training" / "output"
+        output_dir.mkdir(exist_ok=True)
 
-        # Write category files
+        # Category files
         categories = {
             'philosophy': ['philosophy'],
             'code_review': ['code_review'],
             'failure_analysis': ['failure_analysis'],
             'technical': ['first_principles', 'electrical']
         }
+        routes = {"training_dataset.jsonl": None}
+        routes.update({f"{name}_examples.jsonl": cats for name, cats in categories.items()})
+
+        total_examples = 0
+        high_quality = 0
+        working_set = 0
+
+        # Near-duplicates (by <think> block) of an earlier example are logged, not written
+        dedup = NearDuplicateFilter(self.dedup_threshold) if self.dedup_threshold else None
+        dedup_log = open(output_dir / "near_duplicates.jsonl", 'w', encoding='utf-8') if dedup else nullcontext()
+        kept_lines = {}     # dedup id -> line in training_dataset.jsonl
+
+        # Filter by quality, write and count in a single pass
+        with self.outputs.open(output_dir, routes, "training_dataset.jsonl",
+                               eager=["training_dataset.jsonl"],
+                               profiler=self.profiler) as sinks, dedup_log:
+            for ex in examples:
+                total_examples += 1
+                if ex['quality_score'] >= 7:
+                    high_quality += 1
+                if ex['quality_score'] < 6:
+                    continue
+                # Recorded as shipped only once written, not if near-dedup drops it
+                if self.outputs.seen(ex['text']):
+                    continue
 
-        for name, cats in categories.items():
-            examples = [ex for ex in working_set if ex['category'] in cats]
-            if examples:
-                self.write_jsonl(output_dir / f"{name}_examples.jsonl", examples)
+                if dedup:
+                    if not dedup.add(ex['text']):
+                        dropped_id = dedup.seen - 1
+                        record = {"kept_line": kept_lines[dedup.kept_for[dropped_id]],
+                                  "similarity": dedup.similarity[dropped_id],
+                                  "example": ex}
+                        dedup_log.write(json.dumps(record, ensure_ascii=False) + '\n')
+                        continue
+                    kept_lines[dedup.seen - 1] = working_set
+
+                working_set += 1
+                sinks.write(ex)
+                self.outputs.shipped(ex['text'])
+
+        print("="*60)
+        print("QUALITY FILTERING")
+        print("="*60)
+        print(f"High quality (score >= 7):    {high_quality:4d} examples")
+        print(f"Medium+ quality (score >= 6): {working_set:4d} examples")
+        if dedup:
+            print(f"Near-duplicates removed:      {len(dedup.kept_for):4d} examples")
+        print()
+
+        self.outputs.report()
 
         # Statistics
         stats = {
-            "total_examples": len(self.examples),
-            "working_set_examples": len(working_set),
-            "category_distribution": {},
-            "source_distribution": {},
-            "quality_distribution": {}
+            "total_examples": total_examples,
+            "working_set_examples": working_set,
+            **sinks.stats.distributions()
         }
+        stats.update(self.outputs.dedup_stats())
+        if dedup:
+            stats["near_duplicates_removed"] = len(dedup.kept_for)
+
+        if sinks.stats.total > 0:
+            stats['category_percentages'] = sinks.stats.category_percentages()
 
-        for ex in working_set:
-            stats['category_distribution'][ex['category']] = \
-                stats['category_distribution'].get(ex['category'], 0) + 1
-            stats['source_distribution'][ex['source']] = \
-                stats['source_distribution'].get(ex['source'], 0) + 1
-            stats['quality_distribution'][str(ex['quality_score'])] = \
-                stats['quality_distribution'].get(str(ex['quality_score']), 0) + 1
-
-        total = len(working_set)
-        if total > 0:
-            stats['category_percentages'] = {
-                cat: f"{(count/total)*100:.1f}%"
-                for cat, count in stats['category_distribution'].items()
-            }
+        stats.update(sinks.stats.length_summary())
 
         with open(output_dir / "dataset_stats.json", 'w') as f:
             json.dump(stats, f, indent=2)
 
+        if self.profiler:
+            self.profiler.event("outputs", total_examples=total_examples,
+                                working_set=working_set, files=sinks.counts)
+            self.profiler.write(output_dir / "profile_report.json",
+                                parser=type(self).__name__, workers=self.workers)
+
         print("="*60)
         print("DATASET SUMMARY")
         print("="*60)
-        print(f"Total examples: {len(working_set)}\n")
+        print(f"Total examples: {working_set}\n")
         print("Category Distribution:")
         for cat in sorted(stats['category_distribution'].keys()):
             count = stats['category_distribution'][cat]
@@ -429,13 +870,59 @@ class ComprehensiveParser:
             count = stats['quality_distribution'][score]
             print(f"  Score {score}: {count:4d}")
 
+        if self.profiler:
+            print()
+            print(self.profiler.summary())
+
         print(f"\n📂 Output directory: {output_dir}/")
         print("="*60)
 
+def parse_args(description: str = __doc__):
+    """Parse command-line options shared by the comprehensive parsers
+
+    Returns the args and the DatasetOutputs keyword arguments among them.
+    """
+    arg_parser = argparse.ArgumentParser(description=description.strip().splitlines()[0])
+    arg_parser.add_argument('--workers', type=int, default=1,
+                            help="Number of processes used for per-file extraction (default: 1)")
+    arg_parser.add_argument('--cache-dir', default=None,
+                            help="Directory for the incremental extraction cache (disabled if omitted)")
+    arg_parser.add_argument('--stream', action='store_true',
+                            help="Stream examples straight to the output files instead of collecting them first")
+    add_output_arguments(arg_parser)
+    arg_parser.add_argument('--file-timeout', type=float, default=DEFAULT_FILE_TIMEOUT,
+                            help=f"Skip a file whose extraction takes longer than this many seconds, 0 to disable (default: {DEFAULT_FILE_TIMEOUT:g})")
+    arg_parser.add_argument('--near-dedup', action='store_true',
+                            help="Drop examples whose <think> block near-duplicates an earlier one (logged to near_duplicates.jsonl)")
+    arg_parser.add_argument('--dedup-threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help=f"Estimated Jaccard similarity treated as a near-duplicate (default: {DEFAULT_THRESHOLD:g})")
+    arg_parser.add_argument('--profile', action='store_true',
+                            help="Time every stage (read, each extractor, scoring, serialization, each output) and write profile_report.json next to dataset_stats.json")
+    arg_parser.add_argument('--profile-dump', default=None,
+                            help="Also record a cProfile run and dump its pstats to this file (implies --profile)")
+    arg_parser.add_argument('--read-concurrency', type=int, default=None,
+                            help="Read source files ahead with this many concurrent reads (asyncio), overlapping I/O latency with extraction")
+    arg_parser.add_argument('--max-in-flight-bytes', type=int, default=DEFAULT_MAX_IN_FLIGHT_BYTES,
+                            help=f"Byte budget of files read ahead but not yet extracted (default: {DEFAULT_MAX_IN_FLIGHT_BYTES})")
+    arg_parser.add_argument('--manifest', default=None,
+                            help="Write a sorted (path, size, mtime, sha256) manifest of the discovered files here (outside the source directories); unchanged files reuse its hashes, which also key the extraction cache")
+    args = arg_parser.parse_args()
+    return args, output_options(arg_parser, args)
+
 def main():
-    parser = ComprehensiveParser("/home/user/Dataset-Curator")
-    parser.process_all_files()
-    parser.generate_outputs()
+    args, outputs = parse_args()
+    parser = ComprehensiveParser("/home/user/Dataset-Curator", workers=args.workers,
+                                 cache_dir=args.cache_dir, file_timeout=args.file_timeout,
+                                 dedup_threshold=args.dedup_threshold if args.near_dedup else None,
+                                 profile=args.profile, profile_dump=args.profile_dump,
+                                 read_concurrency=args.read_concurrency,
+                                 max_in_flight_bytes=args.max_in_flight_bytes,
+                                 manifest=args.manifest, **outputs)
+    if args.stream:
+        parser.generate_outputs(parser.iter_examples())
+    else:
+        parser.process_all_files()
+        parser.generate_outputs()
     print("\n✅ PARSING COMPLETE!\n")
 
 if __name__ == "__main__":
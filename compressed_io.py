@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Compressed IO - Transparent gzip/zstd for the JSONL datasets, chosen by extension
+Writers stream through the compressor (zstd on all cores when the zstandard
+package is installed). Checkpointed mode instead cuts the file into
+independent frames on line boundaries and records them in a .frames.json
+sidecar, so a reader can seek straight to any line of a compressed shard
+"""
+
+import io
+import os
+import gzip
+import json
+import bisect
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Extension appended for each compression
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+DEFAULT_LEVELS = {'gzip': 6, 'zstd': 3}
+DEFAULT_THREADS = -1        # zstd worker threads; -1 uses every core
+
+FRAME_INDEX_SUFFIX = '.frames.json'
+
+def compression_of(path) -> str:
+    """'gzip', 'zstd' or None, from a file name's extension"""
+    suffix = Path(path).suffix
+    if suffix == '.zstd':
+        return 'zstd'
+    for compression, known in COMPRESSION_SUFFIXES.items():
+        if suffix == known:
+            return compression
+    return None
+
+def _require_zstd():
+    if zstandard is None:
+        raise ImportError("zstd compression needs the zstandard package (pip install zstandard)")
+    return zstandard
+
+def require_compression(compression: str):
+    """Raise ImportError now if compression needs a package that isn't installed"""
+    if compression == 'zstd':
+        _require_zstd()
+
+def _compress_frame(data: bytes, compression: str, level: int, threads: int) -> bytes:
+    """One self-contained gzip member or zstd frame"""
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return _require_zstd().ZstdCompressor(level=level, threads=threads).compress(data)
+
+def _decompress_frame(data: bytes, compression: str) -> bytes:
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    return _require_zstd().ZstdDecompressor().decompress(data)
+
+class CompressedWriter(io.RawIOBase):
+    """Binary writer that compresses everything written to a raw file
+
+    With checkpoint_bytes, the data is cut into independent frames of
+    about that many uncompressed bytes, each ending on a newline; frames
+    then lists them for the sidecar (see write_frame_index).
+    """
+
+    def __init__(self, raw, compression: str, level: int = None,
+                 threads: int = DEFAULT_THREADS, checkpoint_bytes: int = None):
+        super().__init__()
+        self.raw = raw
+        self.compression = compression
+        self.level = DEFAULT_LEVELS[compression] if level is None else level
+        self.threads = threads
+        self.checkpoint_bytes = checkpoint_bytes
+
+        if checkpoint_bytes:
+            self.frames = []
+            self._pending = bytearray()
+            self._offset = 0        # Compressed bytes written so far
+            self._lines = 0         # Lines in the finished frames
+            self._stream = None
+        else:
+            self.frames = None
+            if compression == 'gzip':
+                self._stream = gzip.GzipFile(fileobj=raw, mode='wb',
+                                             compresslevel=self.level, mtime=0)
+            else:
+                cctx = _require_zstd().ZstdCompressor(level=self.level, threads=threads)
+                self._stream = cctx.stream_writer(raw, closefd=False)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        if self._stream:
+            return self._stream.write(data)
+
+        self._pending += data
+        if len(self._pending) >= self.checkpoint_bytes:
+            # Frames hold whole lines, so each one starts at a line boundary
+            cut = self._pending.rfind(b'\n') + 1
+            if cut:
+                self._write_frame(bytes(self._pending[:cut]))
+                del self._pending[:cut]
+        return len(data)
+
+    def _write_frame(self, data: bytes):
+        compressed = _compress_frame(data, self.compression, self.level, self.threads)
+        self.raw.write(compressed)
+        lines = data.count(b'\n')
+        self.frames.append({"offset": self._offset, "size": len(compressed),
+                            "first_line": self._lines, "lines": lines})
+        self._offset += len(compressed)
+        self._lines += lines
+
+    def flush(self):
+        if self.closed:
+            return
+        if self._stream:
+            self._stream.flush()
+        self.raw.flush()
+
+    def fileno(self) -> int:
+        return self.raw.fileno()
+
+    def close(self):
+        """Finish the compressed stream (or last frame) and close the raw file"""
+        if self.closed:
+            return
+        if self._stream:
+            self._stream.close()
+            self._stream = None
+        elif self.frames is not None and self._pending:
+            self._write_frame(bytes(self._pending))
+            self._pending = bytearray()
+        super().close()
+        self.raw.close()
+
+class DigestFile:
+    """Raw file wrapper that hashes and counts the bytes written through it"""
+
+    def __init__(self, raw, digest):
+        self.raw = raw
+        self.digest = digest
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.raw.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        self.raw.flush()
+
+    def fileno(self) -> int:
+        return self.raw.fileno()
+
+    def close(self):
+        self.raw.close()
+
+def open_output(path: Path, compression: str = None, buffer_size: int = -1,
+                checkpoint_bytes: int = None, digest=None):
+    """Binary writer for path, compressed unless compression is None
+
+    digest (a hashlib object) is updated with the bytes as stored on disk.
+    """
+    if compression == 'zstd':
+        _require_zstd()
+    raw = open(path, 'wb', buffering=buffer_size)
+    if digest is not None:
+        raw = DigestFile(raw, digest)
+    if compression is None:
+        return raw
+    return CompressedWriter(raw, compression, checkpoint_bytes=checkpoint_bytes)
+
+def open_text_output(path: Path, compression: str = None, buffer_size: int = -1,
+                     checkpoint_bytes: int = None):
+    """UTF-8 text writer for path, compressed unless compression is None"""
+    if compression is None:
+        return open(path, 'w', encoding='utf-8', buffering=buffer_size)
+    return io.TextIOWrapper(open_output(path, compression, buffer_size, checkpoint_bytes),
+                            encoding='utf-8', newline='')
+
+def frame_index_path(path: Path) -> Path:
+    """Sidecar listing the frames of a checkpointed file"""
+    path = Path(path)
+    return path.with_name(path.name + FRAME_INDEX_SUFFIX)
+
+def write_frame_index(path: Path, handle) -> bool:
+    """Write the frame sidecar for a closed writer of path
+
+    A writer that wasn't checkpointed removes any stale sidecar instead, so
+    it can't point into the new file. The sidecar goes through a temp file
+    and a rename, so it is never seen half-written. Call it once path holds
+    the data it describes. True if a sidecar was written.
+    """
+    writer = getattr(handle, 'buffer', handle)      # Unwrap a text writer
+    frames = getattr(writer, 'frames', None)
+    sidecar = frame_index_path(path)
+    if frames is None:
+        sidecar.unlink(missing_ok=True)
+        return False
+    temp_path = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"compression": writer.compression, "frames": frames}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, sidecar)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return True
+
+def open_input(path: Path, errors: str = 'strict'):
+    """UTF-8 text reader for a plain, gzip or zstd file (by extension)"""
+    compression = compression_of(path)
+    if compression is None:
+        return open(path, 'r', encoding='utf-8', errors=errors)
+    if compression == 'gzip':
+        return gzip.open(path, 'rt', encoding='utf-8', errors=errors)
+    reader = _require_zstd().ZstdDecompressor().stream_reader(open(path, 'rb'),
+                                                              read_across_frames=True)
+    return io.TextIOWrapper(io.BufferedReader(reader), encoding='utf-8', errors=errors)
+
+def iter_lines(path: Path, start: int = 0):
+    """Yield the lines of a (possibly compressed) JSONL file from line start
+
+    A checkpointed file seeks straight to the frame holding line start;
+    anything else is read from the beginning and the first lines skipped.
+    """
+    path = Path(path)
+    index_path = frame_index_path(path)
+    compression = compression_of(path)
+    if compression is None or not index_path.exists():
+        with open_input(path) as f:
+            for number, line in enumerate(f):
+                if number >= start:
+                    yield line
+        return
+
+    with open(index_path, encoding='utf-8') as f:
+        frames = json.load(f)['frames']
+    first = bisect.bisect_right([frame['first_line'] for frame in frames], start) - 1
+    if first < 0:
+        return
+
+    with open(path, 'rb') as raw:
+        raw.seek(frames[first]['offset'])
+        skip = start - frames[first]['first_line']
+        for frame in frames[first:]:
+            data = _decompress_frame(raw.read(frame['size']), compression)
+            # Split on b'\n' only: str.splitlines would also break on U+2028 etc.
+            lines = data.split(b'\n')
+            last = lines.pop()
+            for line in lines[skip:]:
+                yield line.decode('utf-8') + '\n'
+            if last and skip <= len(lines):
+                yield last.decode('utf-8')
+            skip = max(skip - len(lines), 0)
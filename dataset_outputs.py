@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Dataset Outputs - The output options every parser's generate_outputs shares
+Exact-repeat filtering, shards, compression, a columnar copy of the main
+output and offset indexes are configured once here from the parser's
+constructor options, and wired into the JsonlFanout the outputs go through
+"""
+
+from pathlib import Path
+
+from jsonl_writer import JsonlFanout, DEFAULT_BUFFER_SIZE
+from fingerprint_index import FingerprintIndex
+from shard_writer import ShardedJsonlWriter
+from columnar_export import ColumnarWriter, COLUMNAR_FORMATS, require_columnar
+from compressed_io import COMPRESSION_SUFFIXES, require_compression
+
+class DatasetOutputs:
+    """Output options of a parser run, and the writers they call for"""
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE, exact_dedup: bool = False,
+                 fingerprint_index: str = None, shard_examples: int = None,
+                 shard_bytes: int = None, interleave_shards: bool = False,
+                 compression: str = None, checkpoint_bytes: int = None,
+                 columnar: str = None, index: bool = False):
+        # Fail before any extraction if an output needs a missing package
+        require_compression(compression)
+        require_columnar(columnar)
+        self.buffer_size = buffer_size
+        # Exact-repeat filter, persisted across runs when given an index file
+        self.fingerprints = FingerprintIndex(fingerprint_index) if exact_dedup or fingerprint_index else None
+        # Size-bounded shards of the main output, on when either limit is given
+        self.sharding = dict(max_examples=shard_examples, max_bytes=shard_bytes,
+                             interleave=interleave_shards) if shard_examples or shard_bytes else None
+        # gzip/zstd for every JSONL output (and shard), optionally in seekable frames
+        self.output_format = dict(compression=compression, checkpoint_bytes=checkpoint_bytes)
+        self.columnar = columnar    # 'arrow' / 'parquet' copy of the main output, or None
+        self.index = index          # Offset index sidecars for random access
+        # Writers of the last open()
+        self.shards = None
+        self.columnar_writer = None
+
+    def open(self, output_dir: Path, routes: dict, main: str, eager: list = (),
+             profiler=None) -> JsonlFanout:
+        """JsonlFanout over routes, plus the shards and columnar copy of the main route"""
+        self.shards = ShardedJsonlWriter(output_dir / "shards", buffer_size=self.buffer_size,
+                                         **self.sharding, **self.output_format) if self.sharding else None
+        columnar_path = output_dir / f"{Path(main).stem}{COLUMNAR_FORMATS.get(self.columnar, '')}"
+        self.columnar_writer = ColumnarWriter(columnar_path) if self.columnar else None
+        return JsonlFanout(output_dir, routes, eager=eager, buffer_size=self.buffer_size,
+                           shards=self.shards, columnar=self.columnar_writer, index=self.index,
+                           profiler=profiler, **self.output_format)
+
+    def is_repeat(self, text: str) -> bool:
+        """True if text repeats one written before; otherwise records it as written"""
+        return self.fingerprints is not None and not self.fingerprints.add(text)
+
+    def seen(self, text: str) -> bool:
+        """is_repeat without recording, for a text that may still be dropped (see shipped)"""
+        return self.fingerprints is not None and self.fingerprints.seen(text)
+
+    def shipped(self, text: str):
+        """Record a text checked with seen() once it is actually written"""
+        if self.fingerprints:
+            self.fingerprints.add(text)
+
+    def report(self):
+        """Print the shard and columnar summaries and persist the fingerprints"""
+        if self.shards:
+            print(self.shards.summary())
+        if self.columnar_writer:
+            print(self.columnar_writer.summary())
+
+        if self.fingerprints:
+            self.fingerprints.save()
+            print(self.fingerprints.summary())
+
+    def dedup_stats(self) -> dict:
+        """Stats entries of the exact-repeat filter (none when it is off)"""
+        return {"exact_duplicates_removed": self.fingerprints.duplicates} if self.fingerprints else {}
+
+    def write_jsonl(self, output_path: Path, examples, profiler=None):
+        """Write examples to one (uncompressed) JSONL file"""
+        with JsonlFanout(output_path.parent, {output_path.name: None}, eager=[output_path.name],
+                         buffer_size=self.buffer_size, index=self.index,
+                         profiler=profiler) as sink:
+            sink.write_all(examples)
+
+def add_output_arguments(arg_parser):
+    """Add the DatasetOutputs options every parser CLI takes (read back with output_options)"""
+    group = arg_parser.add_argument_group("output options")
+    group.add_argument('--buffer-size', type=int, default=DEFAULT_BUFFER_SIZE,
+                       help=f"Write buffer per output file in bytes (default: {DEFAULT_BUFFER_SIZE})")
+    group.add_argument('--exact-dedup', action='store_true',
+                       help="Drop examples whose whitespace-normalized text repeats an earlier one")
+    group.add_argument('--fingerprint-index', default=None,
+                       help="Persistent fingerprint file; also drops examples shipped by earlier runs (implies --exact-dedup)")
+    group.add_argument('--shard-examples', type=int, default=None,
+                       help="Also split the main output into shards of at most this many examples (output/shards/ with manifest.json)")
+    group.add_argument('--shard-bytes', type=int, default=None,
+                       help="Maximum bytes per shard (may be combined with --shard-examples)")
+    group.add_argument('--interleave-shards', action='store_true',
+                       help="Deal categories round-robin across the shards instead of keeping source order")
+    group.add_argument('--compression', choices=sorted(COMPRESSION_SUFFIXES), default=None,
+                       help="Compress the JSONL outputs and shards (adds .gz / .zst to their names)")
+    group.add_argument('--checkpoint-bytes', type=int, default=None,
+                       help="Write compressed outputs as independent frames of about this many bytes, indexed in a .frames.json sidecar for random access")
+    group.add_argument('--columnar', choices=sorted(COLUMNAR_FORMATS), default=None,
+                       help="Also export the main output as typed columns (Arrow IPC or Parquet, needs pyarrow)")
+    group.add_argument('--index', action='store_true',
+                       help="Write a <file>.idx offset index next to each uncompressed JSONL output for random access")
+
+def output_options(arg_parser, args) -> dict:
+    """DatasetOutputs keyword arguments of args parsed with add_output_arguments
+
+    An option whose package is missing is reported as a usage error.
+    """
+    try:
+        require_compression(args.compression)
+        require_columnar(args.columnar)
+    except ImportError as exc:
+        arg_parser.error(str(exc))
+    return dict(buffer_size=args.buffer_size, exact_dedup=args.exact_dedup,
+                fingerprint_index=args.fingerprint_index,
+                shard_examples=args.shard_examples, shard_bytes=args.shard_bytes,
+                interleave_shards=args.interleave_shards,
+                compression=args.compression, checkpoint_bytes=args.checkpoint_bytes,
+                columnar=args.columnar, index=args.index)
@@ -6,45 +6,55 @@ Handles multiple content formats and maintains proper distribution
 
 import os
 import json
-import re
 from pathlib import Path
 from typing import Dict, List, Tuple
 from collections import defaultdict
+from extraction_cache import ExtractionCache
+from dataset_outputs import DatasetOutputs
+from file_discovery import Discovery
+import patterns
+import markdown_blocks
 
 class EnhancedParser:
-    def __init__(self, base_dir: str):
+    # file_discovery groups read by this parser
+    SOURCE_GROUPS = ('engineering', 'philosophy_enhanced', 'aetherpro_key_docs')
+
+    # Examples kept from each key AetherPro doc
+    KEY_DOC_LIMIT = 5
+
+    def __init__(self, base_dir: str, cache_dir: str = None, **output_options):
         self.base_dir = Path(base_dir)
         self.examples = []
         self.stats = defaultdict(int)
+        self.cache = ExtractionCache(cache_dir, type(self)) if cache_dir else None
+        # Exact-repeat filter, shards, compression, columnar copy and offset
+        # indexes of the outputs; fails here if one needs a missing package
+        self.outputs = DatasetOutputs(**output_options)
 
     def parse_technical_mapping(self, content: str, source: str) -> List[Dict]:
         """Parse technical mapping format (equations + failure modes)"""
         examples = []
 
         # Split by mapping sections (## Mapping N:)
-        mapping_pattern = r'##\s+\*?\*?Mapping\s+\d+:?\s+(.*?)\n(.*?)(?=##\s+\*?\*?Mapping\s+\d+:|##\s+\*?\*?Dialogue|$)'
-        matches = re.findall(mapping_pattern, content, re.DOTALL)
+        matches = patterns.EP_MAPPING_SECTION.findall(content)
 
         for title, section_content in matches:
             title = title.strip().rstrip('*')
 
             # Extract equation
-            eq_match = re.search(r'```\s*(.*?)\s*```', section_content, re.DOTALL)
+            eq_match = patterns.EP_FENCED_BLOCK.search(section_content)
             equation = eq_match.group(1).strip() if eq_match else ""
 
             # Extract variable mapping
-            var_mapping = re.search(r'\*\*Variable Mapping.*?\*\*\s*\n(.*?)(?=\n\*\*|\n##|$)',
-                                   section_content, re.DOTALL)
+            var_mapping = patterns.EP_VARIABLE_MAPPING.search(section_content)
             variables = var_mapping.group(1).strip() if var_mapping else ""
 
             # Extract failure mode
-            failure_match = re.search(r'\*\*Failure Mode\*?\*?\s*\n(.*?)(?=\n\*\*|\n##|$)',
-                                     section_content, re.DOTALL)
+            failure_match = patterns.EP_FAILURE_MODE.search(section_content)
             failure = failure_match.group(1).strip() if failure_match else ""
 
             # Extract constraint
-            constraint_match = re.search(r'\*\*Real.*?Constraint\*?\*?\s*\n(.*?)(?=\n\*\*|\n##|$)',
-                                        section_content, re.DOTALL)
+            constraint_match = patterns.EP_CONSTRAINT.search(section_content)
             constraint = constraint_match.group(1).strip() if constraint_match else ""
 
             # Skip if too little content
@@ -112,18 +122,16 @@ class EnhancedParser:
 
         return examples
 
-    def parse_dialogue_section(self, content: str, source: str) -> List[Dict]:
+    def parse_dialogue_section(self, content: str, blocks: list, source: str) -> List[Dict]:
         """Parse multi-turn dialogue sections"""
         examples = []
 
-        # Pattern for Dialogue N: sections
-        dialogue_pattern = r'###+\s+Dialogue\s+\d+:.*?\n(.*?)(?=###+ Dialogue|\Z)'
-        dialogues = re.findall(dialogue_pattern, content, re.DOTALL)
+        # Dialogue N: sections, ended by any "###+" Dialogue heading
+        dialogues = markdown_blocks.dialogue_sections(content, blocks, marker_len=6)
 
         for dialogue_content in dialogues:
             # Extract turns
-            turn_pattern = r'\*\s+\*\*Turn\s+\d+.*?\*\*User:\*\*\s*["\']?(.*?)["\']?\s*\*\*AI:\*\*\s*["\']?(.*?)["\']?(?=\n\s*\*\s+\*\*Turn|\n\*\*Rating|\Z)'
-            turns = re.findall(turn_pattern, dialogue_content, re.DOTALL)
+            turns = patterns.EP_DIALOGUE_TURN.findall(dialogue_content)
 
             if not turns:
                 continue
@@ -137,8 +145,7 @@ class EnhancedParser:
                 ai_text = ai_text.strip()
 
                 # Extract thinking from AI text if present
-                think_match = re.search(r'((?:We should|This is|Starting from|Applying).*?(?:equation|principle|theorem).*?\.)',
-                                       ai_text, re.DOTALL)
+                think_match = patterns.EP_THINKING_SENTENCE.search(ai_text)
                 thinking = think_match.group(1) if think_match else f"Analyzing: {user_text[:50]}..."
 
                 # Clean AI response (remove thinking if extracted)
@@ -157,7 +164,7 @@ class EnhancedParser:
             # Calculate quality score
             quality_score = 7  # Multi-turn gets baseline 7
             if len(turns) >= 3: quality_score += 1
-            if any(re.search(r'\$.*?\$', t[1]) for t in turns): quality_score += 1
+            if any(patterns.INLINE_MATH.search(t[1]) for t in turns): quality_score += 1
             if any('failure' in t[1].lower() or 'error' in t[1].lower() for t in turns): quality_score += 1
 
             # Determine category
@@ -180,23 +187,24 @@ class EnhancedParser:
 
         return examples
 
-    def parse_pre_formatted_conversations(self, content: str, source: str, filepath: Path) -> List[Dict]:
+    def parse_pre_formatted_conversations(self, content: str, blocks: list, source: str,
+                                          filepath: Path) -> List[Dict]:
         """Parse conversations already in <|user|>/<|assistant|> format"""
         examples = []
 
-        # Pattern for complete conversation blocks
-        pattern = r'```\s*\n(<\|user\|>.*?<\|end\|>)\s*```'
-        matches = re.findall(pattern, content, re.DOTALL)
+        # Complete conversation blocks
+        matches = markdown_blocks.fence_conversations(content, blocks, patterns.FENCED_CONVERSATION_LOOSE)
 
         for block in matches:
             # Extract thinking
-            thinking_match = re.search(r'<think>(.*?)</think>', block, re.DOTALL)
+            thinking_match = patterns.THINK_BLOCK.search(block)
             thinking = thinking_match.group(1).strip() if thinking_match else ""
 
             # Calculate quality score
             quality_score = 6
-            if re.search(r'\$\$.*?\$\$|\$.*?\$', block): quality_score += 1
-            if re.search(r'NEC|IEEE|Shannon|theorem|principle|equation', block, re.IGNORECASE): quality_score += 1
+            found = patterns.EP_QUALITY.scan(block)
+            if 'math' in found: quality_score += 1
+            if 'reference' in found: quality_score += 1
             if len(thinking) > 200: quality_score += 1
             if block.count('<|user|>') >= 3: quality_score += 1
 
@@ -243,15 +251,24 @@ class EnhancedParser:
         print(f"Processing: {filepath.relative_to(self.base_dir)}")
 
         content = filepath.read_text(encoding='utf-8', errors='ignore')
+        if self.cache is None:
+            return self.extract_examples(content, filepath)
+        return self.cache.cached_call(filepath, content, "",
+                                      lambda: self.extract_examples(content, filepath))
+
+    def extract_examples(self, content: str, filepath: Path, blocks: list = None) -> List[Dict]:
+        """Run all applicable parsers over a file's content"""
         source = self.determine_source(filepath)
+        if blocks is None:
+            blocks = markdown_blocks.tokenize(content)
         all_examples = []
 
         # Try pre-formatted conversations first
-        pre_formatted = self.parse_pre_formatted_conversations(content, source, filepath)
+        pre_formatted = self.parse_pre_formatted_conversations(content, blocks, source, filepath)
         all_examples.extend(pre_formatted)
 
         # Try dialogue sections
-        dialogues = self.parse_dialogue_section(content, source)
+        dialogues = self.parse_dialogue_section(content, blocks, source)
         all_examples.extend(dialogues)
 
         # Try technical mappings (only for engineering files)
@@ -261,73 +278,53 @@ class EnhancedParser:
 
         return all_examples
 
-    def process_all_files(self):
-        """Process all files"""
+    def iter_examples(self):
+        """Yield examples file by file, without accumulating them"""
+        # One walk of every source root; skip rules live in file_discovery
+        self.discovery = Discovery(self.base_dir, self.SOURCE_GROUPS)
 
         # Process First Principles / Engineering files (PRIORITY)
-        fp_dir = self.base_dir / "First-Principles-Failures-Engineering-&-Deugging"
-        if fp_dir.exists():
-            for md_file in fp_dir.glob("*.md"):
-                if md_file.name == 'Weighting-Value-Table.md':
-                    continue
-                examples = self.process_file(md_file)
-                self.examples.extend(examples)
-                self.stats['engineering_files'] += 1
+        for md_file in self.discovery.files('engineering'):
+            examples = self.process_file(md_file)
+            self.stats['engineering_files'] += 1
+            yield from examples
 
         # Process Philosophy files (PRIORITY)
-        phil_dir = self.base_dir / "Corys-claude-convos-peronality-datasets"
-        if phil_dir.exists():
-            for md_file in phil_dir.glob("*.md"):
-                if any(skip in md_file.name for skip in ['README', 'EXECUTIVE', 'QUICK_START', 'Dossier']):
-                    continue
-                examples = self.process_file(md_file)
-                self.examples.extend(examples)
-                self.stats['philosophy_files'] += 1
-
-        # Process AetherPro docs (LIMIT TO KEY FILES ONLY)
-        aetherpro_dir = self.base_dir / "minimax-m2-aetherpro-training" / "aetherpro_docs"
-        if aetherpro_dir.exists():
-            # Only process key architecture files, skip infrastructure
-            key_files = [
-                'architecture/TRIAD-Complete-Build-Spec-Cory-Method.md',
-                'architecture/Mastro-Kimi-Powered-Orchestration-Agent.md',
-                'architecture/AetherAI-Triad-Intelligence-Dataset-Tips.md',
-                'philosophy/Corys-Dossier-Sovereign-AI.md',
-            ]
-            for key_file in key_files:
-                filepath = aetherpro_dir / key_file
-                if filepath.exists():
-                    examples = self.process_file(filepath)
-                    # Limit examples from each doc file
-                    self.examples.extend(examples[:5])  # Max 5 per file
-                    self.stats['aetherpro_files'] += 1
+        for md_file in self.discovery.files('philosophy_enhanced'):
+            examples = self.process_file(md_file)
+            self.stats['philosophy_files'] += 1
+            yield from examples
 
+        # Process AetherPro docs (LIMIT TO KEY FILES ONLY, skip infrastructure)
+        for filepath in self.discovery.ordered('aetherpro_key_docs'):
+            examples = self.process_file(filepath)
+            self.stats['aetherpro_files'] += 1
+            # Limit examples from each doc file
+            yield from examples[:self.KEY_DOC_LIMIT]
+
+        if self.cache:
+            print(self.cache.summary())
+
+    def process_all_files(self):
+        """Process all files"""
+        self.examples.extend(self.iter_examples())
         print(f"\n✅ Total examples extracted: {len(self.examples)}")
 
     def write_jsonl(self, output_path: Path, examples: List[Dict]):
         """Write examples to JSONL file"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for example in examples:
-                json_line = json.dumps(example, ensure_ascii=False)
-                f.write(json_line + '\n')
-
-    def generate_outputs(self):
-        """Generate output files and statistics"""
-        output_dir = self.base_dir / "minimax-m2-aetherpro-training" / "output"
-        output_dir.mkdir(exist_ok=True)
+        self.outputs.write_jsonl(output_path, examples)
 
-        # Filter by quality (>= 7 for high quality)
-        high_quality = [ex for ex in self.examples if ex['quality_score'] >= 7]
-        medium_quality = [ex for ex in self.examples if ex['quality_score'] >= 6]
+    def generate_outputs(self, examples=None):
+        """Generate output files and statistics
 
-        print(f"High quality (>= 7): {len(high_quality)}")
-        print(f"Medium+ quality (>= 6): {len(medium_quality)}")
+        examples may be any iterable (e.g. iter_examples()); it is consumed
+        once, so streaming runs never hold the dataset in memory.
+        """
+        if examples is None:
+            examples = self.examples
 
-        # Use medium quality for more examples
-        working_set = medium_quality
-
-        # Write main file
-        self.write_jsonl(output_dir / "training_dataset.jsonl", working_set)
+        output_dir = self.base_dir / "minimax-m2-aetherpro-training" / "output"
+        output_dir.mkdir(exist_ok=True)
 
         # Category-specific files
         categories = {
@@ -336,47 +333,58 @@ class EnhancedParser:
             'failure_analysis': ['failure_analysis'],
             'technical': ['first_principles', 'electrical', 'ai_architecture', 'coding', 'agentic_workflows']
         }
+        routes = {"training_dataset.jsonl": None}
+        routes.update({f"{name}_examples.jsonl": cats for name, cats in categories.items()})
+
+        total_examples = 0
+        high_quality = 0
+        medium_quality = 0
+
+        # Filter by quality (medium+ is the working set), write and count in one pass
+        with self.outputs.open(output_dir, routes, "training_dataset.jsonl",
+                               eager=["training_dataset.jsonl"]) as sinks:
+            for ex in examples:
+                total_examples += 1
+                if ex['quality_score'] >= 7:
+                    high_quality += 1
+                if ex['quality_score'] < 6:
+                    continue
+                if self.outputs.is_repeat(ex['text']):
+                    continue
 
-        category_counts = {}
-        for name, cats in categories.items():
-            examples = [ex for ex in working_set if ex['category'] in cats]
-            category_counts[name] = len(examples)
-            if examples:
-                self.write_jsonl(output_dir / f"{name}_examples.jsonl", examples)
+                medium_quality += 1
+                sinks.write(ex)
+
+        print(f"High quality (>= 7): {high_quality}")
+        print(f"Medium+ quality (>= 6): {medium_quality}")
+
+        # Use medium quality for more examples
+        working_set = medium_quality
+
+        self.outputs.report()
 
         # Generate statistics
         stats = {
-            "total_examples": len(self.examples),
-            "medium_quality_examples": len(medium_quality),
-            "high_quality_examples": len(high_quality),
+            "total_examples": total_examples,
+            "medium_quality_examples": medium_quality,
+            "high_quality_examples": high_quality,
             "files_processed": dict(self.stats),
-            "category_distribution": {},
-            "source_distribution": {},
-            "quality_distribution": {}
+            **sinks.stats.distributions()
         }
-
-        for ex in working_set:
-            stats['category_distribution'][ex['category']] = \
-                stats['category_distribution'].get(ex['category'], 0) + 1
-            stats['source_distribution'][ex['source']] = \
-                stats['source_distribution'].get(ex['source'], 0) + 1
-            stats['quality_distribution'][str(ex['quality_score'])] = \
-                stats['quality_distribution'].get(str(ex['quality_score']), 0) + 1
+        stats.update(self.outputs.dedup_stats())
 
         # Calculate percentages
-        total = len(working_set)
-        if total > 0:
-            stats['category_percentages'] = {
-                cat: f"{(count/total)*100:.1f}%"
-                for cat, count in stats['category_distribution'].items()
-            }
+        if sinks.stats.total > 0:
+            stats['category_percentages'] = sinks.stats.category_percentages()
+
+        stats.update(sinks.stats.length_summary())
 
         # Write stats
         with open(output_dir / "dataset_stats.json", 'w') as f:
             json.dump(stats, f, indent=2)
 
         print(f"\n=== DATASET SUMMARY ===")
-        print(f"Total examples: {len(working_set)}")
+        print(f"Total examples: {working_set}")
         print(f"\nCategory distribution:")
         for cat, pct in stats.get('category_percentages', {}).items():
             count = stats['category_distribution'][cat]
@@ -389,11 +397,10 @@ class EnhancedParser:
         print(f"\nFiles saved to: {output_dir}/")
 
 def main():
-    parser = EnhancedParser("/home/user/Dataset-Curator")
-    print("=== Enhanced Dataset Parser ===\n")
-    parser.process_all_files()
-    parser.generate_outputs()
-    print("\n✅ Dataset parsing complete!")
+    # The engine's enhanced preset runs this parser's extractors and writes its outputs
+    from extraction_engine import run_preset
+    run_preset('enhanced', "Enhanced dataset parser for MiniMax-M2-AetherPro training",
+               banner="=== Enhanced Dataset Parser ===\n", footer="\n✅ Dataset parsing complete!")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Extraction Cache - Persistent per-file cache of extracted examples
+Entries are keyed on file path + content hash + parser-version fingerprint,
+so unchanged files skip all extract_* work on the next run
+"""
+
+import os
+import json
+import hashlib
+import inspect
+from pathlib import Path
+
+# Bump to invalidate every cache entry after a format change
+CACHE_VERSION = 1
+
+def _local_modules(module) -> list:
+    """Modules imported by a parser module that live next to it (e.g. patterns)"""
+    module_file = getattr(module, '__file__', None)
+    if not module_file:
+        return []
+    module_dir = Path(module_file).resolve().parent
+
+    local = []
+    for value in vars(module).values():
+        value_file = getattr(value, '__file__', None)
+        if inspect.ismodule(value) and value_file and \
+           Path(value_file).resolve().parent == module_dir:
+            local.append(value)
+    return sorted(local, key=lambda m: m.__name__)
+
+def parser_fingerprint(parser_cls) -> str:
+    """Hash the source of a parser class, its bases and their local imports
+
+    Any edit to an extractor, scorer, categorizer or shared regex changes the
+    fingerprint, which invalidates all entries written by the old code.
+    """
+    modules = []
+    for cls in parser_cls.__mro__:
+        if cls is object:
+            continue
+        module = inspect.getmodule(cls)
+        for mod in [module] + _local_modules(module):
+            if mod not in modules:
+                modules.append(mod)
+
+    digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+    for module in modules:
+        try:
+            source = inspect.getsource(module)
+        except (OSError, TypeError):
+            source = module.__name__
+        digest.update(source.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+class ExtractionCache:
+    """On-disk cache of extraction results, one JSON file per entry"""
+
+    def __init__(self, cache_dir, parser_cls):
+        self.fingerprint = parser_fingerprint(parser_cls)
+        self.cache_dir = Path(cache_dir) / parser_cls.__name__ / self.fingerprint
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, filepath: Path, content: str, namespace: str = "") -> str:
+        """Cache key for a file's content as seen by a given extraction routine
+
+        The path is part of the key because source and category are derived
+        from it; namespace separates different routines run over one file.
+        """
+        key = hashlib.sha256()
+        key.update(namespace.encode('utf-8') + b'\0')
+        key.update(str(filepath).encode('utf-8') + b'\0')
+        key.update(content.encode('utf-8'))
+        return key.hexdigest()
+
+    def key_for_digest(self, filepath: Path, digest: str, namespace: str = "") -> str:
+        """Cache key from a file's sha256 (e.g. from a discovery manifest) instead of its content
+
+        Lets a hit be served without reading the file at all.
+        """
+        key = hashlib.sha256()
+        key.update(namespace.encode('utf-8') + b'\0')
+        key.update(str(filepath).encode('utf-8') + b'\0')
+        key.update(b'sha256:' + digest.encode('ascii'))
+        return key.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Location of an entry, fanned out over 256 subdirectories"""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def contains(self, key: str) -> bool:
+        """Check for an entry without loading it"""
+        return self._entry_path(key).exists()
+
+    def get(self, key: str):
+        """Return the cached entry, or None on a miss"""
+        try:
+            with open(self._entry_path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry):
+        """Save an entry, writing via a temp file so readers never see partial JSON"""
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(exist_ok=True)
+
+        tmp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, entry_path)
+
+    def cached_call(self, filepath: Path, content: str, namespace: str, compute):
+        """Return the cached result for this file, running compute() on a miss"""
+        key = self.key_for(filepath, content, namespace)
+        entry = self.get(key)
+        if entry is None:
+            entry = compute()
+            self.put(key, entry)
+        return entry
+
+    def summary(self) -> str:
+        """One-line hit/miss report"""
+        return f"Extraction cache: {self.hits} hits, {self.misses} misses ({self.cache_dir})"
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+Extraction Engine - One pass over the corpus for every registered extractor plugin
+Each extract_*/parse_* method of the parser classes is registered as a
+plugin that declares the file types it applies to. The engine reads and
+tokenizes each source file once, runs every enabled plugin over it and
+keeps per-plugin yield accounting, so parser families can be combined,
+switched off one extractor at a time or compared side by side. The
+preset's parser family owns the outputs: the examples go, in that
+family's file order, through its generate_outputs (quality filter,
+category files, stats, dedup), so a preset writes what its script writes.
+The dataset, enhanced and final scripts run as their presets (run_preset)
+"""
+
+import io
+import sys
+import json
+import time
+import fnmatch
+import hashlib
+import inspect
+import argparse
+from pathlib import Path
+from collections import deque, namedtuple
+from contextlib import redirect_stdout
+from functools import cached_property, lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+from parser import DatasetParser
+from enhanced_parser import EnhancedParser
+from final_parser import FinalParser
+from comprehensive_parser import (ComprehensiveParser, ExtractionTimeout, time_budget,
+                                  DEFAULT_FILE_TIMEOUT)
+from maximum_extraction_parser import MaximumExtractionParser
+from dataset_outputs import add_output_arguments, output_options
+from jsonl_writer import write_json_atomic
+from file_discovery import Discovery, DISCOVERY_RULES, TRAINING_DIR
+from extraction_cache import ExtractionCache
+from near_dedup import DEFAULT_THRESHOLD
+import markdown_blocks
+
+# Parser class whose methods (and source/category/score rules) each family's plugins use
+FAMILIES = {
+    'dataset': DatasetParser,
+    'enhanced': EnhancedParser,
+    'final': FinalParser,
+    'comprehensive': ComprehensiveParser,
+    'maximum': MaximumExtractionParser,
+}
+
+# family:  FAMILIES key of the parser whose generate_outputs writes the run
+# plugins: default plugin selection (globs)
+# groups:  (group, order, counter) in that parser's processing order; order is
+#          'walk' (discovery order), 'sorted' or 'ordered' (by the group's
+#          include list), counter the parser's stats key counting the files
+Preset = namedtuple('Preset', 'family plugins groups')
+
+# Plugin selections and output layouts reproducing each parser script
+PRESETS = {
+    'dataset': Preset('dataset', ('dataset.*',), (
+        ('engineering', 'walk', 'first_principles_files'),
+        ('philosophy', 'walk', 'philosophy_files'),
+        ('aetherpro_docs', 'walk', 'aetherpro_files'))),
+    'enhanced': Preset('enhanced', ('enhanced.*',), (
+        ('engineering', 'walk', 'engineering_files'),
+        ('philosophy_enhanced', 'walk', 'philosophy_files'),
+        ('aetherpro_key_docs', 'ordered', 'aetherpro_files'))),
+    'final': Preset('final', ('final.*',), (
+        ('engineering', 'sorted', 'engineering_files'),
+        ('philosophy_curated', 'sorted', 'philosophy_files'))),
+    'comprehensive': Preset('comprehensive', ('comprehensive.*',), (
+        ('engineering', 'sorted', None),
+        ('philosophy_curated', 'sorted', None),
+        ('messages', 'sorted', None))),
+    'maximum': Preset('maximum', ('comprehensive.*', 'maximum.*'), (
+        ('engineering', 'sorted', None),
+        ('philosophy_curated', 'sorted', None),
+        ('messages', 'sorted', None))),
+    # Every plugin, written in the maximum parser's layout
+    'all': Preset('maximum', ('*',), ()),
+}
+
+# name:      unique 'family.extractor' registry name
+# family:    FAMILIES key of the parser instance extract receives
+# label:     what the plugin yields, for progress output
+# applies:   predicate over a SourceFile
+# extract:   function(parser, source_file) -> list of example dicts
+# cacheable: whether results go through the extraction cache (keyed on the
+#            file content, so streamed files are not)
+Plugin = namedtuple('Plugin', 'name family label applies extract cacheable')
+
+# One plugin's result on one file; cached runs were served by the extraction cache
+PluginRun = namedtuple('PluginRun', 'name examples seconds timed_out cached')
+
+# name -> Plugin, in registration (and therefore per-file run) order
+PLUGINS = {}
+
+def register(name: str, label: str, applies, cacheable: bool = True):
+    """Decorator registering an extract function as a plugin"""
+    def decorate(extract):
+        if name in PLUGINS:
+            raise ValueError(f"Plugin already registered: {name}")
+        family = name.split('.', 1)[0]
+        if family not in FAMILIES:
+            raise ValueError(f"Unknown plugin family: {family}")
+        PLUGINS[name] = Plugin(name, family, label, applies, extract, cacheable)
+        return extract
+    return decorate
+
+@lru_cache(maxsize=None)
+def cache_namespace(plugin: Plugin) -> str:
+    """Cache namespace of a plugin; editing its extract function invalidates its entries
+
+    (Edits to the parser class are covered by the cache's own fingerprint.)
+    """
+    source = inspect.getsource(plugin.extract)
+    return f"{plugin.name}:{hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]}"
+
+def select_plugins(enable=('*',), disable=()) -> list:
+    """Registered plugins matching any enable pattern and no disable pattern"""
+    def matches(name, globs):
+        return any(fnmatch.fnmatchcase(name, glob) for glob in globs)
+    return [plugin for name, plugin in PLUGINS.items()
+            if matches(name, enable) and not matches(name, disable)]
+
+class SourceFile:
+    """One input file; its content and block list are computed once, on first use"""
+
+    def __init__(self, path: Path, groups: list, base_dir: Path, counter: str = None):
+        self.path = path
+        self.groups = groups        # file_discovery groups the file belongs to
+        self.base_dir = base_dir
+        self.counter = counter      # Output parser's stats key counting this file, if any
+
+    @cached_property
+    def content(self) -> str:
+        return self.path.read_text(encoding='utf-8', errors='ignore')
+
+    @cached_property
+    def blocks(self) -> list:
+        return markdown_blocks.tokenize(self.content)
+
+    @property
+    def read(self) -> bool:
+        """Whether some plugin needed the file's text"""
+        return 'content' in self.__dict__
+
+# ---------------------------------------------------------------------------
+# File types (the file_discovery groups each parser class reads)
+# ---------------------------------------------------------------------------
+
+def in_group(group: str):
+    """Files the discovery rules put in group"""
+    return lambda source: group in source.groups
+
+engineering = in_group('engineering')
+aetherpro_doc = in_group('aetherpro_docs')
+messages = in_group('messages')
+
+def any_of(*predicates):
+    return lambda source: any(predicate(source) for predicate in predicates)
+
+def technical(predicate):
+    """predicate, restricted to engineering paths (where mapping extractors run)"""
+    return lambda source: predicate(source) and \
+        ('First-Principles' in str(source.path) or 'engineering' in str(source.path).lower())
+
+def _dataset_philosophy(source: SourceFile) -> bool:
+    return in_group('philosophy')(source) and \
+        ('Philosophy' in source.path.name or 'Consciousness' in source.path.name)
+
+_enhanced_key_doc = in_group('aetherpro_key_docs')
+
+DATASET_MARKDOWN = any_of(engineering, lambda source: in_group('philosophy')(source)
+                          and not _dataset_philosophy(source))
+ENHANCED_MARKDOWN = any_of(engineering, in_group('philosophy_enhanced'))
+CURATED_MARKDOWN = any_of(engineering, in_group('philosophy_curated'))
+
+# ---------------------------------------------------------------------------
+# Plugins
+# ---------------------------------------------------------------------------
+
+@register('dataset.first_principles', "first principles examples", DATASET_MARKDOWN)
+def _dataset_first_principles(parser, source):
+    return parser.parse_first_principles_file(source.path, source.content, source.blocks)
+
+@register('dataset.philosophy', "philosophy conversations", _dataset_philosophy)
+def _dataset_philosophy_file(parser, source):
+    return parser.parse_philosophy_file(source.path, source.content, source.blocks)
+
+@register('dataset.aetherpro_docs', "documentation sections", aetherpro_doc)
+def _dataset_aetherpro_docs(parser, source):
+    return parser.parse_aetherpro_docs(source.path, source.content)
+
+@register('enhanced.pre_formatted_conversations', "pre-formatted conversations", ENHANCED_MARKDOWN)
+def _enhanced_pre_formatted(parser, source):
+    return parser.parse_pre_formatted_conversations(source.content, source.blocks,
+                                                    parser.determine_source(source.path), source.path)
+
+@register('enhanced.dialogue_sections', "dialogue sections", ENHANCED_MARKDOWN)
+def _enhanced_dialogues(parser, source):
+    return parser.parse_dialogue_section(source.content, source.blocks,
+                                         parser.determine_source(source.path))
+
+@register('enhanced.technical_mappings', "technical mappings", technical(ENHANCED_MARKDOWN))
+def _enhanced_mappings(parser, source):
+    return parser.parse_technical_mapping(source.content, parser.determine_source(source.path))
+
+@register('enhanced.key_docs', "key documentation examples", _enhanced_key_doc)
+def _enhanced_key_docs(parser, source):
+    return parser.extract_examples(source.content, source.path, source.blocks)[:parser.KEY_DOC_LIMIT]
+
+@register('final.code_block_conversations', "pre-formatted conversations", CURATED_MARKDOWN)
+def _final_conversations(parser, source):
+    return parser.make_examples(parser.extract_code_block_conversations(source.content, source.blocks),
+                                source.path)
+
+@register('final.dialogue_sections', "dialogue sections", CURATED_MARKDOWN)
+def _final_dialogues(parser, source):
+    return parser.make_examples(parser.extract_dialogue_sections(source.content, source.blocks),
+                                source.path)
+
+@register('final.mapping_sections', "technical mappings", technical(CURATED_MARKDOWN))
+def _final_mappings(parser, source):
+    return parser.make_examples(parser.extract_mapping_sections(source.content, source.blocks),
+                                source.path)
+
+@register('comprehensive.pre_formatted_conversations', "pre-formatted conversations", CURATED_MARKDOWN)
+def _comprehensive_conversations(parser, source):
+    return parser.make_examples(parser.extract_pre_formatted_conversations(source.content, source.blocks),
+                                source.path)
+
+@register('comprehensive.dialogue_sections', "dialogue sections", CURATED_MARKDOWN)
+def _comprehensive_dialogues(parser, source):
+    return parser.make_examples(parser.extract_dialogue_sections(source.content, source.blocks),
+                                source.path)
+
+@register('comprehensive.code_reviews', "code review examples", CURATED_MARKDOWN)
+def _comprehensive_code_reviews(parser, source):
+    return parser.make_examples(parser.extract_code_reviews(source.content), source.path)
+
+@register('comprehensive.numbered_principles', "principle mappings", CURATED_MARKDOWN)
+def _comprehensive_principles(parser, source):
+    principles = parser.extract_numbered_principles(source.content, source.path.stem)
+    return parser.make_examples([p for p in principles if p], source.path)
+
+@register('comprehensive.message_conversations', "message conversations", messages, cacheable=False)
+def _comprehensive_messages(parser, source):
+    return list(parser.extract_message_conversations(source.path))
+
+@register('maximum.principle_conflicts', "principle conflicts", CURATED_MARKDOWN)
+def _maximum_conflicts(parser, source):
+    return parser.make_examples(parser.extract_principle_conflicts(source.content), source.path)
+
+@register('maximum.failure_scenarios', "failure scenarios", CURATED_MARKDOWN)
+def _maximum_failures(parser, source):
+    return parser.make_examples(parser.extract_failure_scenarios(source.content), source.path)
+
+@register('maximum.inline_code_examples', "inline code examples", CURATED_MARKDOWN)
+def _maximum_inline_code(parser, source):
+    return parser.make_examples(parser.extract_inline_code_examples(source.content), source.path)
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+# Engine of each pool process, built once by _init_worker
+_worker_engine = None
+
+def _init_worker(base_dir: str, enable: tuple, disable: tuple, file_timeout: float, cache_dir: str):
+    global _worker_engine
+    _worker_engine = ExtractionEngine(base_dir, enable=enable, disable=disable,
+                                      file_timeout=file_timeout, cache_dir=cache_dir)
+
+def _run_in_worker(source: SourceFile) -> tuple:
+    """Pool entry point: (plugin runs, whether the file was read) for one file"""
+    return _worker_engine.run_plugins(source), source.read
+
+class ExtractionEngine:
+    """Runs the enabled plugins over every source file, reading each file once
+
+    The preset picks the default plugins, the file order and the parser
+    whose generate_outputs writes the run (built with output_options, the
+    keyword arguments of that parser class for dedup, shards, compression
+    and the like). enable/disable replace or trim its plugin selection.
+    """
+
+    def __init__(self, base_dir: str, preset: str = 'maximum', enable=None, disable=(),
+                 file_timeout: float = DEFAULT_FILE_TIMEOUT, workers: int = 1,
+                 cache_dir: str = None, output_options: dict = None):
+        self.base_dir = Path(base_dir)
+        self.preset = PRESETS[preset]
+        self.enable = tuple(enable or self.preset.plugins)
+        self.disable = tuple(disable)
+        self.plugins = select_plugins(self.enable, self.disable)
+        if not self.plugins:
+            raise ValueError(f"No plugins match enable={list(self.enable)} disable={list(self.disable)}")
+        self.file_timeout = file_timeout
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.output_options = output_options or {}
+        self.parsers = {}       # family -> parser instance, built on first use
+        self.caches = {}        # family -> ExtractionCache
+        self.files_read = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.yields = {plugin.name: {"files": 0, "files_with_examples": 0, "examples": 0,
+                                     "seconds": 0.0, "timeouts": 0}
+                       for plugin in self.plugins}
+        # Built up front so a bad output option fails before any extraction
+        self.owner = self.parser(self.preset.family)
+
+    def parser(self, family: str):
+        if family not in self.parsers:
+            options = self.output_options if family == self.preset.family else {}
+            self.parsers[family] = FAMILIES[family](str(self.base_dir), **options)
+        return self.parsers[family]
+
+    def cache(self, family: str) -> ExtractionCache:
+        if family not in self.caches:
+            self.caches[family] = ExtractionCache(self.cache_dir, FAMILIES[family])
+        return self.caches[family]
+
+    def discover_files(self) -> list:
+        """Every discovered file as a SourceFile, in the preset's processing order
+
+        The preset's groups come first, in its parser's order, then every
+        other group in walk order; a file is listed once, under the first
+        group it appears in.
+        """
+        discovery = Discovery(self.base_dir)
+        listings = {
+            'walk': discovery.files,
+            'sorted': lambda group: sorted(discovery.files(group)),
+            'ordered': discovery.ordered,
+        }
+        files, listed = [], set()
+        groups = list(self.preset.groups) + [(group, 'walk', None) for group in DISCOVERY_RULES]
+        for group, order, counter in groups:
+            for path in listings[order](group):
+                if path not in listed:
+                    listed.add(path)
+                    files.append(SourceFile(path, discovery.entries[path].groups,
+                                            self.base_dir, counter))
+        return files
+
+    def run_plugins(self, source: SourceFile) -> list:
+        """PluginRun of every enabled plugin that applies to source
+
+        Touches no accounting, so it is safe to call from a worker process.
+        """
+        runs = []
+        for plugin in self.plugins:
+            if not plugin.applies(source):
+                continue
+            start = time.perf_counter()
+            key = None
+            if self.cache_dir and plugin.cacheable:
+                cache = self.cache(plugin.family)
+                key = cache.key_for(source.path, source.content, cache_namespace(plugin))
+                examples = cache.get(key)
+                if examples is not None:
+                    runs.append(PluginRun(plugin.name, examples, time.perf_counter() - start, False, True))
+                    continue
+            try:
+                with time_budget(self.file_timeout):
+                    examples = plugin.extract(self.parser(plugin.family), source)
+                timed_out = False
+            except ExtractionTimeout:
+                examples, timed_out = [], True
+            # Timed-out runs are retried on the next run
+            if key is not None and not timed_out:
+                cache.put(key, examples)
+            runs.append(PluginRun(plugin.name, examples, time.perf_counter() - start, timed_out, False))
+        return runs
+
+    def account(self, source: SourceFile, runs: list, read: bool):
+        """Add one file's plugin runs to the yield tallies and the output parser's file counts"""
+        self.files_read += read
+        for run in runs:
+            tally = self.yields[run.name]
+            tally['files'] += 1
+            tally['seconds'] += run.seconds
+            tally['timeouts'] += run.timed_out
+            tally['examples'] += len(run.examples)
+            tally['files_with_examples'] += bool(run.examples)
+            if self.cache_dir and PLUGINS[run.name].cacheable:
+                self.cache_hits += run.cached
+                self.cache_misses += not run.cached
+        if source.counter:
+            self.owner.stats[source.counter] += 1
+
+    def extract_files(self, sources: list):
+        """Yield (source, runs) for each file, in order
+
+        With workers > 1 the files are extracted in a process pool, a few
+        files ahead of the consumer.
+        """
+        if self.workers <= 1 or len(sources) <= 1:
+            for source in sources:
+                runs = self.run_plugins(source)
+                self.account(source, runs, source.read)
+                yield source, runs
+            return
+
+        def resolve(source, future):
+            runs, read = future.result()
+            self.account(source, runs, read)
+            return source, runs
+
+        window = self.workers * 2
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(str(self.base_dir), self.enable, self.disable,
+                                           self.file_timeout, self.cache_dir)) as pool:
+            for source in sources:
+                pending.append((source, pool.submit(_run_in_worker, source)))
+                if len(pending) >= window:
+                    yield resolve(*pending.popleft())
+            while pending:
+                yield resolve(*pending.popleft())
+
+    def iter_examples(self):
+        """Yield examples file by file, without accumulating them"""
+        sources = [source for source in self.discover_files()
+                   if any(plugin.applies(source) for plugin in self.plugins)]
+        for source, runs in self.extract_files(sources):
+            print(f"Processing: {source.path.relative_to(self.base_dir)}")
+            for run in runs:
+                if run.examples:
+                    print(f"  → {len(run.examples)} {PLUGINS[run.name].label} [{run.name}]")
+                yield from run.examples
+        if self.cache_dir:
+            print(f"Extraction cache: {self.cache_hits} hits, {self.cache_misses} misses ({self.cache_dir})")
+
+    def generate_outputs(self):
+        """Stream the examples through the output parser's generate_outputs"""
+        self.owner.generate_outputs(self.iter_examples())
+
+    def yield_report(self) -> dict:
+        """Per-plugin yield accounting of the run so far"""
+        report = {
+            "files_read": self.files_read,
+            "examples": sum(tally['examples'] for tally in self.yields.values()),
+            "plugins": self.yields,
+        }
+        if self.cache_dir:
+            report["cache"] = {"hits": self.cache_hits, "misses": self.cache_misses}
+        return report
+
+    def print_yields(self):
+        print("="*60)
+        print("PLUGIN YIELDS")
+        print("="*60)
+        for name, tally in self.yields.items():
+            timeouts = f"  ({tally['timeouts']} timed out)" if tally['timeouts'] else ""
+            print(f"  {name:45s}: {tally['examples']:5d} examples from "
+                  f"{tally['files_with_examples']}/{tally['files']} files{timeouts}")
+        print(f"\nFiles read once: {self.files_read}")
+
+def verify_presets(base_dir: str) -> int:
+    """Check each parser preset yields exactly its parser class's examples
+
+    Compared in order, along with the file counts the parser keeps for its
+    stats file. Returns the number of presets that don't match.
+    """
+    failures = 0
+    for preset, cls in (('dataset', DatasetParser), ('enhanced', EnhancedParser),
+                        ('final', FinalParser), ('comprehensive', ComprehensiveParser),
+                        ('maximum', MaximumExtractionParser)):
+        with redirect_stdout(io.StringIO()):
+            parser = cls(base_dir)
+            expected = list(parser.iter_examples())
+            engine = ExtractionEngine(base_dir, preset=preset, file_timeout=0)
+            actual = list(engine.iter_examples())
+        matched = expected == actual and \
+            getattr(parser, 'stats', None) == getattr(engine.owner, 'stats', None)
+        failures += not matched
+        status = "✅" if matched else "❌"
+        print(f"  {status} {preset:15s} {len(actual):5d} examples "
+              f"({cls.__name__}: {len(expected)})")
+    return failures
+
+# Checkout the command lines read from
+DEFAULT_BASE_DIR = "/home/user/Dataset-Curator"
+
+def add_run_arguments(arg_parser):
+    """Add the options of an engine run (also taken by the parser scripts run as presets)"""
+    arg_parser.add_argument('--workers', type=int, default=1,
+                            help="Number of processes used for per-file extraction (default: 1)")
+    arg_parser.add_argument('--cache-dir', default=None,
+                            help="Directory for the incremental extraction cache, one entry per plugin and file (disabled if omitted)")
+    arg_parser.add_argument('--file-timeout', type=float, default=DEFAULT_FILE_TIMEOUT,
+                            help=f"Skip a plugin on a file after this many seconds, 0 to disable (default: {DEFAULT_FILE_TIMEOUT:g})")
+    add_output_arguments(arg_parser)
+
+def run_preset(preset: str, description: str, banner: str = None, footer: str = None):
+    """Command line of a parser script: its preset run through the engine
+
+    banner and footer are the script's own start and completion messages.
+    """
+    arg_parser = argparse.ArgumentParser(description=description)
+    add_run_arguments(arg_parser)
+    arg_parser.add_argument('--stream', action='store_true',
+                            help="Accepted for compatibility; presets always stream examples to the output files")
+    args = arg_parser.parse_args()
+
+    engine = ExtractionEngine(DEFAULT_BASE_DIR, preset=preset, file_timeout=args.file_timeout,
+                              workers=args.workers, cache_dir=args.cache_dir,
+                              output_options=output_options(arg_parser, args))
+    if banner:
+        print(banner)
+    engine.generate_outputs()
+    if footer:
+        print(footer)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--base-dir', default=DEFAULT_BASE_DIR,
+                            help="Dataset-Curator checkout to read from")
+    arg_parser.add_argument('--preset', choices=sorted(PRESETS), default='maximum',
+                            help="Plugin set, file order and output layout of one parser script (default: maximum)")
+    arg_parser.add_argument('--enable', action='append', default=None, metavar='PATTERN',
+                            help="Enable plugins matching this name or glob, e.g. 'final.*' (repeatable; replaces the preset's plugins, keeps its layout)")
+    arg_parser.add_argument('--disable', action='append', default=[], metavar='PATTERN',
+                            help="Disable plugins matching this name or glob (repeatable)")
+    arg_parser.add_argument('--list', action='store_true',
+                            help="List the registered plugins and exit")
+    arg_parser.add_argument('--yields-only', action='store_true',
+                            help="Only report per-plugin yields, without writing examples")
+    add_run_arguments(arg_parser)
+    arg_parser.add_argument('--near-dedup', action='store_true',
+                            help="Drop examples whose <think> block near-duplicates an earlier one (comprehensive and maximum layouts)")
+    arg_parser.add_argument('--dedup-threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help=f"Estimated Jaccard similarity treated as a near-duplicate (default: {DEFAULT_THRESHOLD:g})")
+    arg_parser.add_argument('--verify', action='store_true',
+                            help="Check every preset against its parser class and exit")
+    args = arg_parser.parse_args()
+    options = output_options(arg_parser, args)
+
+    if args.list:
+        for name, plugin in PLUGINS.items():
+            print(f"{name:45s} {FAMILIES[plugin.family].__name__:25s} {plugin.label}")
+        return
+
+    if args.verify:
+        print("Presets vs parser classes:")
+        if verify_presets(args.base_dir):
+            sys.exit(1)
+        return
+
+    if args.near_dedup:
+        if not issubclass(FAMILIES[PRESETS[args.preset].family], ComprehensiveParser):
+            arg_parser.error(f"--near-dedup needs a comprehensive or maximum layout, not {args.preset}")
+        options['dedup_threshold'] = args.dedup_threshold
+
+    engine = ExtractionEngine(args.base_dir, preset=args.preset, enable=args.enable,
+                              disable=args.disable, file_timeout=args.file_timeout,
+                              workers=args.workers, cache_dir=args.cache_dir,
+                              output_options=options)
+    print("="*60)
+    print("EXTRACTION ENGINE")
+    print(f"{len(engine.plugins)} plugins: {', '.join(plugin.name for plugin in engine.plugins)}")
+    print(f"Outputs: {type(engine.owner).__name__} layout")
+    print("="*60 + "\n")
+
+    if args.yields_only:
+        for _ in engine.iter_examples():
+            pass
+    else:
+        engine.generate_outputs()
+
+    output_dir = engine.base_dir / TRAINING_DIR / "output"
+    output_dir.mkdir(exist_ok=True)
+    print()
+    engine.print_yields()
+    write_json_atomic(output_dir / "plugin_yields.json", engine.yield_report(), indent=2)
+    print(f"📊 Yield report: {output_dir / 'plugin_yields.json'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Extractor Benchmark - Throughput and peak memory of every extractor and parser
+Generates a synthetic markdown corpus in the shapes of the real source files
+(Gemini mappings and Dialogue N sections, Kimi "## Mapping N" files and
+fenced conversations, Grok numbered principles, BEFORE/AFTER code reviews,
+principle conflicts and failure scenarios) at any size from 1 MB to 10 GB,
+then runs each extractor and each parser class over it in a fresh process.
+Results (MB/s, examples/s, peak RSS) are written as JSON, and --compare
+flags regressions against the JSON of an earlier commit
+"""
+
+import io
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import subprocess
+from pathlib import Path
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+try:
+    import resource
+except ImportError:     # Not available on Windows: peak memory is not reported
+    resource = None
+
+import markdown_blocks
+from parser import DatasetParser
+from enhanced_parser import EnhancedParser
+from final_parser import FinalParser
+from comprehensive_parser import ComprehensiveParser
+from maximum_extraction_parser import MaximumExtractionParser
+
+PARSER_CLASSES = [DatasetParser, EnhancedParser, FinalParser,
+                  ComprehensiveParser, MaximumExtractionParser]
+
+ENGINEERING_DIR = "First-Principles-Failures-Engineering-&-Deugging"
+PHILOSOPHY_DIR = "Corys-claude-convos-peronality-datasets"
+CORPUS_MANIFEST = "corpus.json"
+
+DEFAULT_FILE_SIZE = 64 * 1024       # Real source files are 10-30 KB
+DEFAULT_TOLERANCE = 0.10            # Throughput drop reported as a regression
+
+_SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+def parse_size(text: str) -> int:
+    """Bytes in a size such as 1MB, 512K or 10GB (binary units)"""
+    text = text.strip().upper().rstrip('B')
+    unit = text[-1] if text and text[-1] in _SIZE_UNITS else ''
+    return int(float(text[:len(text) - len(unit)]) * _SIZE_UNITS[unit])
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus
+# ---------------------------------------------------------------------------
+
+DOMAINS = ["Thermodynamics", "Fluid Dynamics", "Control Theory", "Electrical Circuits",
+           "Structural Mechanics", "Signal Processing", "Queueing Theory", "Electromagnetism"]
+CONCEPTS = ["Entropy", "Hysteresis", "Impedance Matching", "Resonance", "Back Pressure",
+            "Viscosity", "Feedback Gain", "Ground Loop", "Thermal Runaway", "Damping Ratio",
+            "Carnot Efficiency", "Kirchhoff's Current Law", "Skin Effect", "Water Hammer"]
+SYSTEMS = ["Circuit Breaker Pattern", "Connection Pooling", "Load Shedding", "Retry Budgets",
+           "Cache Invalidation", "Rate Limiting", "Queue Sizing", "Service Mesh Routing",
+           "Database Sharding", "Autoscaling Policy", "Consensus Timeouts", "Backpressure Signals"]
+TOPICS = ["API Design", "Database Architecture", "Caching Strategy", "Incident Response",
+          "Capacity Planning", "Observability", "Deployment Safety", "Data Pipelines"]
+WORDS = ("latency throughput queue buffer voltage current resistance capacitor load "
+         "pressure flow gradient saturation oscillation stability margin jitter "
+         "variance tail budget threshold signal noise feedback loop drift").split()
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+def _paragraph(rng: random.Random, sentences: int = 3) -> str:
+    return " ".join(_sentence(rng, rng.randint(8, 18)) for _ in range(sentences))
+
+def _title(rng: random.Random) -> str:
+    return f"{rng.choice(CONCEPTS)} → {rng.choice(SYSTEMS)}"
+
+def gemini_mapping(rng: random.Random, n: int) -> str:
+    """'#### N. A $\\rightarrow$ B' mapping with Equation/Mapping/Failure/Constraint bullets"""
+    concept, system = rng.choice(CONCEPTS), rng.choice(SYSTEMS)
+    return (f"#### {n}. {concept} $\\rightarrow$ {system}\n"
+            f"**Equation:**\n$$x_{{{n}}}(t) = K_{{p}} e(t) + K_{{d}} \\frac{{de}}{{dt}}$$\n"
+            f"(Where $e(t)$ is the {rng.choice(WORDS)} error).\n\n"
+            f"*   **Mapping:**\n"
+            f"    *   $x(t)$: {_sentence(rng, 8)}\n"
+            f"    *   $K_p$: {_sentence(rng, 8)}\n"
+            f"*   **Failure:** **{rng.choice(CONCEPTS)}.** {_paragraph(rng, 2)}\n"
+            f"*   **Constraint:** **{rng.choice(CONCEPTS)}.** {_sentence(rng)}\n\n")
+
+def dialogue_section(rng: random.Random, n: int) -> str:
+    """'#### Dialogue N:' section with quoted User/AI turns and a rating"""
+    turns = []
+    for turn in range(1, rng.randint(2, 4) + 1):
+        turns.append(f"*   **Turn {turn} ({rng.choice(TOPICS)}):**\n"
+                     f"    *   **User:** \"{_sentence(rng, 12)[:-1]}?\"\n"
+                     f"    *   **AI:** \"We should model this with **{rng.choice(CONCEPTS)}**: "
+                     f"$P = I^2 R$. {_paragraph(rng, 3)}\"\n")
+    return (f"#### Dialogue {n}: {rng.choice(TOPICS)}\n"
+            f"**Principle:** {rng.choice(DOMAINS)} ({rng.choice(CONCEPTS)})\n\n"
+            + "\n".join(turns) +
+            f"\n**Rating:**\n*   *Consistency:* {rng.randint(3, 5)}/5\n\n***\n\n")
+
+def kimi_mapping(rng: random.Random, n: int) -> str:
+    """'## **Mapping N: Title**' section with a fenced equation and bold subheadings"""
+    return (f"## **Mapping {n}: {_title(rng)}**\n\n"
+            f"**{rng.choice(DOMAINS)} Equation**\n```\nRe = (rho * v * L) / mu + {n}\n```\n"
+            f"Where {_sentence(rng, 10)}\n\n"
+            f"**Variable Mapping to Software**\n"
+            f"- **Velocity (v)** → {_sentence(rng, 6)}\n"
+            f"- **Viscosity (mu)** → {_sentence(rng, 6)}\n\n"
+            f"**Failure Mode**\n- {_paragraph(rng, 2)}\n\n"
+            f"**Real Physical Constraint**\n- {_sentence(rng)}\n\n---\n\n")
+
+def fenced_conversation(rng: random.Random, n: int) -> str:
+    """Pre-formatted <|user|>/<|assistant|> conversation in a bare code fence"""
+    return (f"```\n<|user|>\n{_sentence(rng, 12)[:-1]}? (case {n})\n<|end|>\n<|assistant|>\n"
+            f"<think>\nStarting from {rng.choice(CONCEPTS)}: {_paragraph(rng, 2)}\n</think>\n"
+            f"{_paragraph(rng, 4)}\n<|end|>\n```\n\n")
+
+def grok_principle(rng: random.Random, n: int) -> str:
+    """'N. **Title**' numbered principle with principle/variable/failure/constraint/EE lines"""
+    return (f"{n}. **{_title(rng)}**\n"
+            f"   - {rng.choice(DOMAINS)} principle: {_sentence(rng)}\n"
+            f"   - Variable mapping:  \n     T = {_sentence(rng, 6)}  \n     Q = {_sentence(rng, 6)}\n"
+            f"   - Failure scenario: {_sentence(rng)}\n"
+            f"   - Real constraint: {_sentence(rng)}\n"
+            f"   - EE analogy: {_sentence(rng)}\n\n")
+
+def inline_code_review(rng: random.Random, n: int) -> str:
+    """One python fence holding '# BEFORE' / '# ❌ Violates' / '# AFTER' / '# ✅ Respects'"""
+    return (f"```python\n# {n}. {rng.choice(SYSTEMS)} done wrong\nimport time\n\n# BEFORE\n"
+            f"def bad_implementation(items):\n    results = []\n    for item in items:\n"
+            f"        results.append(fetch(item))  # sequential {rng.choice(WORDS)}\n    return results\n"
+            f"# ❌ Violates: {rng.choice(CONCEPTS)}. {_sentence(rng)}\n"
+            f"# Analogy: {_sentence(rng)}\n\n# AFTER\n"
+            f"def good_implementation(items):\n    with pool(limit={rng.randint(4, 64)}) as p:\n"
+            f"        return p.map(fetch, items)\n"
+            f"# ✅ Respects: {rng.choice(CONCEPTS)}. {_sentence(rng)}\n```\n\n")
+
+def split_code_review(rng: random.Random, n: int) -> str:
+    """BEFORE and AFTER in separate python fences with ❌/✅ prose between them"""
+    return (f"**Review {n}: {rng.choice(SYSTEMS)}**\n\n```python\n"
+            f"def handler(request):\n    conn = connect()  # new connection per call\n"
+            f"    return conn.query(request.sql)\n```\n"
+            f"❌ Violates: {rng.choice(CONCEPTS)} ({_sentence(rng, 8)})\n\n```python\n"
+            f"POOL = make_pool(size={rng.randint(4, 64)})\n\ndef handler(request):\n"
+            f"    with POOL.acquire() as conn:\n        return conn.query(request.sql)\n```\n"
+            f"✅ Respects: {rng.choice(CONCEPTS)}\n\n")
+
+def principle_conflict(rng: random.Random, n: int) -> str:
+    """'N. **A vs B**' with Principle 1/2, Conflict, Trade-off and Real-world constraint"""
+    return (f"{n}. **{rng.choice(CONCEPTS)} vs {rng.choice(CONCEPTS)}**\n"
+            f"   - **Principle 1**: {_sentence(rng)}\n"
+            f"   - **Principle 2**: {_sentence(rng)}\n"
+            f"   - **Conflict**: {_sentence(rng)}\n"
+            f"   - **Trade-off strategy**: {_paragraph(rng, 2)}\n"
+            f"   - **Real-world constraint**: {_sentence(rng)}\n\n")
+
+def failure_scenario(rng: random.Random, n: int) -> str:
+    """'N. **Scenario**' with Broken Principle/Signature/Diagnosis/Physics-based fix"""
+    return (f"{n}. **Scenario**: {_sentence(rng)}\n"
+            f"   **Broken Principle**: {rng.choice(CONCEPTS)}\n"
+            f"   **Signature**: {_sentence(rng)}\n"
+            f"   **Diagnosis**: {_sentence(rng)}\n"
+            f"   **Physics-based fix**: {_sentence(rng)}\n\n")
+
+# File kind -> (directory, heading, section generators cycled through)
+FILE_KINDS = {
+    'gemini': (ENGINEERING_DIR, "### Part 1: {domain} Mappings",
+               [gemini_mapping, gemini_mapping, dialogue_section]),
+    'kimi': (ENGINEERING_DIR, "# {domain} → Distributed Systems",
+             [kimi_mapping, kimi_mapping, fenced_conversation]),
+    'groks': (ENGINEERING_DIR, "### {domain} ↔ Distributed Systems Mappings",
+              [grok_principle, inline_code_review, split_code_review]),
+    'groks-failures': (ENGINEERING_DIR, "### {domain} Conflicts and Failures",
+                       [principle_conflict, failure_scenario]),
+    'philosophy': (PHILOSOPHY_DIR, "# {domain} and Consciousness",
+                   [fenced_conversation, dialogue_section]),
+}
+
+def generate_file(rng: random.Random, kind: str, file_size: int) -> str:
+    """One markdown file of about file_size characters"""
+    _, heading, sections = FILE_KINDS[kind]
+    parts = [heading.format(domain=rng.choice(DOMAINS)) + "\n\n"]
+    length = len(parts[0])
+    n = 0
+    while length < file_size:
+        n += 1
+        section = sections[n % len(sections)](rng, n)
+        parts.append(section)
+        length += len(section)
+    return "".join(parts)
+
+def generate_corpus(corpus_dir: Path, size: int, seed: int = 0,
+                    file_size: int = DEFAULT_FILE_SIZE) -> dict:
+    """Write a synthetic corpus of about size bytes under corpus_dir, file by file"""
+    rng = random.Random(seed)
+    for directory in (ENGINEERING_DIR, PHILOSOPHY_DIR):
+        (corpus_dir / directory).mkdir(parents=True, exist_ok=True)
+    (corpus_dir / "minimax-m2-aetherpro-training" / "output").mkdir(parents=True, exist_ok=True)
+
+    kinds = list(FILE_KINDS)
+    written = files = 0
+    while written < size:
+        kind = kinds[files % len(kinds)]
+        data = generate_file(rng, kind, min(file_size, max(size - written, 1024))).encode('utf-8')
+        path = corpus_dir / FILE_KINDS[kind][0] / f"{kind}-synthetic-{files:06d}.md"
+        path.write_bytes(data)
+        written += len(data)
+        files += 1
+
+    manifest = {"size": size, "seed": seed, "file_size": file_size,
+                "files": files, "bytes": written}
+    with open(corpus_dir / CORPUS_MANIFEST, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def load_or_generate_corpus(corpus_dir: Path, size: int, seed: int, file_size: int) -> dict:
+    """Reuse corpus_dir if it was generated with the same parameters"""
+    manifest_path = corpus_dir / CORPUS_MANIFEST
+    if manifest_path.exists():
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if (manifest['size'], manifest['seed'], manifest['file_size']) == (size, seed, file_size):
+            return manifest
+        for stale in corpus_dir.glob("*/*-synthetic-*.md"):
+            stale.unlink()
+    print(f"Generating {size / 1024 ** 2:.1f} MB synthetic corpus in {corpus_dir}...")
+    return generate_corpus(corpus_dir, size, seed, file_size)
+
+def corpus_files(corpus_dir: Path) -> list:
+    return sorted((corpus_dir / ENGINEERING_DIR).glob("*.md")) + \
+           sorted((corpus_dir / PHILOSOPHY_DIR).glob("*.md"))
+
+# ---------------------------------------------------------------------------
+# Benchmark units (each runs in its own process)
+# ---------------------------------------------------------------------------
+
+def extractor_units(base_dir: str) -> dict:
+    """Extractor name -> function(content) returning its examples"""
+    cp = ComprehensiveParser(base_dir)
+    mp = MaximumExtractionParser(base_dir)
+    return {
+        'markdown_blocks.tokenize': markdown_blocks.tokenize,
+        'extract_numbered_principles': lambda content: cp.extract_numbered_principles(content, "Synthetic"),
+        'extract_code_reviews': cp.extract_code_reviews,
+        'extract_dialogue_sections': lambda content: cp.extract_dialogue_sections(
+            content, markdown_blocks.tokenize(content)),
+        'extract_principle_conflicts': mp.extract_principle_conflicts,
+        'extract_failure_scenarios': mp.extract_failure_scenarios,
+        'extract_inline_code_examples': mp.extract_inline_code_examples,
+    }
+
+SCORERS = {
+    'ComprehensiveParser.calculate_quality_score': ComprehensiveParser,
+    'FinalParser.calculate_quality_score': FinalParser,
+}
+
+def _peak_rss_mb() -> float:
+    """Peak resident memory of this process so far, in MB (None if unknown)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def run_unit(kind: str, name: str, corpus_dir: str) -> dict:
+    """Time one extractor, scorer or parser over the corpus (in a worker process)"""
+    files = corpus_files(Path(corpus_dir))
+    baseline_rss = _peak_rss_mb()
+    seconds = 0.0
+    processed = 0       # Bytes handed to the unit
+    examples = 0
+
+    if kind == 'extractor':
+        extract = extractor_units(corpus_dir)[name]
+        for filepath in files:
+            content = filepath.read_text(encoding='utf-8', errors='ignore')
+            start = time.perf_counter()
+            examples += len(extract(content))
+            seconds += time.perf_counter() - start
+            processed += len(content.encode('utf-8'))
+
+    elif kind == 'scorer':
+        extracting = ComprehensiveParser(corpus_dir)
+        score = SCORERS[name](corpus_dir).calculate_quality_score
+        for filepath in files:
+            content = filepath.read_text(encoding='utf-8', errors='ignore')
+            texts = [text for _, group in extracting.run_extractors(content, filepath) for text in group]
+            start = time.perf_counter()
+            for text in texts:
+                score(text)
+            seconds += time.perf_counter() - start
+            examples += len(texts)
+            processed += sum(len(text.encode('utf-8')) for text in texts)
+
+    else:
+        parser_cls = {cls.__name__: cls for cls in PARSER_CLASSES}[name]
+        parser = parser_cls(corpus_dir)
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            for _ in parser.iter_examples():
+                examples += 1
+        seconds = time.perf_counter() - start
+        processed = sum(filepath.stat().st_size for filepath in files)
+
+    peak_rss = _peak_rss_mb()
+    seconds = max(seconds, 1e-9)
+    return {
+        'kind': kind,
+        'seconds': seconds,
+        'bytes': processed,
+        'examples': examples,
+        'mb_per_s': processed / 1024 ** 2 / seconds,
+        'examples_per_s': examples / seconds,
+        'peak_rss_mb': peak_rss,
+        'peak_rss_growth_mb': peak_rss - baseline_rss if peak_rss is not None else None,
+    }
+
+def run_benchmarks(corpus_dir: Path, units: list) -> dict:
+    """Run (kind, name) units one at a time, each in a fresh process"""
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for kind, name in units:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results[name] = pool.submit(run_unit, kind, name, str(corpus_dir)).result()
+        result = results[name]
+        print(f"  {name:48} {result['mb_per_s']:9.2f} MB/s {result['examples_per_s']:11.1f} ex/s")
+    return results
+
+def git_commit() -> str:
+    """Current commit of the repository, if it is a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: dict, baseline: dict, tolerance: float) -> int:
+    """Print throughput against a baseline results file; returns the regression count"""
+    regressions = 0
+    print(f"\nComparison with {baseline.get('commit') or 'baseline'}:")
+    for name, result in results['units'].items():
+        old = baseline.get('units', {}).get(name)
+        if not old:
+            continue
+        ratio = result['mb_per_s'] / old['mb_per_s'] if old['mb_per_s'] else float('inf')
+        regressed = ratio < 1 - tolerance
+        regressions += regressed
+        status = "❌" if regressed else "✅"
+        print(f"  {status} {name:48} {old['mb_per_s']:9.2f} -> {result['mb_per_s']:9.2f} MB/s ({ratio:5.2f}x)")
+    return regressions
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--corpus-dir", type=Path, default=Path("/tmp/synthetic-corpus"),
+                            help="Where the synthetic corpus is generated (reused if the parameters match)")
+    arg_parser.add_argument("--size", default="1MB",
+                            help="Corpus size, e.g. 1MB, 500MB, 10GB (default: 1MB)")
+    arg_parser.add_argument("--seed", type=int, default=0,
+                            help="Seed of the corpus generator")
+    arg_parser.add_argument("--file-size", default=str(DEFAULT_FILE_SIZE),
+                            help=f"Approximate size of each generated file (default: {DEFAULT_FILE_SIZE})")
+    arg_parser.add_argument("--skip-parsers", action="store_true",
+                            help="Only benchmark the individual extractors and scorers")
+    arg_parser.add_argument("--json", type=Path, default=None,
+                            help="Write results to this JSON file")
+    arg_parser.add_argument("--compare", type=Path, default=None,
+                            help="Results JSON of an earlier run to compare throughput against")
+    arg_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                            help=f"Throughput drop counted as a regression (default: {DEFAULT_TOLERANCE:g})")
+    args = arg_parser.parse_args()
+
+    corpus = load_or_generate_corpus(args.corpus_dir, parse_size(args.size), args.seed,
+                                     parse_size(args.file_size))
+
+    units = [('extractor', name) for name in extractor_units(str(args.corpus_dir))]
+    units += [('scorer', name) for name in SCORERS]
+    if not args.skip_parsers:
+        units += [('parser', cls.__name__) for cls in PARSER_CLASSES]
+
+    print("="*78)
+    print("EXTRACTOR BENCHMARK")
+    print(f"Corpus: {corpus['bytes'] / 1024 ** 2:.1f} MB in {corpus['files']} files (seed {corpus['seed']})")
+    print("="*78)
+    results = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'corpus': corpus,
+        'units': run_benchmarks(args.corpus_dir, units),
+    }
+
+    print(f"\n{'unit':48} {'seconds':>9} {'examples':>9} {'peak RSS MB':>12}")
+    for name, result in results['units'].items():
+        peak = f"{result['peak_rss_mb']:12.1f}" if result['peak_rss_mb'] is not None else f"{'n/a':>12}"
+        print(f"{name:48} {result['seconds']:9.3f} {result['examples']:9d} {peak}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {regressions} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+File Discovery - Parallel walk of the source roots with include/exclude rules
+Every source group the parsers read (engineering files, philosophy files
+minus meta documents, AetherPro docs, messages-format JSON) is described
+once in DISCOVERY_RULES as a root plus glob/regex rules, compiled once.
+Roots and subdirectories are scanned on a thread pool; the result can be
+written as a sorted manifest of (path, size, mtime, sha256) whose hashes
+are reused for unchanged files and can key the extraction cache
+"""
+
+import os
+import re
+import json
+import fnmatch
+import hashlib
+import argparse
+from pathlib import Path
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from jsonl_writer import write_json_atomic
+
+ENGINEERING_DIR = "First-Principles-Failures-Engineering-&-Deugging"
+PHILOSOPHY_DIR = "Corys-claude-convos-peronality-datasets"
+TRAINING_DIR = "minimax-m2-aetherpro-training"
+
+# Source groups: root (relative to the base dir), whether it is walked
+# recursively, and include/exclude rules matched against the path relative
+# to the root. A rule is a glob, or a regex (searched) when prefixed "re:"
+DISCOVERY_RULES = {
+    'engineering': dict(root=ENGINEERING_DIR, include=['*.md'],
+                        exclude=['Weighting-Value-Table.md']),
+    'philosophy': dict(root=PHILOSOPHY_DIR, include=['*.md'],
+                       exclude=['*README*', '*EXECUTIVE*']),
+    'philosophy_curated': dict(root=PHILOSOPHY_DIR, include=['*.md'],
+                               exclude=['*README*', '*EXECUTIVE*', '*QUICK_START*']),
+    'philosophy_enhanced': dict(root=PHILOSOPHY_DIR, include=['*.md'],
+                                exclude=['*README*', '*EXECUTIVE*', '*QUICK_START*', '*Dossier*']),
+    'aetherpro_docs': dict(root=f"{TRAINING_DIR}/aetherpro_docs", recursive=True, include=['*.md']),
+    # Key architecture docs only, in the order they are parsed
+    'aetherpro_key_docs': dict(root=f"{TRAINING_DIR}/aetherpro_docs", recursive=True, include=[
+        'architecture/TRIAD-Complete-Build-Spec-Cory-Method.md',
+        'architecture/Mastro-Kimi-Powered-Orchestration-Agent.md',
+        'architecture/AetherAI-Triad-Intelligence-Dataset-Tips.md',
+        'philosophy/Corys-Dossier-Sovereign-AI.md',
+    ]),
+    # Messages-format JSON datasets, plain or compressed (not frame sidecars)
+    'messages': dict(root=TRAINING_DIR, include=[r're:^[^/]*\.json(\.gz|\.zst|\.zstd)?$'],
+                     exclude=['*.frames.json']),
+}
+
+DEFAULT_DISCOVERY_WORKERS = 8
+MANIFEST_VERSION = 1
+
+# path: absolute Path; groups: names of the groups the file belongs to
+FileEntry = namedtuple('FileEntry', 'path size mtime_ns sha256 groups')
+
+class RuleSet:
+    """Compiled include/exclude rules of one source group"""
+
+    def __init__(self, include: list, exclude: list = ()):
+        self.include = self._compile(include)
+        self.exclude = self._compile(exclude)
+        self.order = list(include)
+
+    @staticmethod
+    def _compile(rules: list) -> tuple:
+        """(glob regex, searched regex) covering every rule, either None if unused"""
+        globs = [fnmatch.translate(rule) for rule in rules if not rule.startswith('re:')]
+        regexes = [rule[len('re:'):] for rule in rules if rule.startswith('re:')]
+        return (re.compile('|'.join(globs)) if globs else None,
+                re.compile('|'.join(f'(?:{regex})' for regex in regexes)) if regexes else None)
+
+    @staticmethod
+    def _matches(compiled: tuple, relpath: str) -> bool:
+        globs, regexes = compiled
+        return bool((globs and globs.match(relpath)) or (regexes and regexes.search(relpath)))
+
+    def matches(self, relpath: str) -> bool:
+        """Whether a path (relative to the group's root, with /) is in the group"""
+        return self._matches(self.include, relpath) and not self._matches(self.exclude, relpath)
+
+RULE_SETS = {name: RuleSet(rules['include'], rules.get('exclude', ()))
+             for name, rules in DISCOVERY_RULES.items()}
+
+def _scan(directory: Path) -> tuple:
+    """(files, subdirectories) of one directory in listing order; files as (name, stat)"""
+    files, subdirs = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        files.append((entry.name, entry.stat()))
+                    elif entry.is_dir() and not entry.is_symlink():
+                        subdirs.append(entry.name)
+                except OSError:
+                    continue        # Vanished or unreadable entry
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    return files, subdirs
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class Discovery:
+    """Files of the requested source groups, found by one parallel walk
+
+    files(group) lists a group in walk order, which is Path.glob /
+    Path.rglob order (directory listing order, parent files before
+    subdirectories); callers that want a sorted list sort it.
+    """
+
+    def __init__(self, base_dir: Path, groups=None, workers: int = DEFAULT_DISCOVERY_WORKERS):
+        self.base_dir = Path(base_dir)
+        self.groups = list(groups or DISCOVERY_RULES)
+        self.workers = workers
+        self.entries = {}       # path -> FileEntry
+        self.rehashed = 0       # Files hashed by hash_files (the rest reused manifest hashes)
+        self._members = {group: [] for group in self.groups}
+        self._walk()
+
+    def _walk(self):
+        # Each distinct root is walked once, even if several groups share it
+        roots = {}
+        for group in self.groups:
+            rules = DISCOVERY_RULES[group]
+            recursive = roots.get(rules['root'], False) or rules.get('recursive', False)
+            roots[rules['root']] = recursive
+
+        listings = {}       # directory -> (files, subdirs)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(_scan, self.base_dir / root): (self.base_dir / root, recursive)
+                       for root, recursive in roots.items()}
+            while pending:
+                future = next(iter(pending))
+                directory, recursive = pending.pop(future)
+                listings[directory] = future.result()
+                if recursive:
+                    for name in listings[directory][1]:
+                        pending[pool.submit(_scan, directory / name)] = (directory / name, True)
+
+        for root, recursive in roots.items():
+            root_dir = self.base_dir / root
+            groups = [group for group in self.groups if DISCOVERY_RULES[group]['root'] == root]
+            for path, stat in self._flatten(listings, root_dir, recursive):
+                relpath = path.relative_to(root_dir).as_posix()
+                member_of = [group for group in groups if RULE_SETS[group].matches(relpath)
+                             and ('/' not in relpath or DISCOVERY_RULES[group].get('recursive'))]
+                if not member_of:
+                    continue
+                self.entries[path] = FileEntry(path, stat.st_size, stat.st_mtime_ns, None, member_of)
+                for group in member_of:
+                    self._members[group].append(path)
+
+    @staticmethod
+    def _flatten(listings: dict, directory: Path, recursive: bool):
+        """(path, stat) of a scanned tree: a directory's files, then each subdirectory's"""
+        files, subdirs = listings.get(directory, ([], []))
+        for name, stat in files:
+            yield directory / name, stat
+        if recursive:
+            for name in subdirs:
+                yield from Discovery._flatten(listings, directory / name, True)
+
+    def files(self, group: str) -> list:
+        """Paths in a group, in walk order"""
+        return list(self._members[group])
+
+    def ordered(self, group: str) -> list:
+        """Paths in a group ordered by its include list (for groups of named files)"""
+        order = RULE_SETS[group].order
+        relpath = lambda path: path.relative_to(self.base_dir / DISCOVERY_RULES[group]['root']).as_posix()
+        return sorted(self._members[group], key=lambda path: order.index(relpath(path))
+                      if relpath(path) in order else len(order))
+
+    def digest(self, path: Path) -> str:
+        """sha256 of a file from the manifest, None if it wasn't hashed"""
+        entry = self.entries.get(Path(path))
+        return entry.sha256 if entry else None
+
+    def hash_files(self, previous: dict = None):
+        """Fill in every file's sha256, reusing previous hashes of unchanged files
+
+        previous is a loaded manifest; a file is unchanged when its size
+        and mtime match. New or changed files are hashed in parallel.
+        """
+        known = {}
+        for record in (previous or {}).get('files', []):
+            known[record['path']] = record
+        stale = []
+        for path, entry in self.entries.items():
+            record = known.get(self.relative(path))
+            if record and (record['size'], record['mtime_ns']) == (entry.size, entry.mtime_ns):
+                self.entries[path] = entry._replace(sha256=record['sha256'])
+            else:
+                stale.append(path)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for path, sha256 in zip(stale, pool.map(_file_sha256, stale)):
+                self.entries[path] = self.entries[path]._replace(sha256=sha256)
+        self.rehashed = len(stale)
+
+    def relative(self, path: Path) -> str:
+        return Path(path).relative_to(self.base_dir).as_posix()
+
+    def manifest(self) -> dict:
+        """Sorted manifest of the discovered files"""
+        return {
+            "version": MANIFEST_VERSION,
+            "base_dir": str(self.base_dir),
+            "groups": self.groups,
+            "files": [{"path": self.relative(entry.path), "size": entry.size,
+                       "mtime_ns": entry.mtime_ns, "sha256": entry.sha256,
+                       "groups": entry.groups}
+                      for entry in sorted(self.entries.values(), key=lambda e: self.relative(e.path))],
+        }
+
+    def write_manifest(self, path: Path):
+        write_json_atomic(Path(path), self.manifest(), indent=1)
+
+def load_manifest(path: Path) -> dict:
+    """A manifest written by an earlier run, or None if missing or unreadable"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == MANIFEST_VERSION else None
+
+def discover(base_dir: Path, groups=None, workers: int = DEFAULT_DISCOVERY_WORKERS,
+             manifest_path: Path = None) -> Discovery:
+    """Walk the groups' roots; with manifest_path, hash the files and (re)write the manifest"""
+    discovery = Discovery(base_dir, groups, workers)
+    if manifest_path:
+        discovery.hash_files(load_manifest(manifest_path))
+        discovery.write_manifest(manifest_path)
+    return discovery
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('base_dir', type=Path, help="Dataset-Curator checkout to walk")
+    arg_parser.add_argument('--group', action='append', choices=sorted(DISCOVERY_RULES), default=None,
+                            help="Source group to discover (repeatable; default: all)")
+    arg_parser.add_argument('--workers', type=int, default=DEFAULT_DISCOVERY_WORKERS,
+                            help=f"Threads scanning directories and hashing files (default: {DEFAULT_DISCOVERY_WORKERS})")
+    arg_parser.add_argument('--manifest', type=Path, default=None,
+                            help="Write a sorted (path, size, mtime, sha256) manifest here, reusing its hashes for unchanged files")
+    args = arg_parser.parse_args()
+
+    discovery = discover(args.base_dir, args.group, args.workers, args.manifest)
+    for group in discovery.groups:
+        files = discovery.files(group)
+        size = sum(discovery.entries[path].size for path in files)
+        print(f"  {group:22s}: {len(files):6d} files, {size / 1024 ** 2:8.1f} MB")
+    if args.manifest:
+        print(f"\n✅ Manifest: {args.manifest} ({len(discovery.entries)} files, "
+              f"{discovery.rehashed} hashed, {len(discovery.entries) - discovery.rehashed} reused)")
+
+if __name__ == "__main__":
+    main()
@@ -6,50 +6,48 @@ Extracts all high-quality examples from markdown files
 
 import os
 import json
-import re
 from pathlib import Path
 from collections import defaultdict
+from extraction_cache import ExtractionCache
+from dataset_outputs import DatasetOutputs
+from file_discovery import Discovery, ENGINEERING_DIR, PHILOSOPHY_DIR
+import patterns
+import markdown_blocks
 
 class FinalParser:
-    def __init__(self, base_dir: str):
+    def __init__(self, base_dir: str, cache_dir: str = None, **output_options):
         self.base_dir = Path(base_dir)
         self.examples = []
         self.stats = defaultdict(int)
+        self.cache = ExtractionCache(cache_dir, type(self)) if cache_dir else None
+        # Exact-repeat filter, shards, compression, columnar copy and offset
+        # indexes of the outputs; fails here if one needs a missing package
+        self.outputs = DatasetOutputs(**output_options)
 
-    def extract_code_block_conversations(self, content: str) -> list:
+    def extract_code_block_conversations(self, content: str, blocks: list) -> list:
         """Extract conversations from code blocks"""
-        # Pattern for code blocks containing conversations
-        pattern = r'```\s*\n(<\|user\|>.*?<\|end\|>)\s*\n```'
-        matches = re.findall(pattern, content, re.DOTALL)
-        return matches
+        # Code blocks containing conversations
+        return markdown_blocks.fence_conversations(content, blocks, patterns.FENCED_CONVERSATION)
 
-    def extract_mapping_sections(self, content: str) -> list:
+    def extract_mapping_sections(self, content: str, blocks: list) -> list:
         """Extract technical mapping sections and convert to Q&A"""
         examples = []
 
-        # Split by mapping/dialogue headers
-        sections = re.split(r'\n##\s+\*?\*?(?:Mapping|Dialogue)\s+\d+:?\s+', content)
-
-        # Find the headers too
-        headers = re.findall(r'\n##\s+\*?\*?(?:Mapping|Dialogue)\s+\d+:?\s+(.*?)\n', content)
-
-        for i, section in enumerate(sections[1:], 0):  # Skip first split (before any mapping)
-            if i >= len(headers):
-                break
-
-            title = headers[i].strip().rstrip('*')
+        # Sections under mapping/dialogue headers
+        for title, section in markdown_blocks.numbered_sections(content, blocks):
+            title = title.strip().rstrip('*')
 
             # Extract components
-            equation_match = re.search(r'```\s*\n(.*?)\n```', section, re.DOTALL)
+            equation_match = patterns.FP_EQUATION_FENCE.search(section)
             equation = equation_match.group(1).strip() if equation_match else ""
 
-            failure_match = re.search(r'\*\*Failure Mode?\*?\*?\s*\n(.*?)(?=\n\*\*|\n##|\Z)', section, re.DOTALL)
+            failure_match = patterns.FP_FAILURE_MODE.search(section)
             failure = failure_match.group(1).strip() if failure_match else ""
 
-            constraint_match = re.search(r'\*\*(?:Real|Constraint).*?\*\*\s*\n(.*?)(?=\n\*\*|\n##|\Z)', section, re.DOTALL)
+            constraint_match = patterns.FP_CONSTRAINT.search(section)
             constraint = constraint_match.group(1).strip() if constraint_match else ""
 
-            variables_match = re.search(r'\*\*Variable Mapping.*?\*\*\s*\n(.*?)(?=\n\*\*|\Z)', section, re.DOTALL)
+            variables_match = patterns.FP_VARIABLE_MAPPING.search(section)
             variables = variables_match.group(1).strip() if variables_match else ""
 
             # Need at least equation or failure to create example
@@ -97,23 +95,19 @@ class FinalParser:
 
         return examples
 
-    def extract_dialogue_sections(self, content: str) -> list:
+    def extract_dialogue_sections(self, content: str, blocks: list) -> list:
         """Extract multi-turn dialogues"""
         examples = []
 
         # Find dialogue blocks
-        dialogue_blocks = re.findall(r'####?\s+Dialogue\s+\d+:.*?\n(.*?)(?=####?\s+Dialogue|\Z)', content, re.DOTALL)
+        dialogue_blocks = markdown_blocks.dialogue_sections(content, blocks)
 
         for dialogue_content in dialogue_blocks:
             # Extract individual turns
             turns = []
 
             # Pattern for Turn X format
-            turn_matches = re.findall(
-                r'\*\s+\*\*Turn\s+\d+.*?\*\*User:\*\*\s*["\u201c]?(.*?)["\u201d]?\s*\*\*AI:\*\*\s*["\u201c]?(.*?)["\u201d]?(?=\n\s*\*\s+\*\*Turn|\n\*\*Rating|\Z)',
-                dialogue_content,
-                re.DOTALL
-            )
+            turn_matches = patterns.DIALOGUE_TURN.findall(dialogue_content)
 
             if not turn_matches:
                 continue
@@ -126,7 +120,7 @@ class FinalParser:
                 ai_text = ai_text.strip()
 
                 # Extract or generate thinking
-                thinking_match = re.search(r'((?:We should|This is|Starting from|Applying).*?(?:equation|principle).*?\.)', ai_text, re.DOTALL)
+                thinking_match = patterns.FP_THINKING_SENTENCE.search(ai_text)
                 if thinking_match:
                     thinking = thinking_match.group(1)
                     response = ai_text.replace(thinking, '').strip()
@@ -147,21 +141,24 @@ class FinalParser:
         """Calculate quality score based on content"""
         score = 6  # Base score
 
+        # Equation, references, failure mode and <think> block in one scan
+        found = patterns.FP_QUALITY.scan(text)
+
         # Has equation
-        if re.search(r'\$\$.*?\$\$|\$.*?\$|```', text):
+        if 'equation' in found:
             score += 1
 
         # Has principle/constraint references
-        if re.search(r'NEC|IEEE|Shannon|Nyquist|theorem|principle|constraint', text, re.IGNORECASE):
+        if 'reference' in found:
             score += 1
 
         # Has failure mode
-        if re.search(r'failure|fail|error|fault|cascade|violate', text, re.IGNORECASE):
+        if 'failure' in found:
             score += 1
 
         # Has substantial thinking
-        thinking_match = re.search(r'<think>(.*?)</think>', text, re.DOTALL)
-        if thinking_match and len(thinking_match.group(1)) > 200:
+        thinking = found.get('thinking', '')[len('<think>'):-len('</think>')]
+        if len(thinking) > 200:
             score += 1
 
         # Multi-turn
@@ -204,141 +201,174 @@ class FinalParser:
         else:
             return 'first_principles_generated'
 
-    def process_file(self, filepath: Path):
-        """Process a single markdown file"""
-        print(f"Processing: {filepath.name}")
+    def extract_file(self, content: str, filepath: Path) -> tuple:
+        """Extract examples from one file's content
 
-        content = filepath.read_text(encoding='utf-8', errors='ignore')
+        Returns (counts, examples) where counts is a list of (label, count) pairs.
+        """
         source = self.determine_source(filepath)
-
-        extracted_texts = []
+        blocks = markdown_blocks.tokenize(content)
+        groups = []
 
         # Extract pre-formatted conversations from code blocks
-        conv_blocks = self.extract_code_block_conversations(content)
-        extracted_texts.extend(conv_blocks)
-        if conv_blocks:
-            print(f"  Found {len(conv_blocks)} pre-formatted conversations")
+        groups.append(("pre-formatted conversations", self.extract_code_block_conversations(content, blocks)))
 
         # Extract dialogue sections
-        dialogues = self.extract_dialogue_sections(content)
-        extracted_texts.extend(dialogues)
-        if dialogues:
-            print(f"  Found {len(dialogues)} dialogue sections")
+        groups.append(("dialogue sections", self.extract_dialogue_sections(content, blocks)))
 
         # Extract mapping sections (only for technical files)
         if 'First-Principles' in str(filepath) or 'engineering' in str(filepath).lower():
-            mappings = self.extract_mapping_sections(content)
-            extracted_texts.extend(mappings)
-            if mappings:
-                print(f"  Found {len(mappings)} technical mappings")
+            groups.append(("technical mappings", self.extract_mapping_sections(content, blocks)))
 
         # Create examples from extracted texts
-        for text in extracted_texts:
+        examples = []
+        for _, texts in groups:
+            examples.extend(self.make_examples(texts, filepath, source))
+
+        counts = [(label, len(texts)) for label, texts in groups]
+        return counts, examples
+
+    def make_examples(self, texts: list, filepath: Path, source: str = None) -> list:
+        """Scored and categorized examples for the texts extracted from one file"""
+        if source is None:
+            source = self.determine_source(filepath)
+        examples = []
+        for text in texts:
             quality_score = self.calculate_quality_score(text)
             category = self.determine_category(text, filepath)
 
-            self.examples.append({
+            examples.append({
                 "text": text,
                 "source": source,
                 "category": category,
                 "quality_score": quality_score
             })
+        return examples
 
-    def process_all_files(self):
-        """Process all files in dataset"""
+    def extract_cached(self, filepath: Path) -> tuple:
+        """extract_file, served from the extraction cache when the file is unchanged"""
+        content = filepath.read_text(encoding='utf-8', errors='ignore')
+        if self.cache is None:
+            return self.extract_file(content, filepath)
+        return self.cache.cached_call(filepath, content, "",
+                                      lambda: self.extract_file(content, filepath))
+
+    def report_file(self, filepath: Path, counts: list):
+        """Print what was found in one file"""
+        print(f"Processing: {filepath.name}")
+        for label, count in counts:
+            if count:
+                print(f"  Found {count} {label}")
+
+    def process_file(self, filepath: Path):
+        """Process a single markdown file"""
+        counts, examples = self.extract_cached(filepath)
+        self.report_file(filepath, counts)
+        self.examples.extend(examples)
+
+    def iter_examples(self):
+        """Yield examples file by file, without accumulating them"""
         print("=== Processing Dataset Files ===\n")
+        discovery = Discovery(self.base_dir, ('engineering', 'philosophy_curated'))
 
         # Process engineering files (first principles)
-        eng_dir = self.base_dir / "First-Principles-Failures-Engineering-&-Deugging"
-        if eng_dir.exists():
+        if (self.base_dir / ENGINEERING_DIR).exists():
             print("Processing Engineering/First Principles files:")
-            for md_file in sorted(eng_dir.glob("*.md")):
-                if md_file.name == 'Weighting-Value-Table.md':
-                    continue
-                self.process_file(md_file)
+            for md_file in sorted(discovery.files('engineering')):
+                counts, examples = self.extract_cached(md_file)
+                self.report_file(md_file, counts)
                 self.stats['engineering_files'] += 1
+                yield from examples
             print()
 
         # Process philosophy files
-        phil_dir = self.base_dir / "Corys-claude-convos-peronality-datasets"
-        if phil_dir.exists():
+        if (self.base_dir / PHILOSOPHY_DIR).exists():
             print("Processing Philosophy/Personality files:")
-            for md_file in sorted(phil_dir.glob("*.md")):
-                if any(skip in md_file.name for skip in ['README', 'EXECUTIVE', 'QUICK_START']):
-                    continue
-                self.process_file(md_file)
+            for md_file in sorted(discovery.files('philosophy_curated')):
+                counts, examples = self.extract_cached(md_file)
+                self.report_file(md_file, counts)
                 self.stats['philosophy_files'] += 1
+                yield from examples
             print()
 
+        if self.cache:
+            print(self.cache.summary())
+
+    def process_all_files(self):
+        """Process all files in dataset"""
+        self.examples.extend(self.iter_examples())
         print(f"✅ Total examples extracted: {len(self.examples)}\n")
 
     def write_jsonl(self, output_path: Path, examples: list):
         """Write examples to JSONL file"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for example in examples:
-                json_line = json.dumps(example, ensure_ascii=False)
-                f.write(json_line + '\n')
-
-    def generate_outputs(self):
-        """Generate output files and statistics"""
-        output_dir = self.base_dir / "minimax-m2-aetherpro-training" / "output"
-        output_dir.mkdir(exist_ok=True)
-
-        # Filter by quality
-        high_quality = [ex for ex in self.examples if ex['quality_score'] >= 7]
-        medium_quality = [ex for ex in self.examples if ex['quality_score'] >= 6]
+        self.outputs.write_jsonl(output_path, examples)
 
-        print(f"Quality filtering:")
-        print(f"  High quality (>= 7): {len(high_quality)}")
-        print(f"  Medium+ (>= 6): {len(medium_quality)}")
-        print()
+    def generate_outputs(self, examples=None):
+        """Generate output files and statistics
 
-        # Use medium quality as working set
-        working_set = medium_quality
+        examples may be any iterable (e.g. iter_examples()); it is consumed
+        once, so streaming runs never hold the dataset in memory.
+        """
+        if examples is None:
+            examples = self.examples
 
-        # Write main dataset
-        self.write_jsonl(output_dir / "training_dataset.jsonl", working_set)
-        print(f"✅ Wrote {len(working_set)} examples to training_dataset.jsonl")
+        output_dir = self.base_dir / "minimax-m2-aetherpro-training" / "output"
+        output_dir.mkdir(exist_ok=True)
 
-        # Write category-specific files
+        # Category-specific files
         categories = {
             'philosophy': ['philosophy'],
             'code_review': ['code_review'],
             'failure_analysis': ['failure_analysis'],
             'technical': ['first_principles', 'electrical']
         }
+        routes = {"training_dataset.jsonl": None}
+        routes.update({f"{name}_examples.jsonl": cats for name, cats in categories.items()})
+
+        total_examples = 0
+        high_quality = 0
+        working_set = 0
+
+        # Filter by quality (medium+ is the working set), write and count in one pass
+        with self.outputs.open(output_dir, routes, "training_dataset.jsonl",
+                               eager=["training_dataset.jsonl"]) as sinks:
+            for ex in examples:
+                total_examples += 1
+                if ex['quality_score'] >= 7:
+                    high_quality += 1
+                if ex['quality_score'] < 6:
+                    continue
+                if self.outputs.is_repeat(ex['text']):
+                    continue
 
-        for name, cats in categories.items():
-            examples = [ex for ex in working_set if ex['category'] in cats]
-            if examples:
-                self.write_jsonl(output_dir / f"{name}_examples.jsonl", examples)
-                print(f"✅ Wrote {len(examples)} {name} examples")
+                working_set += 1
+                sinks.write(ex)
+
+        print(f"Quality filtering:")
+        print(f"  High quality (>= 7): {high_quality}")
+        print(f"  Medium+ (>= 6): {working_set}")
+        print()
+
+        print(f"✅ Wrote {working_set} examples to training_dataset.jsonl")
+        for name in categories:
+            count = sinks.counts[f"{name}_examples.jsonl"]
+            if count:
+                print(f"✅ Wrote {count} {name} examples")
+
+        self.outputs.report()
 
         # Generate statistics
         stats = {
-            "total_examples": len(self.examples),
-            "working_set_examples": len(working_set),
+            "total_examples": total_examples,
+            "working_set_examples": working_set,
             "files_processed": dict(self.stats),
-            "category_distribution": {},
-            "source_distribution": {},
-            "quality_distribution": {}
+            **sinks.stats.distributions()
         }
-
-        for ex in working_set:
-            stats['category_distribution'][ex['category']] = \
-                stats['category_distribution'].get(ex['category'], 0) + 1
-            stats['source_distribution'][ex['source']] = \
-                stats['source_distribution'].get(ex['source'], 0) + 1
-            stats['quality_distribution'][str(ex['quality_score'])] = \
-                stats['quality_distribution'].get(str(ex['quality_score']), 0) + 1
+        stats.update(self.outputs.dedup_stats())
 
         # Calculate percentages
-        total = len(working_set)
-        if total > 0:
-            stats['category_percentages'] = {
-                cat: f"{(count/total)*100:.1f}%"
-                for cat, count in stats['category_distribution'].items()
-            }
+        if sinks.stats.total > 0:
+            stats['category_percentages'] = sinks.stats.category_percentages()
             stats['distribution_target'] = {
                 "current": stats['category_percentages'],
                 "target": {
@@ -349,12 +379,14 @@ class FinalParser:
                 }
             }
 
+        stats.update(sinks.stats.length_summary())
+
         # Write stats
         with open(output_dir / "dataset_stats.json", 'w') as f:
             json.dump(stats, f, indent=2)
 
         print(f"\n=== DATASET SUMMARY ===")
-        print(f"Total examples in dataset: {len(working_set)}")
+        print(f"Total examples in dataset: {working_set}")
         print(f"\nCategory distribution:")
         for cat in sorted(stats['category_distribution'].keys()):
             count = stats['category_distribution'][cat]
@@ -374,12 +406,10 @@ class FinalParser:
         print(f"\n✅ All files saved to: {output_dir}/")
 
 def main():
-    parser = FinalParser("/home/user/Dataset-Curator")
-    parser.process_all_files()
-    parser.generate_outputs()
-    print("\n" + "="*50)
-    print("✅ DATASET PARSING COMPLETE!")
-    print("="*50)
+    # The engine's final preset runs this parser's extractors and writes its outputs
+    from extraction_engine import run_preset
+    run_preset('final', "Final robust parser for MiniMax-M2-AetherPro training",
+               footer="\n" + "="*50 + "\n✅ DATASET PARSING COMPLETE!\n" + "="*50)
 
 if __name__ == "__main__":
     main()
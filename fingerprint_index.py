@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Fingerprint Index - Exact-duplicate filter keyed on normalized example text
+Each text is whitespace-collapsed and hashed to a 128-bit fingerprint. The
+index can persist to an append-only file so later batches also drop
+examples that already shipped in an earlier run
+"""
+
+import os
+import hashlib
+from pathlib import Path
+
+# File header: magic + format version (bump if normalization or hashing changes)
+INDEX_MAGIC = b'FPIDX\x00\x00\x01'
+
+FINGERPRINT_BYTES = 16
+
+def normalize(text: str) -> str:
+    """Collapse every whitespace run to one space and trim the ends"""
+    return ' '.join(text.split())
+
+def fingerprint(text: str) -> int:
+    """128-bit fingerprint of a text's normalized form"""
+    digest = hashlib.blake2b(normalize(text).encode('utf-8'),
+                             digest_size=FINGERPRINT_BYTES).digest()
+    return int.from_bytes(digest, 'little')
+
+class FingerprintIndex:
+    """Set of fingerprints of shipped examples, optionally backed by a file"""
+
+    def __init__(self, path: str = None):
+        self.path = Path(path) if path else None
+        self.fingerprints = set()
+        self.pending = []       # Fingerprints added since the last save
+        self.duplicates = 0
+
+        if self.path and self.path.exists():
+            self._load()
+        self.loaded = len(self.fingerprints)
+
+    def _load(self):
+        """Read every complete record (a torn final append is ignored)"""
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        if not data:
+            return
+        if not data.startswith(INDEX_MAGIC):
+            raise ValueError(f"{self.path} is not a fingerprint index (or has another version)")
+
+        end = len(data) - (len(data) - len(INDEX_MAGIC)) % FINGERPRINT_BYTES
+        view = memoryview(data)
+        self.fingerprints = {int.from_bytes(view[i:i+FINGERPRINT_BYTES], 'little')
+                             for i in range(len(INDEX_MAGIC), end, FINGERPRINT_BYTES)}
+
+    def seen(self, text: str) -> bool:
+        """True (counted as a duplicate) if text repeats a recorded one; records nothing
+
+        For callers that may still drop the text after this check: they
+        add() it only once it is actually written.
+        """
+        if fingerprint(text) in self.fingerprints:
+            self.duplicates += 1
+            return True
+        return False
+
+    def add(self, text: str) -> bool:
+        """Record a text; True if it is new, False if it is an exact repeat"""
+        fp = fingerprint(text)
+        if fp in self.fingerprints:
+            self.duplicates += 1
+            return False
+        self.fingerprints.add(fp)
+        self.pending.append(fp)
+        return True
+
+    def save(self):
+        """Append the fingerprints added since the last save to the index file"""
+        if not self.path or not self.pending:
+            self.pending = []
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'ab') as f:
+            if f.tell() == 0:
+                f.write(INDEX_MAGIC)
+            else:
+                # Drop a torn record left by an interrupted save
+                size = f.tell()
+                torn = (size - len(INDEX_MAGIC)) % FINGERPRINT_BYTES
+                if torn:
+                    f.truncate(size - torn)
+                    f.seek(size - torn)
+            f.write(b''.join(fp.to_bytes(FINGERPRINT_BYTES, 'little') for fp in self.pending))
+            f.flush()
+            os.fsync(f.fileno())
+        self.pending = []
+
+    def summary(self) -> str:
+        """One-line duplicate report"""
+        where = f" ({self.path}, {self.loaded} from earlier runs)" if self.path else ""
+        return f"Exact duplicates dropped: {self.duplicates}{where}"
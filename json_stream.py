@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+JSON Stream - Incremental reader for large files of concatenated JSON values
+Decodes one value at a time from a bounded text buffer with raw_decode, so
+multi-GB datasets never have to be json.load()ed into memory at once
+"""
+
+import json
+from pathlib import Path
+
+from compressed_io import open_input
+
+# Text read per refill; a value larger than this grows the buffer as needed
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Largest single value (in characters) the buffer may grow to hold
+DEFAULT_MAX_VALUE_SIZE = 64 * 1024 * 1024
+
+# Skipped between values: whitespace, plus the commas of a top-level array.
+# The array's own brackets are matched once (an array nested in it is a value)
+_SEPARATORS = frozenset(' \t\r\n,')
+
+# Longest JSON literal raw_decode accepts ("-Infinity"); one cut off by the
+# buffer end fails where it starts until enough of it has been read
+_LONGEST_LITERAL = len('-Infinity')
+
+def iter_json_values(filepath: Path, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     max_value_size: int = DEFAULT_MAX_VALUE_SIZE):
+    """Yield each top-level JSON value of a file in order
+
+    A file that opens with an array ("[{...}, {...}]") yields its elements,
+    so both JSON Lines and array files stream; any other array, an element
+    or a later line, is yielded as a list. gzip and zstd files (*.gz, *.zst) are decompressed on
+    the fly. Raises json.JSONDecodeError if the file ends inside a value,
+    ValueError if it ends inside the top-level array, and ValueError
+    (with the character offset) as soon as a value is malformed: when more
+    text doesn't move the decode error, or the value outgrows
+    max_value_size. A bad record never pulls the rest of the file in.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    offset = 0          # Characters of the file before buffer[0]
+    eof = False
+    last_error = None   # (message, file offset) of the previous failed decode
+    array_start = None  # File offset of the open top-level '[', if any
+    first = True        # Nothing read yet; only the first value may be an array to stream
+
+    with open_input(filepath, errors='ignore') as f:
+        while True:
+            while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+                pos += 1
+
+            if pos == len(buffer):
+                if eof:
+                    if array_start is not None:
+                        raise ValueError(f"{filepath}: top-level array at character "
+                                         f"{array_start} is not closed")
+                    return
+                offset += len(buffer)
+                buffer = f.read(chunk_size)
+                pos = 0
+                eof = not buffer
+                continue
+
+            if first and buffer[pos] == '[':
+                array_start = offset + pos
+                first = False
+                pos += 1
+                continue
+            if array_start is not None and buffer[pos] == ']':
+                array_start = None
+                pos += 1
+                continue
+
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise
+                # A value cut off by the buffer end fails further along once
+                # more text arrives; failing at the same place means the text
+                # itself is bad (an unterminated string always reports its
+                # start, so that case is left to the size limit, and so does
+                # a literal still within reach of the buffer end)
+                error = (exc.msg, offset + exc.pos)
+                if error == last_error and not exc.msg.startswith('Unterminated string') and \
+                   len(buffer) - exc.pos >= _LONGEST_LITERAL:
+                    raise ValueError(f"{filepath}: malformed JSON value at character "
+                                     f"{offset + pos}: {exc.msg} (character {offset + exc.pos})") from exc
+                if len(buffer) - pos > max_value_size:
+                    raise ValueError(f"{filepath}: JSON value at character {offset + pos} is "
+                                     f"malformed or larger than {max_value_size} characters") from exc
+                last_error = error
+                # Value cut off by the buffer end: at least double what is
+                # buffered, so a huge value is re-decoded O(log n) times
+                more = f.read(max(chunk_size, len(buffer) - pos))
+                eof = not more
+                offset += pos
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+
+            if not eof and not isinstance(value, (dict, list, str)) and \
+               (end == len(buffer) or buffer[end] not in _SEPARATORS and
+                not (array_start is not None and buffer[end] == ']')):
+                # A bare number or literal cut by the buffer end (e.g. "3.25"
+                # of "3.25e10") may continue in the next chunk
+                more = f.read(chunk_size)
+                eof = not more
+                offset += pos
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+
+            last_error = None
+            first = False
+            yield value
+            pos = end
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+JSONL Writer - Routes a stream of examples to several JSONL output files
+Each example is serialized once, written to every file whose route matches,
+and aggregated (stream_stats: counts by category, source and quality
+score, text lengths, token estimates) in the same pass.
+Atomic mode writes temp files and renames them into place only on success
+"""
+
+import os
+import json
+from pathlib import Path
+
+from compressed_io import (COMPRESSION_SUFFIXES, compression_of, frame_index_path,
+                           open_text_output, write_frame_index)
+from offset_index import OffsetIndexWriter, index_path
+from stream_stats import StreamingStats
+
+# Output buffer per open file; large buffers keep write syscalls rare on multi-GB runs
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+class JsonlFanout:
+    """Single-pass writer for the main dataset and per-category JSONL files"""
+
+    def __init__(self, output_dir: Path, routes: dict, eager: list = (),
+                 buffer_size: int = DEFAULT_BUFFER_SIZE, atomic: bool = False,
+                 shards=None, compression: str = None, checkpoint_bytes: int = None,
+                 columnar=None, index: bool = False, profiler=None):
+        """
+        routes maps an output filename to the categories it accepts, or None
+        for every example. Files are opened on their first example, except
+        those listed in eager, which are created even if nothing matches.
+
+        With atomic, each file is written to a temp file that is fsynced and
+        renamed over the target when the writer closes cleanly; if the block
+        raises (or the process dies), the previous files are left untouched.
+
+        shards (a shard_writer.ShardedJsonlWriter) also receives every
+        example, and is closed along with the files.
+
+        compression ('gzip' or 'zstd') appends its extension to every file
+        name; a route already named *.gz / *.zst is compressed regardless.
+        checkpoint_bytes writes compressed files as independent frames with
+        a .frames.json sidecar (see compressed_io).
+
+        columnar (a columnar_export.ColumnarWriter) gets every example too.
+
+        index writes an offset_index sidecar (<file>.idx) for every
+        uncompressed file, for random access with offset_index.IndexedJsonl.
+
+        profiler (a stage_profiler.StageProfiler) times serialization and
+        the writes to each file, the shards and the columnar export.
+        """
+        self.output_dir = Path(output_dir)
+        self.routes = routes
+        self.buffer_size = buffer_size
+        self.atomic = atomic
+        self.shards = shards
+        self.columnar = columnar
+        self.compression = compression
+        self.checkpoint_bytes = checkpoint_bytes
+        self.index = index
+        self.profiler = profiler
+        self.dumps = profiler.wrap(json.dumps, "serialize") if profiler else json.dumps
+        if profiler and shards:
+            shards.write_line = profiler.wrap(shards.write_line, "write:shards")
+        if profiler and columnar:
+            columnar.write = profiler.wrap(columnar.write, "write:columnar")
+        self.indexes = {}       # route name -> OffsetIndexWriter
+        self.handles = {}
+        self.paths = {}         # route name -> final path (with any compression suffix)
+        self.temp_paths = {}
+
+        # Counters and aggregates over everything written
+        self.total = 0
+        self.counts = {name: 0 for name in routes}
+        self.stats = StreamingStats()
+
+        for name in eager:
+            self._open(name)
+
+    def _open(self, name: str):
+        """Open (truncate) one output file, or its temp file in atomic mode"""
+        path = self.paths[name] = self.output_dir / (name + COMPRESSION_SUFFIXES.get(self.compression, ''))
+        if self.atomic:
+            path = self.temp_paths[name] = _temp_path(path)
+        compression = compression_of(self.paths[name])
+        self.handles[name] = open_text_output(path, compression, self.buffer_size,
+                                              self.checkpoint_bytes)
+        if self.profiler:
+            self.handles[name] = self.profiler.timed_writer(self.handles[name], f"write:{name}")
+        if self.index and compression is None:
+            self.indexes[name] = OffsetIndexWriter(index_path(path))
+        return self.handles[name]
+
+    def write(self, example: dict):
+        """Write one example to every matching output file and count it"""
+        category = example['category']
+        json_line = self.dumps(example, ensure_ascii=False) + '\n'
+        line_size = None
+
+        for name, categories in self.routes.items():
+            if categories is not None and category not in categories:
+                continue
+
+            handle = self.handles.get(name) or self._open(name)
+            handle.write(json_line)
+            self.counts[name] += 1
+
+            index = self.indexes.get(name)
+            if index:
+                if line_size is None:
+                    line_size = len(json_line.encode('utf-8'))
+                index.add(line_size, category, example['source'], example['quality_score'])
+        if self.shards:
+            self.shards.write_line(json_line, category)
+        if self.columnar:
+            self.columnar.write(example)
+
+        self.total += 1
+        self.stats.add(example)
+
+    def write_all(self, examples):
+        """Write every example from an iterable"""
+        for example in examples:
+            self.write(example)
+
+    def close(self, commit: bool = True):
+        """Flush and close every open output file
+
+        In atomic mode, commit renames the temp files into place; otherwise
+        they are discarded.
+        """
+        for name, handle in self.handles.items():
+            handle.close()
+            if name in self.indexes:
+                self.indexes[name].close()
+
+        if self.atomic:
+            for name, temp_path in self.temp_paths.items():
+                # The file and its index move (or are discarded) together
+                moves = [(temp_path, self.paths[name])]
+                if name in self.indexes:
+                    moves.append((index_path(temp_path), index_path(self.paths[name])))
+                if commit:
+                    # The old frame sidecar can't describe the new file
+                    frame_index_path(self.paths[name]).unlink(missing_ok=True)
+                for source, target in moves:
+                    if commit:
+                        # Closed first, so a compressor's trailer is synced too
+                        _fsync_file(source)
+                        os.replace(source, target)
+                    else:
+                        source.unlink(missing_ok=True)
+
+        # Frame sidecars only once their data file is in place, so a crash
+        # never leaves one describing a file that isn't there
+        if commit:
+            for name, handle in self.handles.items():
+                if compression_of(self.paths[name]):
+                    write_frame_index(self.paths[name], handle)
+        if self.atomic and commit and self.temp_paths:
+            _fsync_dir(self.output_dir)
+        if commit:
+            # An index left by an earlier run no longer matches its file
+            for name, path in self.paths.items():
+                if name not in self.indexes:
+                    index_path(path).unlink(missing_ok=True)
+        self.handles = {}
+        self.temp_paths = {}
+        self.indexes = {}
+
+        if self.shards:
+            self.shards.close(commit)
+            self.shards = None
+        if self.columnar:
+            self.columnar.close(commit)
+            self.columnar = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+def _temp_path(path: Path) -> Path:
+    """Per-process temp file next to path (same directory, so rename is atomic)"""
+    return path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+def _fsync_file(path: Path):
+    """Flush a closed file's data to disk"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _fsync_dir(directory: Path):
+    """Persist renames in a directory (not supported on every platform)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def write_json_atomic(path: Path, data, **dump_options):
+    """json.dump to path via an fsynced temp file and an atomic rename"""
+    path = Path(path)
+    temp_path = _temp_path(path)
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_options)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    _fsync_dir(path.parent)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Markdown Blocks - One-pass block tokenizer shared by the extractors
+Splits a document into headings, fenced code blocks, list items and
+paragraphs with their offsets, so extractors look structure up in a short
+block list instead of rescanning the raw text with their own regexes
+"""
+
+from collections import namedtuple
+
+import patterns
+
+# kind:       'heading', 'fence', 'list_item' or 'paragraph'
+# start, end: span of the whole block (start at its first marker character,
+#             end just past the newline of its last line)
+# level:      heading level, fence marker length or list item indentation
+# info:       fence language (first word of the info string), else ''
+# body_start, body_end: heading text, fence contents or item/paragraph text
+Block = namedtuple('Block', 'kind start end level info body_start body_end')
+
+# First characters of a list item marker, checked before trying MD_LIST_ITEM
+_LIST_MARKERS = frozenset('-*+0123456789')
+
+def _fence_marker(line: str):
+    """(char, length, info) if the line opens or closes a fence, else None"""
+    char = line[:1]
+    if char not in ('`', '~'):
+        return None
+    length = len(line) - len(line.lstrip(char))
+    if length < 3:
+        return None
+    info = line[length:].strip()
+    if char == '`' and '`' in info:
+        return None
+    return char, length, info
+
+def _heading_level(line: str) -> int:
+    """ATX heading level of a line (# to ######), 0 if it is not a heading"""
+    level = len(line) - len(line.lstrip('#'))
+    if not 1 <= level <= 6:
+        return 0
+    if len(line) > level and line[level] not in ' \t':
+        return 0
+    return level
+
+def tokenize(content: str) -> list:
+    """Split content into a list of Blocks in document order"""
+    blocks = []
+    fence = None      # (start, char, length, info, body_start) of the open fence
+    text = None       # [kind, start, level, body_start, body_end] of the open item/paragraph
+
+    def close_text():
+        nonlocal text
+        if text:
+            kind, start, level, body_start, body_end = text
+            end = content.find('\n', body_end)
+            blocks.append(Block(kind, start, len(content) if end == -1 else end + 1,
+                                level, '', body_start, body_end))
+            text = None
+
+    pos = 0
+    while pos < len(content):
+        line_end = content.find('\n', pos)
+        if line_end == -1:
+            line_end = len(content)
+        next_pos = line_end + 1
+        line = content[pos:line_end].rstrip('\r')
+        stripped = line.lstrip(' ')
+        indent = len(line) - len(stripped)
+
+        if fence:
+            start, char, length, info, body_start = fence
+            marker = _fence_marker(stripped) if indent <= 3 else None
+            if marker and marker[0] == char and marker[1] >= length and not marker[2]:
+                blocks.append(Block('fence', start, min(next_pos, len(content)),
+                                    length, info, body_start, pos))
+                fence = None
+            pos = next_pos
+            continue
+
+        if not stripped.strip():
+            close_text()
+            pos = next_pos
+            continue
+
+        marker = _fence_marker(stripped) if indent <= 3 else None
+        level = _heading_level(stripped) if indent <= 3 else 0
+        item = patterns.MD_LIST_ITEM.match(line) if stripped[0] in _LIST_MARKERS else None
+
+        if marker:
+            close_text()
+            char, length, info = marker
+            fence = (pos + indent, char, length, info.split()[0] if info else '',
+                     min(next_pos, len(content)))
+        elif level:
+            close_text()
+            heading_start = pos + indent
+            body_start = heading_start + level
+            while body_start < line_end and content[body_start] in ' \t':
+                body_start += 1
+            body_end = pos + len(line.rstrip())
+            blocks.append(Block('heading', heading_start, min(next_pos, len(content)),
+                                level, '', min(body_start, body_end), body_end))
+        elif item:
+            close_text()
+            text = ['list_item', pos + indent, indent, pos + item.end(), pos + len(line.rstrip())]
+        elif text:
+            # Continuation line of the open list item or paragraph
+            text[4] = pos + len(line.rstrip())
+        else:
+            text = ['paragraph', pos + indent, indent, pos + indent, pos + len(line.rstrip())]
+
+        pos = next_pos
+
+    close_text()
+    if fence:
+        # Unclosed fence runs to the end of the document
+        start, char, length, info, body_start = fence
+        blocks.append(Block('fence', start, len(content), length, info,
+                            body_start, len(content)))
+    return blocks
+
+def fence_conversations(content: str, blocks: list, conversation) -> list:
+    """Conversations matched by a fenced-conversation pattern, one per plain fence
+
+    conversation is a pattern such as patterns.FENCED_CONVERSATION; it is
+    matched at each fence without a language and may not run past it.
+    """
+    matches = []
+    for block in blocks:
+        if block.kind == 'fence' and not block.info:
+            match = conversation.match(content, block.start, block.end)
+            if match:
+                matches.append(match.group(1))
+    return matches
+
+def dialogue_sections(content: str, blocks: list, marker_len: int = 4) -> list:
+    """Body text of each "### Dialogue N:" section (level 3 or deeper)
+
+    A body runs from the line after its heading to the next Dialogue heading
+    of level 3 or deeper, or to the end of the document. marker_len is the
+    longest "#" run the caller's section pattern matches; deeper headings
+    end a body at their last marker_len "#" characters.
+    """
+    headings = [block for block in blocks
+                if block.kind == 'heading' and block.level >= 3 and
+                content.startswith('Dialogue', block.body_start)]
+
+    sections = []
+    for i, heading in enumerate(headings):
+        if not patterns.MD_DIALOGUE_TITLE.match(content, heading.body_start, heading.body_end):
+            continue
+        if content[heading.end - 1:heading.end] != '\n':
+            continue
+
+        if i + 1 < len(headings):
+            following = headings[i + 1]
+            body_end = following.start + max(following.level - marker_len, 0)
+        else:
+            body_end = len(content)
+        sections.append(content[heading.end:body_end])
+    return sections
+
+def numbered_sections(content: str, blocks: list) -> list:
+    """(title, section) for each "## Mapping N:" or "## Dialogue N:" heading
+
+    Only level 2 headings at the start of a line after the first are
+    sections. Each section runs from the heading title to the newline before
+    the next one, or to the end of the document.
+    """
+    starts = []
+    for block in blocks:
+        if block.kind == 'heading' and block.level == 2 and \
+           block.start > 0 and content[block.start - 1] == '\n':
+            match = patterns.MD_SECTION_TITLE.match(content, block.body_start, block.body_end)
+            if match:
+                starts.append((block.start, match.end()))
+
+    sections = []
+    for i, (_, title_start) in enumerate(starts):
+        end = starts[i + 1][0] - 1 if i + 1 < len(starts) else len(content)
+        title_end = content.find('\n', title_start)
+        sections.append((content[title_start:title_end], content[title_start:end]))
+    return sections
@@ -5,29 +5,32 @@ Targets: Principle conflicts, failure scenarios, code reviews, philosophy exampl
 """
 
 import json
-import re
 from pathlib import Path
 from collections import defaultdict
-from comprehensive_parser import ComprehensiveParser
+from comprehensive_parser import ComprehensiveParser, parse_args
+import patterns
+import code_fences
 
 class MaximumExtractionParser(ComprehensiveParser):
     """Enhanced parser that extracts even more content types"""
 
+    PROFILED_STAGES = ComprehensiveParser.PROFILED_STAGES + (
+        'extract_principle_conflicts', 'extract_failure_scenarios', 'extract_inline_code_examples')
+
     def extract_principle_conflicts(self, content: str) -> list:
         """Extract principle conflict/trade-off examples"""
         examples = []
 
         # Find numbered conflict sections
-        pattern = r'(?:^|\n)\s*(\d+)\.\s+\*\*(.+?)\*\*\s*\n(.*?)(?=\n\s*\d+\.\s+\*\*|\n###|\n##|\Z)'
-        matches = re.findall(pattern, content, re.DOTALL | re.MULTILINE)
+        matches = patterns.MP_CONFLICT_SECTION.findall(content)
 
         for num, title, section_content in matches:
             # Extract principles
-            principle1 = re.search(r'\*\*Principle 1\*\*:?\s*(.*?)(?=\n\s*[-\*]|\*\*Principle 2)', section_content, re.DOTALL)
-            principle2 = re.search(r'\*\*Principle 2\*\*:?\s*(.*?)(?=\n\s*[-\*]|\*\*Conflict)', section_content, re.DOTALL)
-            conflict = re.search(r'\*\*Conflict\*\*:?\s*(.*?)(?=\n\s*[-\*]|\*\*Trade-off)', section_content, re.DOTALL)
-            tradeoff = re.search(r'\*\*Trade-off.*?\*\*:?\s*(.*?)(?=\n\s*[-\*]|\*\*Real-world|$)', section_content, re.DOTALL)
-            constraint = re.search(r'\*\*Real-world constraint\*\*:?\s*(.*?)(?=\n\n|$)', section_content, re.DOTALL)
+            principle1 = patterns.MP_PRINCIPLE_1.search(section_content)
+            principle2 = patterns.MP_PRINCIPLE_2.search(section_content)
+            conflict = patterns.MP_CONFLICT.search(section_content)
+            tradeoff = patterns.MP_TRADEOFF.search(section_content)
+            constraint = patterns.MP_REAL_WORLD_CONSTRAINT.search(section_content)
 
             if not (principle1 and principle2):
                 continue
@@ -73,8 +76,7 @@ class MaximumExtractionParser(ComprehensiveParser):
         examples = []
 
         # Pattern for failure scenarios
-        pattern = r'(?:^|\n)\s*(\d+)\.\s+\*\*Scenario\*\*:?\s*(.*?)\n\s+\*\*Broken Principle\*\*:?\s*(.*?)\n\s+\*\*Signature\*\*:?\s*(.*?)\n\s+\*\*Diagnosis\*\*:?\s*(.*?)\n\s+\*\*(?:Physics-based fix|Fix)\*\*:?\s*(.*?)(?=\n\s*\d+\.|\n###|\n##|\Z)'
-        matches = re.findall(pattern, content, re.DOTALL)
+        matches = patterns.MP_FAILURE_SCENARIO.findall(content)
 
         for num, scenario, broken_principle, signature, diagnosis, fix in matches:
             scenario = scenario.strip()
@@ -103,8 +105,7 @@ class MaximumExtractionParser(ComprehensiveParser):
 
         # Pattern for code blocks with BEFORE/AFTER structure
         # Matches: ```python...BEFORE...bad code...❌ Violates...AFTER...good code...✅ Respects
-        pattern = r'```(\w+)\n#\s*(\d+\..*?)\n.*?#\s*BEFORE\n(.*?)#\s*❌.*?Violates:?\s*(.*?)(?:\n#.*?)?#\s*AFTER\n(.*?)#\s*✅.*?Respects:?\s*(.*?)\n```'
-        matches = re.findall(pattern, content, re.DOTALL)
+        matches = code_fences.find_inline_code_reviews(content)
 
         for lang, title, bad_code, violation, good_code, principle in matches:
             title = title.strip()
@@ -133,69 +134,37 @@ class MaximumExtractionParser(ComprehensiveParser):
 
         return examples
 
-    def process_file(self, filepath: Path):
-        """Enhanced file processing with all extraction methods"""
-        print(f"Processing: {filepath.name}")
-
-        content = filepath.read_text(encoding='utf-8', errors='ignore')
-        source = self.determine_source(filepath)
-        extracted = []
-
-        # All extraction methods from parent class
-        pre_formatted = self.extract_pre_formatted_conversations(content)
-        extracted.extend(pre_formatted)
-        if pre_formatted:
-            print(f"  → {len(pre_formatted)} pre-formatted conversations")
-
-        dialogues = self.extract_dialogue_sections(content)
-        extracted.extend(dialogues)
-        if dialogues:
-            print(f"  → {len(dialogues)} dialogue sections")
-
-        code_reviews = self.extract_code_reviews(content)
-        extracted.extend(code_reviews)
-        if code_reviews:
-            print(f"  → {len(code_reviews)} code review examples")
-
-        principles = self.extract_numbered_principles(content, filepath.stem)
-        extracted.extend([p for p in principles if p])
-        if [p for p in principles if p]:
-            print(f"  → {len([p for p in principles if p])} principle mappings")
+    def run_extractors(self, content: str, filepath: Path) -> list:
+        """Enhanced extraction: all parent methods plus the new content types"""
+        groups = super().run_extractors(content, filepath)
 
         # NEW extraction methods
-        conflicts = self.extract_principle_conflicts(content)
-        extracted.extend(conflicts)
-        if conflicts:
-            print(f"  → {len(conflicts)} principle conflicts")
-
-        failures = self.extract_failure_scenarios(content)
-        extracted.extend(failures)
-        if failures:
-            print(f"  → {len(failures)} failure scenarios")
-
-        inline_code = self.extract_inline_code_examples(content)
-        extracted.extend(inline_code)
-        if inline_code:
-            print(f"  → {len(inline_code)} inline code examples")
-
-        # Create examples
-        for text in extracted:
-            self.examples.append({
-                "text": text,
-                "source": source,
-                "category": self.determine_category(text, filepath),
-                "quality_score": self.calculate_quality_score(text)
-            })
+        groups.extend([
+            ("principle conflicts", self.extract_principle_conflicts(content)),
+            ("failure scenarios", self.extract_failure_scenarios(content)),
+            ("inline code examples", self.extract_inline_code_examples(content)),
+        ])
+        return groups
 
 def main():
-    parser = MaximumExtractionParser("/home/user/Dataset-Curator")
+    args, outputs = parse_args(__doc__)
+    parser = MaximumExtractionParser("/home/user/Dataset-Curator", workers=args.workers,
+                                     cache_dir=args.cache_dir, file_timeout=args.file_timeout,
+                                     dedup_threshold=args.dedup_threshold if args.near_dedup else None,
+                                     profile=args.profile, profile_dump=args.profile_dump,
+                                     read_concurrency=args.read_concurrency,
+                                     max_in_flight_bytes=args.max_in_flight_bytes,
+                                     manifest=args.manifest, **outputs)
     print("="*60)
     print("MAXIMUM EXTRACTION PARSER")
     print("Extracting ALL possible examples from source files")
     print("="*60 + "\n")
 
-    parser.process_all_files()
-    parser.generate_outputs()
+    if args.stream:
+        parser.generate_outputs(parser.iter_examples())
+    else:
+        parser.process_all_files()
+        parser.generate_outputs()
 
     print("\n✅ MAXIMUM EXTRACTION COMPLETE!\n")
 
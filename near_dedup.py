@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Near Dedup - MinHash + LSH near-duplicate detection over <think> blocks
+Signatures use one-permutation MinHash (one hash per shingle, densified),
+and LSH banding only compares an example with the kept examples it shares a
+band with, so deduplicating n examples stays far below n^2 comparisons.
+CPU only, standard library only
+"""
+
+import hashlib
+from array import array
+
+import patterns
+
+DEFAULT_THRESHOLD = 0.8     # Estimated Jaccard similarity at which examples are duplicates
+DEFAULT_NUM_PERM = 128      # Signature length
+DEFAULT_BANDS = 16          # LSH bands (rows per band = num_perm / bands)
+DEFAULT_SHINGLE_SIZE = 5    # Words per shingle
+
+_HASH_BITS = 64
+
+def reasoning_text(text: str) -> str:
+    """The <think> blocks of an example, or its whole text if it has none"""
+    parts = [match.group(1) for match in patterns.ND_REASONING.finditer(text)]
+    return "\n".join(parts) if parts else text
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> set:
+    """Set of lowercased word n-grams (the whole text if it has fewer words)"""
+    words = patterns.ND_WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i+size]) for i in range(len(words) - size + 1)}
+
+class NearDuplicateFilter:
+    """Streaming near-duplicate filter: the first example of each cluster is kept
+
+    add() is called once per example in priority order. Every example gets
+    an id (its position in the stream); kept_for maps each dropped id to
+    the id of the kept example that represents its cluster.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                 bands: int = DEFAULT_BANDS, shingle_size: int = DEFAULT_SHINGLE_SIZE):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Densified bins are offset by whole bin widths so they never equal real minima
+        self.bin_width = (1 << _HASH_BITS) // num_perm
+
+        self.seen = 0
+        self.signatures = {}    # kept id -> signature
+        self.buckets = [{} for _ in range(bands)]   # per band: band hash -> kept ids
+        self.kept_for = {}      # dropped id -> kept id
+        self.similarity = {}    # dropped id -> estimated similarity to its kept example
+
+    def signature(self, text: str):
+        """MinHash signature of a text's reasoning shingles, None if it has no words"""
+        hashed = set()
+        for shingle in shingles(reasoning_text(text), self.shingle_size):
+            digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+            hashed.add(int.from_bytes(digest, 'little'))
+        if not hashed:
+            return None
+
+        # One permutation: each hash lands in one bin, keeping the minimum per bin
+        empty = 1 << _HASH_BITS
+        mins = [empty] * self.num_perm
+        for h in hashed:
+            b = h % self.num_perm
+            value = h // self.num_perm
+            if value < mins[b]:
+                mins[b] = value
+
+        # Rotation densification: an empty bin borrows the next filled bin's value
+        filled = [i for i, value in enumerate(mins) if value != empty]
+        if len(filled) < self.num_perm:
+            nxt = filled[0] + self.num_perm
+            for i in range(self.num_perm - 1, -1, -1):
+                if mins[i] != empty:
+                    nxt = i
+                else:
+                    distance = nxt - i
+                    mins[i] = mins[nxt % self.num_perm] + distance * self.bin_width
+        return array('Q', mins)
+
+    def estimate(self, sig_a, sig_b) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(a == b for a, b in zip(sig_a, sig_b)) / self.num_perm
+
+    def _band_keys(self, sig) -> list:
+        rows = self.rows
+        return [hash(tuple(sig[i*rows:(i+1)*rows])) for i in range(self.bands)]
+
+    def add(self, text: str) -> bool:
+        """Register the next example; True if it is kept, False if a near-duplicate"""
+        example_id = self.seen
+        self.seen += 1
+
+        sig = self.signature(text)
+        if sig is None:
+            return True
+        keys = self._band_keys(sig)
+
+        # Candidates share at least one band; verify with the full signature
+        checked = set()
+        for band, key in enumerate(keys):
+            for kept_id in self.buckets[band].get(key, ()):
+                if kept_id in checked:
+                    continue
+                checked.add(kept_id)
+                similarity = self.estimate(sig, self.signatures[kept_id])
+                if similarity >= self.threshold:
+                    self.kept_for[example_id] = kept_id
+                    self.similarity[example_id] = similarity
+                    return False
+
+        self.signatures[example_id] = sig
+        for band, key in enumerate(keys):
+            self.buckets[band].setdefault(key, []).append(example_id)
+        return True
+
+    def clusters(self) -> dict:
+        """kept id -> ids of the near-duplicates dropped in its favour"""
+        clusters = {}
+        for dropped_id, kept_id in self.kept_for.items():
+            clusters.setdefault(kept_id, []).append(dropped_id)
+        return clusters
+
+def deduplicate(examples, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """Keep the first example of each near-duplicate cluster, in order"""
+    dedup = NearDuplicateFilter(threshold)
+    return [ex for ex in examples if dedup.add(ex['text'])]
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Offset Index - Random access into a JSONL dataset through a packed sidecar
+While a JSONL file is written, <file>.idx records each line's byte offset
+with its category, source and quality score codes. IndexedJsonl then
+memory-maps both files: example i is one slice + json.loads, and filters
+run over the fixed-size records without parsing any JSON
+"""
+
+import os
+import json
+import mmap
+import random
+import struct
+from pathlib import Path
+
+INDEX_SUFFIX = '.idx'
+
+# File header: magic + format version, record count, JSONL size and mtime
+# (st_mtime_ns), offset of the code tables
+INDEX_MAGIC = b'JLIDX\x00\x00\x02'
+HEADER = struct.Struct('<8sQQqQ')
+
+# Per line: byte offset, category code, source code, quality score (padded to 16 bytes)
+RECORD = struct.Struct('<QHHb3x')
+
+def index_path(path: Path) -> Path:
+    """Sidecar index of a JSONL file"""
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+class OffsetIndexWriter:
+    """Builds the index of a JSONL file line by line as the file is written"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.count = 0
+        self.offset = 0         # Bytes of JSONL covered so far
+        self.codes = {'categories': {}, 'sources': {}}
+        self._file = open(self.path, 'wb')
+        self._file.write(HEADER.pack(INDEX_MAGIC, 0, 0, 0, 0))   # Filled in by close()
+
+    def _code(self, table: str, value: str) -> int:
+        codes = self.codes[table]
+        if value not in codes:
+            if len(codes) > 0xFFFF:
+                raise ValueError(f"More than 65536 distinct {table} in {self.path}")
+            codes[value] = len(codes)
+        return codes[value]
+
+    def add(self, size: int, category: str, source: str, score: int):
+        """Record the next line: its size in bytes (newline included) and metadata"""
+        self._file.write(RECORD.pack(self.offset, self._code('categories', category),
+                                     self._code('sources', source), int(score)))
+        self.offset += size
+        self.count += 1
+
+    def close(self):
+        """Append the code tables and write the final header
+
+        Call once the JSONL file itself is closed: the header records its
+        mtime, which a rename into place keeps.
+        """
+        data_path = self.path.with_name(self.path.name[:-len(INDEX_SUFFIX)])
+        tables = {table: list(codes) for table, codes in self.codes.items()}
+        self._file.write(json.dumps(tables, ensure_ascii=False).encode('utf-8'))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(INDEX_MAGIC, self.count, self.offset,
+                                     data_path.stat().st_mtime_ns,
+                                     HEADER.size + self.count * RECORD.size))
+        self._file.close()
+
+class IndexedJsonl:
+    """Memory-mapped random access to an indexed JSONL file
+
+    len(), [i] (parsed example), raw(i) (bytes), iter_where() and sample()
+    all work from the index; only the examples returned are parsed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(index_path(self.path), 'rb') as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.size, self.mtime_ns, tables_offset = HEADER.unpack_from(self._index, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{index_path(self.path)} is not a JSONL offset index (or has another version)")
+
+        with open(self.path, 'rb') as f:
+            # A rewrite of the same size still changes the mtime
+            actual = os.fstat(f.fileno())
+            if actual.st_size != self.size:
+                raise ValueError(f"{index_path(self.path)} is stale: indexes {self.size} bytes, "
+                                 f"{self.path} has {actual.st_size}")
+            if actual.st_mtime_ns != self.mtime_ns:
+                raise ValueError(f"{index_path(self.path)} is stale: {self.path} was modified "
+                                 f"after it was indexed")
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+
+        tables = json.loads(self._index[tables_offset:].decode('utf-8'))
+        self.categories = tables['categories']
+        self.sources = tables['sources']
+        self._records = memoryview(self._index)[HEADER.size:tables_offset]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record(self, i: int) -> tuple:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(f"example {i} out of range ({self.count} examples)")
+        return RECORD.unpack_from(self._records, i * RECORD.size)
+
+    def raw(self, i: int) -> bytes:
+        """The JSON line of example i (without its newline)"""
+        if i < 0:
+            i += self.count
+        start = self._record(i)[0]
+        end = RECORD.unpack_from(self._records, (i + 1) * RECORD.size)[0] if i + 1 < self.count else self.size
+        return self._data[start:end].rstrip(b'\n')
+
+    def __getitem__(self, i: int) -> dict:
+        return json.loads(self.raw(i))
+
+    def metadata(self, i: int) -> tuple:
+        """(category, source, quality_score) of example i, without parsing it"""
+        _, category, source, score = self._record(i)
+        return self.categories[category], self.sources[source], score
+
+    def matching(self, category=None, source=None, min_score: int = None) -> list:
+        """Indices of the examples whose metadata matches every given filter
+
+        category and source may be a single value or a collection of values.
+        """
+        def codes(wanted, table):
+            if wanted is None:
+                return None
+            wanted = {wanted} if isinstance(wanted, str) else set(wanted)
+            return {code for code, value in enumerate(table) if value in wanted}
+
+        category_codes = codes(category, self.categories)
+        source_codes = codes(source, self.sources)
+        return [i for i, (_, cat, src, score) in enumerate(RECORD.iter_unpack(self._records))
+                if (category_codes is None or cat in category_codes)
+                and (source_codes is None or src in source_codes)
+                and (min_score is None or score >= min_score)]
+
+    def iter_where(self, **filters):
+        """Yield (index, example) for the examples matching filters (see matching)"""
+        for i in self.matching(**filters):
+            yield i, self[i]
+
+    def sample(self, k: int, seed: int = None, **filters) -> list:
+        """k random (index, example) pairs among those matching filters"""
+        candidates = self.matching(**filters)
+        chosen = random.Random(seed).sample(candidates, min(k, len(candidates)))
+        return [(i, self[i]) for i in sorted(chosen)]
+
+    def close(self):
+        self._records.release()
+        self._index.close()
+        if self.size:
+            self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -4,35 +4,93 @@ Optimize dataset distribution to match 60/15/15/10 target
 Reclassifies examples based on content analysis
 """
 
-import json
 import re
+import json
+import argparse
 from pathlib import Path
+from itertools import islice
+from collections import namedtuple
+from json_stream import iter_json_values
+from jsonl_writer import JsonlFanout, write_json_atomic
+from compressed_io import COMPRESSION_SUFFIXES, open_input, require_compression
+from ratio_sampler import TargetRatioSampler, CATEGORY_GROUPS, TARGET_DISTRIBUTION
+import patterns
+
+try:
+    import numpy as np
+except ImportError:  # Optional: reclassify_batch falls back to a per-example loop
+    np = None
+
+# Examples reclassified per batch when streaming a dataset
+RECLASSIFY_CHUNK = 10000
+
+# Result of reclassifying a whole dataset; distributions are in first-seen order
+Reclassification = namedtuple(
+    'Reclassification', 'categories reclassified_count original_distribution new_distribution')
+
+# Regex metacharacters; an alternative without any is a plain keyword
+_METACHARS = frozenset('.^$*+?{}[]\\|()')
+
+def _keyword_features() -> dict:
+    """Split each case-insensitive keyword-list feature of RC_FEATURES
+
+    Returns name -> (keywords, residual) where keywords are the lowercased
+    plain alternatives and residual lists (gate, compiled) pairs for the
+    other alternatives, searched only if their lowercased literal prefix
+    occurs. Patterns with groups are left to the regex scan.
+    """
+    keyword_features = {}
+    for name, compiled in patterns.RC_FEATURES.features.items():
+        if not compiled.flags & re.IGNORECASE or '(' in compiled.pattern:
+            continue
+        keywords, residual = [], []
+        for alternative in compiled.pattern.split('|'):
+            if _METACHARS.isdisjoint(alternative):
+                keywords.append(alternative.lower())
+            else:
+                gate = alternative[:next(i for i, c in enumerate(alternative) if c in _METACHARS)]
+                residual.append((gate.lower(), re.compile(alternative, compiled.flags)))
+        keyword_features[name] = (tuple(keywords), residual)
+    return keyword_features
+
+_KEYWORD_FEATURES = _keyword_features()
+_REGEX_FEATURES = tuple(name for name in patterns.RC_FEATURES.features if name not in _KEYWORD_FEATURES)
+
+def feature_flags(text: str) -> set:
+    """Names of the RC_FEATURES that occur in text, as RC_FEATURES.scan finds them
+
+    re tries every alternative of a keyword list at every position, so the
+    keyword features are substring tests on the lowercased text instead.
+    That agrees with IGNORECASE except around a few case-folding oddities,
+    so texts containing those still get the full regex scan.
+    """
+    if not text.isascii() and patterns.RC_FOLD_SENSITIVE.search(text):
+        return set(patterns.RC_FEATURES.scan(text))
+
+    lowered = text.lower()
+    found = set()
+    for name, (keywords, residual) in _KEYWORD_FEATURES.items():
+        if any(keyword in lowered for keyword in keywords) or \
+           any(gate in lowered and compiled.search(text) for gate, compiled in residual):
+            found.add(name)
+
+    found.update(patterns.RC_FEATURES.scan(text, _REGEX_FEATURES))
+    return found
 
 def analyze_example_for_reclassification(example):
     """Analyze example content to determine best category"""
     text = example['text']
     current_category = example['category']
 
-    # Extract content for analysis
-    has_equation = bool(re.search(r'\$\$.*?\$\$|\$.*?\$|=\s*[A-Za-z]|→|∝|≈|∫|∆|Σ', text))
-    has_code = bool(re.search(r'```(?:python|go|java|rust|javascript)', text, re.IGNORECASE))
-    has_review_markers = bool(re.search(r'❌.*?Violates|✅.*?Respects|BEFORE|AFTER', text))
-    has_physical_law = bool(re.search(
-        r'Ohm|Kirchhoff|Carnot|Reynolds|Bernoulli|Shannon|Nyquist|conservation of|thermodynamic|CAP theorem|Little.*Law',
-        text, re.IGNORECASE
-    ))
-    has_philosophy = bool(re.search(
-        r'epistemology|phenomenology|ontology|consciousness|Husserl|Popper|Gödel|intentionality|epoché',
-        text, re.IGNORECASE
-    ))
-    has_failure_keywords = bool(re.search(
-        r'failure|fail|error|bug|crash|fault|debug|broke',
-        text, re.IGNORECASE
-    ))
-    has_principle_explanation = bool(re.search(
-        r'principle|fundamental|governing equation|first principles|physical law|theorem',
-        text, re.IGNORECASE
-    ))
+    # Extract content for analysis (every feature in one pass)
+    found = feature_flags(text)
+    has_equation = 'equation' in found
+    has_code = 'code' in found
+    has_review_markers = 'review_markers' in found
+    has_physical_law = 'physical_law' in found
+    has_philosophy = 'philosophy' in found
+    has_failure_keywords = 'failure' in found
+    has_principle_explanation = 'principle_explanation' in found
 
     # Reclassification logic
     # Philosophy: highest priority for philosophy keywords
@@ -49,7 +107,7 @@ def analyze_example_for_reclassification(example):
         return 'first_principles'
 
     # Electrical: specific electrical terms
-    if re.search(r'voltage|current|circuit|NEC|AWG|ampacity|breaker|resistance', text, re.IGNORECASE):
+    if 'electrical' in found:
         if has_physical_law or has_equation:
             return 'electrical'
 
@@ -60,49 +118,159 @@ def analyze_example_for_reclassification(example):
     # Default: keep current category
     return current_category
 
-def optimize_distribution():
-    """Reclassify examples to match target distribution"""
+def feature_matrix(texts: list) -> dict:
+    """Boolean column per RC_FEATURES predicate, one row per text
+
+    Each text is scanned once (feature_flags), then every column is built
+    in one np.fromiter pass over the scan results.
+    """
+    found = [feature_flags(text) for text in texts]
+    return {name: np.fromiter((name in flags for flags in found), dtype=bool, count=len(found))
+            for name in patterns.RC_FEATURES.features}
+
+def _distribution(codes, names: list) -> dict:
+    """Count per category code, keyed by name in order of first appearance"""
+    counts = np.bincount(codes, minlength=len(names))
+    codes_seen, first_seen = np.unique(codes, return_index=True)
+    return {names[code]: int(counts[code]) for code in codes_seen[np.argsort(first_seen)]}
+
+def reclassify_batch(examples: list) -> Reclassification:
+    """Reclassify every example at once, as analyze_example_for_reclassification would
+
+    With numpy the feature predicates become boolean columns and the
+    decision rules run as vectorized masks over integer category codes;
+    without it each example goes through analyze_example_for_reclassification.
+    """
+    if np is None:
+        categories = [analyze_example_for_reclassification(ex) for ex in examples]
+        original, new = {}, {}
+        for ex, category in zip(examples, categories):
+            original[ex['category']] = original.get(ex['category'], 0) + 1
+            new[category] = new.get(category, 0) + 1
+        reclassified = sum(ex['category'] != category for ex, category in zip(examples, categories))
+        return Reclassification(categories, reclassified, original, new)
+
+    # Category names -> integer codes, current categories first
+    codes = {}
+    current = np.fromiter((codes.setdefault(ex['category'], len(codes)) for ex in examples),
+                          dtype=np.intp, count=len(examples))
+
+    f = feature_matrix([ex['text'] for ex in examples])
+    equation_or_law = f['equation'] | f['physical_law']
+    explained = f['equation'] & f['principle_explanation']
+
+    # Same priority order as analyze_example_for_reclassification
+    rules = [
+        (f['philosophy'], 'philosophy'),
+        (f['code'] & f['review_markers'], 'code_review'),
+        (equation_or_law & f['principle_explanation'], 'first_principles'),
+        (f['electrical'] & equation_or_law, 'electrical'),
+        (f['failure'] & ~explained, 'failure_analysis'),
+    ]
+    new = np.select([mask for mask, _ in rules],
+                    [codes.setdefault(category, len(codes)) for _, category in rules],
+                    default=current)
+
+    names = list(codes)
+    return Reclassification([names[code] for code in new.tolist()],
+                            int(np.count_nonzero(new != current)),
+                            _distribution(current, names), _distribution(new, names))
+
+def reclassify_stream(examples, chunk_size: int = RECLASSIFY_CHUNK) -> Reclassification:
+    """reclassify_batch over a stream of examples, chunk_size at a time
+
+    Only the new categories are kept, so memory grows with the count of
+    examples rather than their text; the distributions are merged in
+    first-seen order.
+    """
+    examples = iter(examples)
+    categories, reclassified, original, new = [], 0, {}, {}
+    for chunk in iter(lambda: list(islice(examples, chunk_size)), []):
+        result = reclassify_batch(chunk)
+        categories += result.categories
+        reclassified += result.reclassified_count
+        for merged, counts in ((original, result.original_distribution),
+                               (new, result.new_distribution)):
+            for category, count in counts.items():
+                merged[category] = merged.get(category, 0) + count
+    return Reclassification(categories, reclassified, original, new)
+
+def read_examples(path: Path):
+    """Examples of a (possibly compressed) JSONL file, one at a time"""
+    with open_input(path) as f:
+        for line in f:
+            yield json.loads(line)
+
+def write_balanced_dataset(examples, output_path: Path, size: int, seed: int = None,
+                           compression: str = None, index: bool = False) -> dict:
+    """Sample a stream of examples to the target ratios and write it as JSONL
+
+    Returns the sampled count per bucket.
+    """
+    sampler = TargetRatioSampler(size, seed=seed)
+    sampler.add_all(examples)
+    balanced = sampler.sample()
+
+    with JsonlFanout(output_path.parent, {output_path.name: None},
+                     eager=[output_path.name], atomic=True, compression=compression,
+                     index=index) as sinks:
+        sinks.write_all(balanced)
+    output_path = sinks.paths[output_path.name]
+
+    # Per-bucket counts from the writer's running category counts
+    counts = {name: 0 for name in TARGET_DISTRIBUTION}
+    for category, count in sinks.stats.category_counts.items():
+        counts[sampler.bucket_of[category]] += count
+
+    print(f"\n✅ Balanced dataset saved to: {output_path} ({len(balanced)} of {size} requested)")
+    for name, count in counts.items():
+        pct = (count / len(balanced)) * 100 if balanced else 0.0
+        print(f"  {name:20s}: {count:3d} ({pct:5.1f}%) - Target: {TARGET_DISTRIBUTION[name]*100:.0f}%"
+              f" - {sampler.seen[name]} available")
+    if len(balanced) < size:
+        short = [name for name, capacity in sampler.capacities.items()
+                 if sampler.seen[name] < capacity]
+        print(f"  ⚠️  Scaled down to keep the ratios: too few {', '.join(short)} examples")
+    return counts
+
+def optimize_distribution(sample_size: int = None, seed: int = None, compression: str = None,
+                          index: bool = False):
+    """Reclassify examples to match target distribution
+
+    With sample_size, also writes balanced_dataset.jsonl: a quality-weighted
+    sample of that size in the target ratios, streamed from the output.
+    With compression, reads and writes the .gz / .zst outputs of a
+    compressed parser run. With index, each JSONL written gets an offset
+    index sidecar (offset_index.IndexedJsonl).
+    """
 
     input_path = Path("/home/user/Dataset-Curator/minimax-m2-aetherpro-training/output/training_dataset.jsonl")
     output_path = Path("/home/user/Dataset-Curator/minimax-m2-aetherpro-training/output/optimized_dataset.jsonl")
 
-    # Load examples
-    examples = []
-    with open(input_path) as f:
-        for line in f:
-            examples.append(json.loads(line))
+    # Outputs of a compressed run carry the compression's extension
+    suffix = COMPRESSION_SUFFIXES.get(compression, '')
+
+    # First pass: reclassify in batches, keeping only the new categories
+    source = input_path.with_name(input_path.name + suffix)
+    result = reclassify_stream(read_examples(source))
+    total = len(result.categories)
 
-    print(f"Loaded {len(examples)} examples")
+    print(f"Loaded {total} examples")
     print("\nOriginal distribution:")
 
     # Show original distribution
-    orig_dist = {}
-    for ex in examples:
-        orig_dist[ex['category']] = orig_dist.get(ex['category'], 0) + 1
-
+    orig_dist = result.original_distribution
     for cat, count in sorted(orig_dist.items()):
-        pct = (count / len(examples)) * 100
+        pct = (count / total) * 100
         print(f"  {cat:20s}: {count:3d} ({pct:5.1f}%)")
 
-    # Reclassify
-    reclassified_count = 0
-    for example in examples:
-        old_category = example['category']
-        new_category = analyze_example_for_reclassification(example)
-
-        if old_category != new_category:
-            example['category'] = new_category
-            reclassified_count += 1
+    reclassified_count = result.reclassified_count
 
     print(f"\nReclassified {reclassified_count} examples")
     print("\nNew distribution:")
 
     # Show new distribution
-    new_dist = {}
-    for ex in examples:
-        new_dist[ex['category']] = new_dist.get(ex['category'], 0) + 1
-
-    total = len(examples)
+    new_dist = result.new_distribution
     for cat, count in sorted(new_dist.items()):
         pct = (count / total) * 100
         print(f"  {cat:20s}: {count:3d} ({pct:5.1f}%)")
@@ -126,62 +294,68 @@ def optimize_distribution():
     print(f"  Code review:                               {new_dist.get('code_review', 0):3d} ({(new_dist.get('code_review', 0)/total)*100:5.1f}%) - Target: 15%")
     print(f"  Failure analysis:                          {new_dist.get('failure_analysis', 0):3d} ({(new_dist.get('failure_analysis', 0)/total)*100:5.1f}%) - Target: 10%")
 
-    # Write optimized dataset
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for example in examples:
-            json_line = json.dumps(example, ensure_ascii=False)
-            f.write(json_line + '\n')
+    # Write the optimized dataset, the updated training_dataset.jsonl and the
+    # category files in one pass over the input, second time round. Each goes to
+    # a temp file that is renamed into place only once everything is written, so
+    # a crash leaves the old files (the input included)
+    output_dir = input_path.parent
+    category_files = {f"{name}_examples.jsonl": cats for name, cats in CATEGORY_GROUPS.items()}
+    routes = {output_path.name: None, input_path.name: None, **category_files}
 
-    print(f"\n✅ Optimized dataset saved to: {output_path}")
+    with JsonlFanout(output_dir, routes, eager=[output_path.name, input_path.name],
+                     atomic=True, compression=compression, index=index) as sinks:
+        for example, new_category in zip(read_examples(source), result.categories):
+            example['category'] = new_category
+            sinks.write(example)
 
-    # Also update the main training_dataset.jsonl
-    with open(input_path, 'w', encoding='utf-8') as f:
-        for example in examples:
-            json_line = json.dumps(example, ensure_ascii=False)
-            f.write(json_line + '\n')
+    print(f"\n✅ Optimized dataset saved to: {sinks.paths[output_path.name]}")
 
-    # Write category-specific files
-    output_dir = input_path.parent
+    # Category files with no examples are left as they were
+    for filename in category_files:
+        if sinks.counts.get(filename):
+            print(f"✅ Updated {filename}{suffix}: {sinks.counts[filename]} examples")
 
-    categories = {
-        'technical': ['first_principles', 'electrical'],
-        'philosophy': ['philosophy'],
-        'code_review': ['code_review'],
-        'failure_analysis': ['failure_analysis']
-    }
-
-    for name, cats in categories.items():
-        cat_examples = [ex for ex in examples if ex['category'] in cats]
-        if cat_examples:
-            cat_path = output_dir / f"{name}_examples.jsonl"
-            with open(cat_path, 'w', encoding='utf-8') as f:
-                for ex in cat_examples:
-                    json_line = json.dumps(ex, ensure_ascii=False)
-                    f.write(json_line + '\n')
-            print(f"✅ Updated {cat_path.name}: {len(cat_examples)} examples")
-
-    # Update stats
+    # Update stats, from the aggregate the writer kept while writing
     stats = {
-        "total_examples": len(examples),
+        "total_examples": sinks.stats.total,
         "reclassified_count": reclassified_count,
-        "category_distribution": new_dist,
-        "category_percentages": {
-            cat: f"{(count/total)*100:.1f}%"
-            for cat, count in new_dist.items()
-        },
+        "category_distribution": sinks.stats.category_counts,
+        "category_percentages": sinks.stats.category_percentages(),
         "target_distribution": {
             "technical": "60%",
             "philosophy": "15%",
             "code_review": "15%",
             "failure_analysis": "10%"
-        }
+        },
+        **sinks.stats.length_summary()
     }
 
     stats_path = output_dir / "optimized_stats.json"
-    with open(stats_path, 'w') as f:
-        json.dump(stats, f, indent=2)
+    write_json_atomic(stats_path, stats, indent=2)
 
     print(f"✅ Stats saved to: {stats_path}")
 
+    if sample_size:
+        write_balanced_dataset(iter_json_values(sinks.paths[output_path.name]),
+                               output_dir / "balanced_dataset.jsonl", sample_size, seed,
+                               compression, index)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Reclassify the dataset toward the 60/15/15/10 target")
+    arg_parser.add_argument('--sample-size', type=int, default=None,
+                            help="Also write balanced_dataset.jsonl with this many examples in the target ratios")
+    arg_parser.add_argument('--seed', type=int, default=None,
+                            help="Random seed for the balanced sample")
+    arg_parser.add_argument('--compression', choices=sorted(COMPRESSION_SUFFIXES), default=None,
+                            help="Read and write the compressed (.gz / .zst) outputs of a parser run")
+    arg_parser.add_argument('--index', action='store_true',
+                            help="Write a <file>.idx offset index next to each uncompressed JSONL output")
+    args = arg_parser.parse_args()
+    try:
+        require_compression(args.compression)
+    except ImportError as exc:
+        arg_parser.error(str(exc))
+    optimize_distribution(args.sample_size, args.seed, args.compression, args.index)
+
 if __name__ == "__main__":
-    optimize_distribution()
+    main()
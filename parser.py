@@ -6,16 +6,27 @@ Parses markdown files and converts them to JSONL format per Parser-Instructions.
 
 import os
 import json
-import re
 from pathlib import Path
 from typing import Dict, List, Tuple
 from collections import defaultdict
+from extraction_cache import ExtractionCache
+from dataset_outputs import DatasetOutputs
+from file_discovery import Discovery
+import patterns
+import markdown_blocks
 
 class DatasetParser:
-    def __init__(self, base_dir: str):
+    # file_discovery groups read by this parser
+    SOURCE_GROUPS = ('engineering', 'philosophy', 'aetherpro_docs')
+
+    def __init__(self, base_dir: str, cache_dir: str = None, **output_options):
         self.base_dir = Path(base_dir)
         self.examples = []
         self.stats = defaultdict(int)
+        self.cache = ExtractionCache(cache_dir, type(self)) if cache_dir else None
+        # Exact-repeat filter, shards, compression, columnar copy and offset
+        # indexes of the outputs; fails here if one needs a missing package
+        self.outputs = DatasetOutputs(**output_options)
 
         # Target distribution (60/15/15/10)
         self.target_distribution = {
@@ -35,20 +46,23 @@ class DatasetParser:
         """Calculate quality score 1-10 based on content"""
         score = 5  # Base score
 
+        # Find all features in one scan of text; only rescan thinking for
+        # equation/constraint features the text doesn't already have
+        found = patterns.DP_QUALITY.scan(text)
+        missing = tuple(name for name in ('equation', 'constraint') if name not in found)
+        if missing:
+            found.update(patterns.DP_QUALITY.scan(thinking, missing))
+
         # Check for equations (LaTeX or mathematical expressions)
-        if re.search(r'\$\$.*?\$\$|\$.*?\$|\\[a-z]+\{', text) or \
-           re.search(r'\$\$.*?\$\$|\$.*?\$|\\[a-z]+\{', thinking):
+        if 'equation' in found:
             score += 1
 
         # Check for real constraints (NEC, IEEE, physics laws, theorems)
-        constraint_keywords = r'NEC|IEEE|Shannon|Nyquist|Ohm|Kirchhoff|Carnot|Reynolds|Bernoulli|constraint|theorem|law|principle'
-        if re.search(constraint_keywords, text, re.IGNORECASE) or \
-           re.search(constraint_keywords, thinking, re.IGNORECASE):
+        if 'constraint' in found:
             score += 1
 
-        # Check for failure modes/edge cases
-        failure_keywords = r'failure|fail|edge case|break|violate|cascade|diverge|overflow|deadlock'
-        if re.search(failure_keywords, text, re.IGNORECASE):
+        # Check for failure modes/edge cases (text only)
+        if 'failure' in found:
             score += 1
 
         # Check for substantial thinking (200+ chars)
@@ -63,18 +77,18 @@ class DatasetParser:
         # Cap at 10
         return min(score, 10)
 
-    def extract_conversation_blocks(self, content: str) -> List[str]:
+    def extract_conversation_blocks(self, content: str, blocks: list = None) -> List[str]:
         """Extract conversation blocks that are already formatted"""
-        # Pattern for complete conversation blocks
-        pattern = r'```\s*\n(<\|user\|>.*?<\|end\|>)\s*```'
-        matches = re.findall(pattern, content, re.DOTALL)
+        # Complete conversation blocks
+        if blocks is None:
+            blocks = markdown_blocks.tokenize(content)
+        matches = markdown_blocks.fence_conversations(content, blocks, patterns.FENCED_CONVERSATION_LOOSE)
 
         if matches:
             return matches
 
         # Alternative pattern without code fences
-        pattern2 = r'(<\|user\|>.*?<\|end\|>(?:\s*<\|user\|>.*?<\|end\|>)*)'
-        matches2 = re.findall(pattern2, content, re.DOTALL)
+        matches2 = patterns.DP_UNFENCED_CONVERSATION.findall(content)
 
         return matches2
 
@@ -83,13 +97,11 @@ class DatasetParser:
         examples = []
 
         # Find dialogue sections
-        dialogue_pattern = r'\*\*Turn \d+.*?\*\*User:\*\*\s*"(.*?)".*?\*\*AI:\*\*\s*"(.*?)"'
-        matches = re.findall(dialogue_pattern, content, re.DOTALL)
+        matches = patterns.DP_STRUCTURED_TURN.findall(content)
 
         for user_msg, ai_response in matches:
             # Try to extract thinking from the AI response
-            think_match = re.search(r'((?:We should|This is|Starting from).*?(?:equation|principle|analogy).*?\.)',
-                                   ai_response, re.DOTALL)
+            think_match = patterns.DP_THINKING_SENTENCE.search(ai_response)
             thinking = think_match.group(1) if think_match else self.generate_thinking_trace(user_msg, ai_response)
 
             examples.append((user_msg.strip(), thinking, ai_response.strip()))
@@ -99,8 +111,8 @@ class DatasetParser:
     def generate_thinking_trace(self, user_msg: str, response: str) -> str:
         """Generate a basic thinking trace from user message and response"""
         # Extract key concepts from response
-        has_equation = bool(re.search(r'\$.*?\$', response))
-        has_principle = bool(re.search(r'principle|law|theorem|equation', response, re.IGNORECASE))
+        has_equation = bool(patterns.INLINE_MATH.search(response))
+        has_principle = bool(patterns.DP_PRINCIPLE_TERMS.search(response))
 
         thinking_parts = []
 
@@ -108,17 +120,17 @@ class DatasetParser:
             thinking_parts.append("Applying first principles to this problem:")
 
             # Extract any equations
-            equations = re.findall(r'\$\$(.*?)\$\$', response)
+            equations = patterns.DP_DISPLAY_MATH.findall(response)
             if equations:
                 thinking_parts.append(f"1. Governing equation: {equations[0]}")
 
             # Look for analogies
-            analogy_match = re.search(r'(like|similar to|analogous to|maps to)\s+([^.]+)', response, re.IGNORECASE)
+            analogy_match = patterns.DP_ANALOGY.search(response)
             if analogy_match:
                 thinking_parts.append(f"2. Physical analogy: {analogy_match.group(2)}")
 
             # Look for step-by-step reasoning
-            steps = re.findall(r'\d+\.\s+([^.]+\.)', response)
+            steps = patterns.DP_NUMBERED_STEP.findall(response)
             if steps:
                 thinking_parts.append("3. Step-by-step breakdown:")
                 thinking_parts.extend([f"   - {step}" for step in steps[:3]])
@@ -131,17 +143,19 @@ class DatasetParser:
 
         return "\n".join(thinking_parts) if thinking_parts else "Analyzing the request and applying relevant principles."
 
-    def parse_first_principles_file(self, filepath: Path) -> List[Dict]:
+    def parse_first_principles_file(self, filepath: Path, content: str = None,
+                                    blocks: list = None) -> List[Dict]:
         """Parse first principles engineering files (Gemini, Kimi, Grok examples)"""
-        content = filepath.read_text(encoding='utf-8', errors='ignore')
+        if content is None:
+            content = filepath.read_text(encoding='utf-8', errors='ignore')
         examples = []
 
         # First try to extract already-formatted conversation blocks
-        conv_blocks = self.extract_conversation_blocks(content)
+        conv_blocks = self.extract_conversation_blocks(content, blocks)
 
         for block in conv_blocks:
             # Block is already in correct format
-            thinking_match = re.search(r'<think>(.*?)</think>', block, re.DOTALL)
+            thinking_match = patterns.THINK_BLOCK.search(block)
             thinking = thinking_match.group(1).strip() if thinking_match else ""
 
             quality_score = self.calculate_quality_score(block, thinking)
@@ -180,16 +194,18 @@ class DatasetParser:
 
         return examples
 
-    def parse_philosophy_file(self, filepath: Path) -> List[Dict]:
+    def parse_philosophy_file(self, filepath: Path, content: str = None,
+                              blocks: list = None) -> List[Dict]:
         """Parse philosophy/consciousness files"""
-        content = filepath.read_text(encoding='utf-8', errors='ignore')
+        if content is None:
+            content = filepath.read_text(encoding='utf-8', errors='ignore')
         examples = []
 
         # Extract conversation blocks
-        conv_blocks = self.extract_conversation_blocks(content)
+        conv_blocks = self.extract_conversation_blocks(content, blocks)
 
         for block in conv_blocks:
-            thinking_match = re.search(r'<think>(.*?)</think>', block, re.DOTALL)
+            thinking_match = patterns.THINK_BLOCK.search(block)
             thinking = thinking_match.group(1).strip() if thinking_match else ""
 
             quality_score = self.calculate_quality_score(block, thinking)
@@ -204,14 +220,15 @@ class DatasetParser:
 
         return examples
 
-    def parse_aetherpro_docs(self, filepath: Path) -> List[Dict]:
+    def parse_aetherpro_docs(self, filepath: Path, content: str = None) -> List[Dict]:
         """Parse AetherPro documentation files"""
-        content = filepath.read_text(encoding='utf-8', errors='ignore')
+        if content is None:
+            content = filepath.read_text(encoding='utf-8', errors='ignore')
         examples = []
 
         # For docs, we need to create Q&A pairs from content
         # Look for sections with headers
-        sections = re.split(r'\n#{1,3}\s+', content)
+        sections = patterns.DP_DOC_HEADING.split(content)
 
         for section in sections[1:]:  # Skip first empty split
             if len(section.strip()) < 100:  # Skip very short sections
@@ -308,133 +325,137 @@ class DatasetParser:
         else:
             return 'first_principles_generated'
 
-    def process_all_files(self):
-        """Process all files in the dataset"""
+    def parse_cached(self, parse_method, filepath: Path) -> List[Dict]:
+        """Run a parse_* method, reusing cached examples if the file is unchanged"""
+        # One read serves both the cache key and, on a miss, the parse
+        content = filepath.read_text(encoding='utf-8', errors='ignore')
+        if self.cache is None:
+            return parse_method(filepath, content)
+        return self.cache.cached_call(filepath, content, parse_method.__name__,
+                                      lambda: parse_method(filepath, content))
+
+    def iter_examples(self):
+        """Yield examples file by file, without accumulating them"""
+        # One walk of every source root; skip rules live in file_discovery
+        self.discovery = Discovery(self.base_dir, self.SOURCE_GROUPS)
 
         # Process First Principles / Engineering files
-        fp_dir = self.base_dir / "First-Principles-Failures-Engineering-&-Deugging"
-        if fp_dir.exists():
-            for md_file in fp_dir.glob("*.md"):
-                if md_file.name == 'Weighting-Value-Table.md':
-                    continue  # Skip metadata file
-                print(f"Processing: {md_file.name}")
-                examples = self.parse_first_principles_file(md_file)
-                self.examples.extend(examples)
-                self.stats['first_principles_files'] += 1
+        for md_file in self.discovery.files('engineering'):
+            print(f"Processing: {md_file.name}")
+            examples = self.parse_cached(self.parse_first_principles_file, md_file)
+            self.stats['first_principles_files'] += 1
+            yield from examples
 
         # Process Philosophy/Consciousness files
-        phil_dir = self.base_dir / "Corys-claude-convos-peronality-datasets"
-        if phil_dir.exists():
-            for md_file in phil_dir.glob("*.md"):
-                if 'README' in md_file.name or 'EXECUTIVE' in md_file.name:
-                    continue  # Skip meta files
-                print(f"Processing: {md_file.name}")
+        for md_file in self.discovery.files('philosophy'):
+            print(f"Processing: {md_file.name}")
 
-                if 'Philosophy' in md_file.name or 'Consciousness' in md_file.name:
-                    examples = self.parse_philosophy_file(md_file)
-                else:
-                    examples = self.parse_first_principles_file(md_file)
+            if 'Philosophy' in md_file.name or 'Consciousness' in md_file.name:
+                examples = self.parse_cached(self.parse_philosophy_file, md_file)
+            else:
+                examples = self.parse_cached(self.parse_first_principles_file, md_file)
 
-                self.examples.extend(examples)
-                self.stats['philosophy_files'] += 1
+            self.stats['philosophy_files'] += 1
+            yield from examples
 
         # Process AetherPro docs
-        aetherpro_dir = self.base_dir / "minimax-m2-aetherpro-training" / "aetherpro_docs"
-        if aetherpro_dir.exists():
-            for md_file in aetherpro_dir.rglob("*.md"):
-                print(f"Processing: {md_file.relative_to(self.base_dir)}")
-                examples = self.parse_aetherpro_docs(md_file)
-                self.examples.extend(examples)
-                self.stats['aetherpro_files'] += 1
+        for md_file in self.discovery.files('aetherpro_docs'):
+            print(f"Processing: {md_file.relative_to(self.base_dir)}")
+            examples = self.parse_cached(self.parse_aetherpro_docs, md_file)
+            self.stats['aetherpro_files'] += 1
+            yield from examples
 
+        if self.cache:
+            print(self.cache.summary())
+
+    def process_all_files(self):
+        """Process all files in the dataset"""
+        self.examples.extend(self.iter_examples())
         print(f"\nTotal examples extracted: {len(self.examples)}")
 
     def write_jsonl(self, output_path: Path, examples: List[Dict]):
         """Write examples to JSONL file"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for example in examples:
-                # Create the JSON line - NO ESCAPING HERE, json.dumps handles it
-                json_line = json.dumps(example, ensure_ascii=False)
-                f.write(json_line + '\n')
-
-    def generate_outputs(self):
-        """Generate all output files"""
+        self.outputs.write_jsonl(output_path, examples)
+
+    def generate_outputs(self, examples=None):
+        """Generate all output files
+
+        examples may be any iterable (e.g. iter_examples()); it is consumed
+        once, so streaming runs never hold the dataset in memory.
+        """
+        if examples is None:
+            examples = self.examples
+
         output_dir = self.base_dir / "minimax-m2-aetherpro-training" / "output"
         output_dir.mkdir(exist_ok=True)
 
-        # Filter by quality (keep quality_score >= 6)
-        high_quality = [ex for ex in self.examples if ex['quality_score'] >= 6]
-
-        print(f"\nHigh quality examples (score >= 6): {len(high_quality)}")
+        # Main validation file plus category-specific files
+        routes = {
+            "validation_examples.jsonl": None,
+            "philosophy_examples.jsonl": ['philosophy'],
+            "code_review_examples.jsonl": ['code_review'],
+            "failure_analysis_examples.jsonl": ['failure_analysis'],
+            "technical_examples.jsonl": ['electrical', 'first_principles', 'ai_architecture',
+                                         'coding', 'agentic_workflows'],
+        }
 
-        # Write main validation file
-        self.write_jsonl(output_dir / "validation_examples.jsonl", high_quality)
+        total_examples = 0
+        high_quality = 0
 
-        # Write category-specific files
-        philosophy_examples = [ex for ex in high_quality if ex['category'] == 'philosophy']
-        self.write_jsonl(output_dir / "philosophy_examples.jsonl", philosophy_examples)
+        # Filter by quality (keep quality_score >= 6), write and count in one pass
+        with self.outputs.open(output_dir, routes, "validation_examples.jsonl",
+                               eager=list(routes)) as sinks:
+            for ex in examples:
+                total_examples += 1
+                if ex['quality_score'] < 6:
+                    continue
+                if self.outputs.is_repeat(ex['text']):
+                    continue
 
-        code_review_examples = [ex for ex in high_quality if ex['category'] == 'code_review']
-        self.write_jsonl(output_dir / "code_review_examples.jsonl", code_review_examples)
+                high_quality += 1
+                sinks.write(ex)
 
-        failure_examples = [ex for ex in high_quality if ex['category'] == 'failure_analysis']
-        self.write_jsonl(output_dir / "failure_analysis_examples.jsonl", failure_examples)
+        print(f"\nHigh quality examples (score >= 6): {high_quality}")
 
-        technical_examples = [ex for ex in high_quality if ex['category'] in
-                             ['electrical', 'first_principles', 'ai_architecture', 'coding', 'agentic_workflows']]
-        self.write_jsonl(output_dir / "technical_examples.jsonl", technical_examples)
+        self.outputs.report()
 
         # Generate stats
         stats = {
-            "total_examples": len(self.examples),
-            "high_quality_examples": len(high_quality),
+            "total_examples": total_examples,
+            "high_quality_examples": high_quality,
             "files_processed": {
                 "first_principles": self.stats['first_principles_files'],
                 "philosophy": self.stats['philosophy_files'],
                 "aetherpro": self.stats['aetherpro_files']
             },
-            "category_distribution": {},
-            "source_distribution": {},
-            "quality_distribution": {}
+            **sinks.stats.distributions()
         }
-
-        # Calculate distributions
-        for ex in high_quality:
-            stats['category_distribution'][ex['category']] = \
-                stats['category_distribution'].get(ex['category'], 0) + 1
-            stats['source_distribution'][ex['source']] = \
-                stats['source_distribution'].get(ex['source'], 0) + 1
-            stats['quality_distribution'][str(ex['quality_score'])] = \
-                stats['quality_distribution'].get(str(ex['quality_score']), 0) + 1
+        stats.update(self.outputs.dedup_stats())
 
         # Calculate percentages for categories
-        total = len(high_quality)
-        stats['category_percentages'] = {
-            cat: f"{(count/total)*100:.1f}%"
-            for cat, count in stats['category_distribution'].items()
-        }
+        stats['category_percentages'] = sinks.stats.category_percentages()
+        stats.update(sinks.stats.length_summary())
 
         # Write stats
         with open(output_dir / "stats.json", 'w') as f:
             json.dump(stats, f, indent=2)
 
         print(f"\n=== OUTPUT SUMMARY ===")
-        print(f"Validation examples: {len(high_quality)}")
-        print(f"Philosophy examples: {len(philosophy_examples)}")
-        print(f"Code review examples: {len(code_review_examples)}")
-        print(f"Failure analysis examples: {len(failure_examples)}")
-        print(f"Technical examples: {len(technical_examples)}")
+        print(f"Validation examples: {high_quality}")
+        print(f"Philosophy examples: {sinks.counts['philosophy_examples.jsonl']}")
+        print(f"Code review examples: {sinks.counts['code_review_examples.jsonl']}")
+        print(f"Failure analysis examples: {sinks.counts['failure_analysis_examples.jsonl']}")
+        print(f"Technical examples: {sinks.counts['technical_examples.jsonl']}")
         print(f"\nCategory distribution:")
         for cat, pct in stats['category_percentages'].items():
             print(f"  {cat}: {pct}")
         print(f"\nStats saved to: {output_dir / 'stats.json'}")
 
 def main():
-    parser = DatasetParser("/home/user/Dataset-Curator")
-    print("Starting dataset parsing...")
-    parser.process_all_files()
-    parser.generate_outputs()
-    print("\n✅ Dataset parsing complete!")
+    # The engine's dataset preset runs this parser's extractors and writes its outputs
+    from extraction_engine import run_preset
+    run_preset('dataset', "Dataset parser for MiniMax-M2-AetherPro training",
+               banner="Starting dataset parsing...", footer="\n✅ Dataset parsing complete!")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Pattern Benchmark - Time every registered regex over the real source corpus
+Runs each parser's extraction (and the distribution reclassifier) with the
+pattern registry instrumented, then reports time spent per pattern.
+--verify also checks every fused FeatureScanner result against one
+search() per feature, and the linear-time rewrites (numbered-item
+segmentation, code review scanners, markdown block lookups) against the
+originals on every file, and the batch reclassifier against the
+per-example rules
+"""
+
+import io
+import json
+import time
+import argparse
+from pathlib import Path
+from contextlib import redirect_stdout
+
+import patterns
+import code_fences
+import markdown_blocks
+from parser import DatasetParser
+from enhanced_parser import EnhancedParser
+from final_parser import FinalParser
+from comprehensive_parser import ComprehensiveParser
+from maximum_extraction_parser import MaximumExtractionParser
+from optimize_distribution import analyze_example_for_reclassification, feature_flags, reclassify_batch
+
+PARSER_CLASSES = [DatasetParser, EnhancedParser, FinalParser,
+                  ComprehensiveParser, MaximumExtractionParser]
+
+# Pattern (and FeatureScanner) methods the parsers call
+TIMED_METHODS = ('search', 'match', 'findall', 'finditer', 'split', 'sub', 'scan')
+
+class TimedPattern:
+    """Wraps a compiled pattern and accumulates calls, time and bytes scanned"""
+
+    def __init__(self, name: str, compiled, verify: bool = False):
+        self.name = name
+        self.compiled = compiled
+        self.verify = verify
+        self.calls = 0
+        self.seconds = 0.0
+        self.chars = 0
+        self.mismatches = 0
+
+    def _timed(self, method: str, string: str, *args, **kwargs):
+        start = time.perf_counter()
+        result = getattr(self.compiled, method)(string, *args, **kwargs)
+        if method == 'finditer':
+            # finditer is lazy; materialize so the scan is actually timed
+            result = iter(list(result))
+        self.seconds += time.perf_counter() - start
+        self.calls += 1
+        self.chars += len(string)
+
+        if self.verify and method == 'scan' and \
+           result != self.compiled.scan_reference(string, *args, **kwargs):
+            self.mismatches += 1
+        return result
+
+    def __getattr__(self, attr):
+        if attr in TIMED_METHODS:
+            return lambda string, *args, **kwargs: self._timed(attr, string, *args, **kwargs)
+        return getattr(self.compiled, attr)
+
+def instrument(verify: bool = False) -> dict:
+    """Swap every registry entry (module attribute and PATTERNS) for a timer"""
+    timers = {}
+    for attr, value in list(vars(patterns).items()):
+        for name, compiled in patterns.PATTERNS.items():
+            if value is compiled:
+                timers[name] = TimedPattern(name, compiled, verify)
+                setattr(patterns, attr, timers[name])
+    patterns.PATTERNS.update(timers)
+    return timers
+
+def reference_numbered_segments(content: str) -> list:
+    """Original segmentation: one search on a fresh content[pos:] copy per item"""
+    segments = []
+    for match in patterns.CP_NUMBERED_ITEM.finditer(content):
+        title = match.group(2) or match.group(4)
+        pos = match.end()
+        next_match = patterns.CP_NUMBERED_ITEM_END.search(content[pos:])
+        if next_match:
+            chunk = content[pos:pos+next_match.start()]
+        else:
+            chunk = content[pos:pos+1500]
+        segments.append((title.strip().rstrip('*'), chunk))
+    return segments
+
+def block_lookup(lookup, *args):
+    """Run a markdown_blocks lookup on a freshly tokenized document"""
+    return lambda content: lookup(content, markdown_blocks.tokenize(content), *args)
+
+def rewrite_pairs(parser) -> list:
+    """(label, rewrite, reference) for each linear-time rewrite, both taking a document"""
+    return [
+        ("segmentation", parser.segment_numbered_items, reference_numbered_segments),
+        ("code reviews", code_fences.find_code_reviews, patterns.CP_CODE_REVIEW.findall),
+        ("inline code reviews", code_fences.find_inline_code_reviews,
+         patterns.MP_INLINE_CODE_REVIEW.findall),
+        ("fenced conversations", block_lookup(markdown_blocks.fence_conversations,
+                                              patterns.FENCED_CONVERSATION),
+         patterns.FENCED_CONVERSATION.findall),
+        ("loose fenced conversations", block_lookup(markdown_blocks.fence_conversations,
+                                                    patterns.FENCED_CONVERSATION_LOOSE),
+         patterns.FENCED_CONVERSATION_LOOSE.findall),
+        ("dialogue sections", block_lookup(markdown_blocks.dialogue_sections),
+         patterns.DIALOGUE_SECTION.findall),
+        ("enhanced dialogue sections", block_lookup(markdown_blocks.dialogue_sections, 6),
+         patterns.EP_DIALOGUE_SECTION.findall),
+    ]
+
+def verify_rewrites(base_dir: str) -> tuple:
+    """Compare each linear-time rewrite with its reference on every source file"""
+    parser = ComprehensiveParser(base_dir)
+    rewrites = rewrite_pairs(parser)
+
+    checked = mismatches = 0
+    for _, filepaths in parser.discover_files():
+        for filepath in filepaths:
+            content = parser.read_file(filepath)
+            for label, rewrite, reference in rewrites:
+                checked += 1
+                if rewrite(content) != reference(content):
+                    mismatches += 1
+                    print(f"❌ {label} differs: {filepath}")
+    return checked, mismatches
+
+def verify_reclassification(examples: list) -> tuple:
+    """Compare keyword fast-path features and batch reclassification with the originals"""
+    mismatches = 0
+    for example in examples:
+        reference = set(patterns.RC_FEATURES.scan_reference(example['text']))
+        if feature_flags(example['text']) != reference:
+            mismatches += 1
+            print(f"❌ reclassification features differ: {example['text'][:60]!r}")
+
+    categories = reclassify_batch(examples).categories
+    expected = [analyze_example_for_reclassification(example) for example in examples]
+    mismatches += sum(new != old for new, old in zip(categories, expected))
+    return len(examples) * 2, mismatches
+
+def run_corpus(base_dir: str) -> tuple:
+    """Run every parser and the reclassifier over base_dir, output discarded
+
+    Returns (stage times, the examples fed to the reclassifier).
+    """
+    stage_times = {}
+    reclassify_input = []
+
+    for parser_cls in PARSER_CLASSES:
+        parser = parser_cls(base_dir)
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            examples = list(parser.iter_examples())
+        stage_times[parser_cls.__name__] = time.perf_counter() - start
+        if parser_cls is ComprehensiveParser:
+            reclassify_input = examples
+
+    start = time.perf_counter()
+    for example in reclassify_input:
+        analyze_example_for_reclassification(example)
+    stage_times['reclassify'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reclassify_batch(reclassify_input)
+    stage_times['reclassify (batch)'] = time.perf_counter() - start
+
+    return stage_times, reclassify_input
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--base-dir", default="/home/user/Dataset-Curator",
+                            help="Repository root holding the source corpus")
+    arg_parser.add_argument("--json", type=Path, default=None,
+                            help="Also write results to this JSON file")
+    arg_parser.add_argument("--verify", action="store_true",
+                            help="Check fused scanner results against per-pattern search")
+    args = arg_parser.parse_args()
+
+    timers = instrument(args.verify)
+    stage_times, reclassify_input = run_corpus(args.base_dir)
+
+    rows = sorted(timers.values(), key=lambda t: t.seconds, reverse=True)
+    total = sum(t.seconds for t in rows) or 1.0
+
+    print("="*78)
+    print("PATTERN BENCHMARK")
+    print("="*78)
+    print(f"{'pattern':34} {'calls':>7} {'MB scanned':>11} {'ms':>10} {'share':>7}")
+    for t in rows:
+        if not t.calls:
+            continue
+        print(f"{t.name:34} {t.calls:7} {t.chars / 1e6:11.2f} "
+              f"{t.seconds * 1000:10.2f} {t.seconds / total * 100:6.1f}%")
+
+    unused = [t.name for t in rows if not t.calls]
+    if unused:
+        print(f"\nNot hit on this corpus: {', '.join(unused)}")
+
+    # A verification that checked nothing (e.g. --base-dir without the corpus) fails too
+    failed = []
+    def report(label: str, checked: int, mismatches: int, unit: str):
+        status = "✅" if checked and not mismatches else "❌"
+        if not checked:
+            failed.append(label)
+            print(f"{status} {label}: nothing checked (is {args.base_dir} the corpus root?)")
+            return
+        if mismatches:
+            failed.append(label)
+        print(f"{status} {label}: {mismatches} mismatches in {checked} {unit}")
+
+    if args.verify:
+        scanned = [t for t in rows if isinstance(t.compiled, patterns.FeatureScanner)]
+        print()
+        report("Scanner verification", sum(t.calls for t in scanned),
+               sum(t.mismatches for t in scanned), "scans")
+        report("Rewrite verification", *verify_rewrites(args.base_dir), "file checks")
+        report("Reclassification verification", *verify_reclassification(reclassify_input), "checks")
+
+    print("\nStage wall time (includes non-regex work):")
+    for stage, seconds in stage_times.items():
+        print(f"  {stage:30} {seconds * 1000:10.2f} ms")
+
+    if args.json:
+        results = {
+            'patterns': {t.name: {'calls': t.calls, 'chars': t.chars, 'seconds': t.seconds,
+                                  'mismatches': t.mismatches}
+                         for t in rows},
+            'stages': stage_times,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+    if failed:
+        raise SystemExit(f"\n❌ Verification failed: {', '.join(failed)}")
+
+if __name__ == "__main__":
+    main()
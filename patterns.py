@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Pattern Registry - Every regex used by the parsers, compiled once at import
+Parsers look patterns up as patterns.NAME so the benchmark can instrument them
+"""
+
+import re
+
+# name -> compiled pattern (or FeatureScanner), in registration order
+PATTERNS = {}
+
+# Flags that can be scoped to one alternative of a combined pattern
+_INLINE_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'))
+
+# Characters that cannot start an alternative as a plain literal
+_SPECIAL = set('.^$*+?{}[]()|\\')
+
+def register(name: str, pattern: str, flags: int = 0):
+    """Compile a pattern and record it under a unique registry name"""
+    if name in PATTERNS:
+        raise ValueError(f"Pattern already registered: {name}")
+    PATTERNS[name] = re.compile(pattern, flags)
+    return PATTERNS[name]
+
+def _split_alternatives(source: str) -> list:
+    """Split a regex source on | outside groups and character classes"""
+    parts = []
+    depth = 0
+    in_class = False
+    start = i = 0
+    while i < len(source):
+        ch = source[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if in_class:
+            if ch == ']':
+                in_class = False
+        elif ch == '[':
+            in_class = True
+            # A ] right after [ or [^ is a literal member of the class
+            i += 2 if source[i + 1:i + 3] == '^]' else 1
+            i += 1 if source[i:i + 1] == ']' else 0
+            continue
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == '|' and depth == 0:
+            parts.append(source[start:i])
+            start = i + 1
+        i += 1
+    parts.append(source[start:])
+    return parts
+
+def _first_char(alternative: str):
+    """Literal character every match of an alternative starts with, or None"""
+    if alternative[:1] == '\\':
+        ch = alternative[1:2]
+        if not ch or ch.isalnum():
+            return None
+        rest = alternative[2:]
+    else:
+        ch = alternative[:1]
+        if not ch or ch in _SPECIAL:
+            return None
+        rest = alternative[1:]
+    # A quantifier that allows zero repetitions makes the character optional
+    if rest[:1] in ('*', '?', '{'):
+        return None
+    return ch
+
+class FeatureScanner:
+    """Finds the first match of several registered patterns in one scan
+
+    The patterns become named alternatives of one combined regex, guarded by
+    a lookahead on the characters any of them can start with. After a hit the
+    scan resumes at the same position with the remaining features only, so
+    each result is exactly what pattern.search(text) would have matched.
+    """
+
+    def __init__(self, features: dict):
+        self.features = features
+        self._combined = {}
+
+    def _compile(self, names: tuple):
+        """Combined regex for a subset of the features"""
+        alternatives = []
+        starts = set()
+        for name in names:
+            pattern = self.features[name]
+            letters = ''.join(letter for flag, letter in _INLINE_FLAGS if pattern.flags & flag)
+            alternatives.append(f"(?P<{name}>(?{letters}:{pattern.pattern}))")
+
+            firsts = [_first_char(alt) for alt in _split_alternatives(pattern.pattern)]
+            if starts is not None and None not in firsts:
+                starts.update(firsts)
+            else:
+                starts = None
+
+        combined = '|'.join(alternatives)
+        if starts:
+            # Matched case-insensitively, so it is a superset for every feature
+            start_class = ''.join(re.escape(ch) for ch in sorted(starts))
+            combined = f"(?=(?i:[{start_class}]))(?:{combined})"
+        return re.compile(combined)
+
+    def scan(self, text: str, names: tuple = None) -> dict:
+        """Map each feature (or each of names) found in text to its first match"""
+        remaining = tuple(names or self.features)
+        found = {}
+        pos = 0
+        while remaining:
+            combined = self._combined.get(remaining)
+            if combined is None:
+                combined = self._combined[remaining] = self._compile(remaining)
+
+            match = combined.search(text, pos)
+            if match is None:
+                break
+            name = match.lastgroup
+            found[name] = match.group(name)
+            remaining = tuple(n for n in remaining if n != name)
+            pos = match.start()
+        return found
+
+    def scan_reference(self, text: str, names: tuple = None) -> dict:
+        """Same result as scan(), one pattern.search() per feature"""
+        found = {}
+        for name in names or self.features:
+            match = self.features[name].search(text)
+            if match:
+                found[name] = match.group()
+        return found
+
+def register_scanner(name: str, **features):
+    """Record a FeatureScanner over already registered patterns"""
+    if name in PATTERNS:
+        raise ValueError(f"Pattern already registered: {name}")
+    PATTERNS[name] = FeatureScanner(features)
+    return PATTERNS[name]
+
+# ---------------------------------------------------------------------------
+# Shared by several parsers
+# ---------------------------------------------------------------------------
+
+THINK_BLOCK = register('think_block', r'<think>(.*?)</think>', re.DOTALL)
+
+# Pre-formatted conversation inside a fence (closing fence on its own line)
+FENCED_CONVERSATION = register(
+    'fenced_conversation', r'```\s*\n(<\|user\|>.*?<\|end\|>)\s*\n```', re.DOTALL)
+
+# Same, but tolerates the closing fence directly after <|end|>
+FENCED_CONVERSATION_LOOSE = register(
+    'fenced_conversation_loose', r'```\s*\n(<\|user\|>.*?<\|end\|>)\s*```', re.DOTALL)
+
+# Dialogue N: sections under ### or #### headings
+DIALOGUE_SECTION = register(
+    'dialogue_section', r'####?\s+Dialogue\s+\d+:.*?\n(.*?)(?=####?\s+Dialogue|\Z)', re.DOTALL)
+
+# * **Turn N** ... **User:** "..." **AI:** "..." with straight or curly quotes
+DIALOGUE_TURN = register(
+    'dialogue_turn',
+    r'\*\s+\*\*Turn\s+\d+.*?\*\*User:\*\*\s*["\u201c]?(.*?)["\u201d]?\s*\*\*AI:\*\*\s*["\u201c]?(.*?)["\u201d]?(?=\n\s*\*\s+\*\*Turn|\n\*\*Rating|\Z)',
+    re.DOTALL)
+
+INLINE_MATH = register('inline_math', r'\$.*?\$')
+
+# ---------------------------------------------------------------------------
+# markdown_blocks.py (block tokenizer)
+# ---------------------------------------------------------------------------
+
+# "- item", "* item", "+ item", "1. item" or "1) item", up to 3 spaces indented
+MD_LIST_ITEM = register('md_list_item', r' {0,3}(?:[-*+]|\d{1,9}[.)])[ \t]+')
+# Title of a Dialogue heading, as required by DIALOGUE_SECTION
+MD_DIALOGUE_TITLE = register('md_dialogue_title', r'Dialogue\s+\d+:')
+# Mapping/Dialogue section heading text up to its title, as split by FP_SECTION_SPLIT
+MD_SECTION_TITLE = register('md_section_title', r'\*?\*?(?:Mapping|Dialogue)\s+\d+:?[ \t]+(?=\S)')
+
+# ---------------------------------------------------------------------------
+# near_dedup.py (MinHash shingling)
+# ---------------------------------------------------------------------------
+
+ND_WORD = register('nd_word', r'\w+')
+# <think> blocks, the text that is shingled
+ND_REASONING = register('nd_reasoning', r'<think>(.*?)</think>', re.DOTALL)
+
+# ---------------------------------------------------------------------------
+# parser.py (DatasetParser)
+# ---------------------------------------------------------------------------
+
+DP_EQUATION = register('dp_equation', r'\$\$.*?\$\$|\$.*?\$|\\[a-z]+\{')
+DP_CONSTRAINT_KEYWORDS = register(
+    'dp_constraint_keywords',
+    r'NEC|IEEE|Shannon|Nyquist|Ohm|Kirchhoff|Carnot|Reynolds|Bernoulli|constraint|theorem|law|principle',
+    re.IGNORECASE)
+DP_FAILURE_KEYWORDS = register(
+    'dp_failure_keywords',
+    r'failure|fail|edge case|break|violate|cascade|diverge|overflow|deadlock',
+    re.IGNORECASE)
+DP_UNFENCED_CONVERSATION = register(
+    'dp_unfenced_conversation', r'(<\|user\|>.*?<\|end\|>(?:\s*<\|user\|>.*?<\|end\|>)*)', re.DOTALL)
+DP_STRUCTURED_TURN = register(
+    'dp_structured_turn', r'\*\*Turn \d+.*?\*\*User:\*\*\s*"(.*?)".*?\*\*AI:\*\*\s*"(.*?)"', re.DOTALL)
+DP_THINKING_SENTENCE = register(
+    'dp_thinking_sentence',
+    r'((?:We should|This is|Starting from).*?(?:equation|principle|analogy).*?\.)',
+    re.DOTALL)
+DP_PRINCIPLE_TERMS = register('dp_principle_terms', r'principle|law|theorem|equation', re.IGNORECASE)
+DP_DISPLAY_MATH = register('dp_display_math', r'\$\$(.*?)\$\$')
+DP_ANALOGY = register('dp_analogy', r'(like|similar to|analogous to|maps to)\s+([^.]+)', re.IGNORECASE)
+DP_NUMBERED_STEP = register('dp_numbered_step', r'\d+\.\s+([^.]+\.)')
+DP_DOC_HEADING = register('dp_doc_heading', r'\n#{1,3}\s+')
+
+# Quality score features, found in one pass (scored over text, then thinking)
+DP_QUALITY = register_scanner(
+    'dp_quality', equation=DP_EQUATION, constraint=DP_CONSTRAINT_KEYWORDS, failure=DP_FAILURE_KEYWORDS)
+
+# ---------------------------------------------------------------------------
+# enhanced_parser.py (EnhancedParser)
+# ---------------------------------------------------------------------------
+
+EP_MAPPING_SECTION = register(
+    'ep_mapping_section',
+    r'##\s+\*?\*?Mapping\s+\d+:?\s+(.*?)\n(.*?)(?=##\s+\*?\*?Mapping\s+\d+:|##\s+\*?\*?Dialogue|$)',
+    re.DOTALL)
+EP_FENCED_BLOCK = register('ep_fenced_block', r'```\s*(.*?)\s*```', re.DOTALL)
+EP_VARIABLE_MAPPING = register(
+    'ep_variable_mapping', r'\*\*Variable Mapping.*?\*\*\s*\n(.*?)(?=\n\*\*|\n##|$)', re.DOTALL)
+EP_FAILURE_MODE = register(
+    'ep_failure_mode', r'\*\*Failure Mode\*?\*?\s*\n(.*?)(?=\n\*\*|\n##|$)', re.DOTALL)
+EP_CONSTRAINT = register(
+    'ep_constraint', r'\*\*Real.*?Constraint\*?\*?\s*\n(.*?)(?=\n\*\*|\n##|$)', re.DOTALL)
+EP_DIALOGUE_SECTION = register(
+    'ep_dialogue_section', r'###+\s+Dialogue\s+\d+:.*?\n(.*?)(?=###+ Dialogue|\Z)', re.DOTALL)
+EP_DIALOGUE_TURN = register(
+    'ep_dialogue_turn',
+    r'\*\s+\*\*Turn\s+\d+.*?\*\*User:\*\*\s*["\']?(.*?)["\']?\s*\*\*AI:\*\*\s*["\']?(.*?)["\']?(?=\n\s*\*\s+\*\*Turn|\n\*\*Rating|\Z)',
+    re.DOTALL)
+EP_THINKING_SENTENCE = register(
+    'ep_thinking_sentence',
+    r'((?:We should|This is|Starting from|Applying).*?(?:equation|principle|theorem).*?\.)',
+    re.DOTALL)
+EP_MATH = register('ep_math', r'\$\$.*?\$\$|\$.*?\$')
+EP_REFERENCE_KEYWORDS = register(
+    'ep_reference_keywords', r'NEC|IEEE|Shannon|theorem|principle|equation', re.IGNORECASE)
+
+# Quality score features of pre-formatted conversations
+EP_QUALITY = register_scanner('ep_quality', math=EP_MATH, reference=EP_REFERENCE_KEYWORDS)
+
+# ---------------------------------------------------------------------------
+# final_parser.py (FinalParser)
+# ---------------------------------------------------------------------------
+
+FP_SECTION_SPLIT = register('fp_section_split', r'\n##\s+\*?\*?(?:Mapping|Dialogue)\s+\d+:?\s+')
+FP_SECTION_HEADER = register('fp_section_header', r'\n##\s+\*?\*?(?:Mapping|Dialogue)\s+\d+:?\s+(.*?)\n')
+FP_EQUATION_FENCE = register('fp_equation_fence', r'```\s*\n(.*?)\n```', re.DOTALL)
+FP_FAILURE_MODE = register(
+    'fp_failure_mode', r'\*\*Failure Mode?\*?\*?\s*\n(.*?)(?=\n\*\*|\n##|\Z)', re.DOTALL)
+FP_CONSTRAINT = register(
+    'fp_constraint', r'\*\*(?:Real|Constraint).*?\*\*\s*\n(.*?)(?=\n\*\*|\n##|\Z)', re.DOTALL)
+FP_VARIABLE_MAPPING = register(
+    'fp_variable_mapping', r'\*\*Variable Mapping.*?\*\*\s*\n(.*?)(?=\n\*\*|\Z)', re.DOTALL)
+FP_THINKING_SENTENCE = register(
+    'fp_thinking_sentence',
+    r'((?:We should|This is|Starting from|Applying).*?(?:equation|principle).*?\.)',
+    re.DOTALL)
+FP_EQUATION_OR_CODE = register('fp_equation_or_code', r'\$\$.*?\$\$|\$.*?\$|```')
+FP_REFERENCE_KEYWORDS = register(
+    'fp_reference_keywords', r'NEC|IEEE|Shannon|Nyquist|theorem|principle|constraint', re.IGNORECASE)
+FP_FAILURE_KEYWORDS = register(
+    'fp_failure_keywords', r'failure|fail|error|fault|cascade|violate', re.IGNORECASE)
+
+# Quality score features, found in one pass
+FP_QUALITY = register_scanner(
+    'fp_quality', equation=FP_EQUATION_OR_CODE, reference=FP_REFERENCE_KEYWORDS,
+    failure=FP_FAILURE_KEYWORDS, thinking=THINK_BLOCK)
+
+# ---------------------------------------------------------------------------
+# comprehensive_parser.py (ComprehensiveParser)
+# ---------------------------------------------------------------------------
+
+CP_NUMBERED_ITEM = register(
+    'cp_numbered_item',
+    r'(?:^|\n)\s*(?:\*?\*?(\d+)\.\s*\*?\*?(.+?)\*?\*?|\*?\*?(\d+)\.\s+(.+?)\n)',
+    re.MULTILINE)
+CP_NUMBERED_ITEM_END = register('cp_numbered_item_end', r'\n\s*(?:\*?\*?\d+\.|\#\#)')
+# The same boundary with the marker captured, for finding all of them in one pass
+CP_NUMBERED_ITEM_BOUNDARY = register('cp_numbered_item_boundary', r'\n\s*(\*?\*?\d+\.|\#\#)')
+CP_PRINCIPLE_LINE = register(
+    'cp_principle_line', r'(?:principle|equation|law)[:：]?\s*(.*?)(?=\n|$)', re.IGNORECASE)
+CP_VARIABLE_MAPPING = register(
+    'cp_variable_mapping', r'[Vv]ariable mapping:?\s*(.*?)(?=\n\s*[-\*]|\n[A-Z]|\Z)', re.DOTALL)
+CP_FAILURE = register(
+    'cp_failure', r'[Ff]ailure.*?:?\s*(.*?)(?=\n\s*[-\*]|\n[A-Z]|\Z)', re.DOTALL)
+CP_CONSTRAINT = register(
+    'cp_constraint', r'(?:[Rr]eal|[Cc]onstraint).*?:?\s*(.*?)(?=\n\s*[-\*]|\n[A-Z]|\Z)', re.DOTALL)
+CP_EE_ANALOGY = register('cp_ee_analogy', r'EE analogy:?\s*(.*?)(?=\n\n|\Z)', re.DOTALL)
+CP_CODE_REVIEW = register(
+    'cp_code_review',
+    r'```python\n(.*?)```.*?(?:❌|#\s*❌).*?(?:Violates|violates):?\s*(.*?)(?:\n.*?)?```python\n(.*?)```.*?(?:✅|#\s*✅).*?(?:Respects|respects):?\s*(.*?)(?:\n|$)',
+    re.DOTALL)
+CP_THINKING_SENTENCE = register(
+    'cp_thinking_sentence',
+    r'((?:We should|This is|Starting from|Applying|model).*?(?:equation|principle|theorem).*?\.)',
+    re.DOTALL)
+CP_EQUATION = register('cp_equation', r'\$\$.*?\$\$|\$.*?\$|=.*?[A-Za-z]|→|∝|≈')
+CP_REFERENCE_KEYWORDS = register(
+    'cp_reference_keywords',
+    r'NEC|IEEE|Shannon|Nyquist|Ohm|Kirchhoff|Carnot|Reynolds|Bernoulli|theorem|principle|law|constraint',
+    re.IGNORECASE)
+CP_FAILURE_KEYWORDS = register(
+    'cp_failure_keywords', r'failure|fail|error|fault|violate|break|cascade', re.IGNORECASE)
+
+# Quality score features, found in one pass
+CP_QUALITY = register_scanner(
+    'cp_quality', equation=CP_EQUATION, reference=CP_REFERENCE_KEYWORDS,
+    failure=CP_FAILURE_KEYWORDS, thinking=THINK_BLOCK)
+
+# ---------------------------------------------------------------------------
+# maximum_extraction_parser.py (MaximumExtractionParser)
+# ---------------------------------------------------------------------------
+
+MP_CONFLICT_SECTION = register(
+    'mp_conflict_section',
+    r'(?:^|\n)\s*(\d+)\.\s+\*\*(.+?)\*\*\s*\n(.*?)(?=\n\s*\d+\.\s+\*\*|\n###|\n##|\Z)',
+    re.DOTALL | re.MULTILINE)
+MP_PRINCIPLE_1 = register(
+    'mp_principle_1', r'\*\*Principle 1\*\*:?\s*(.*?)(?=\n\s*[-\*]|\*\*Principle 2)', re.DOTALL)
+MP_PRINCIPLE_2 = register(
+    'mp_principle_2', r'\*\*Principle 2\*\*:?\s*(.*?)(?=\n\s*[-\*]|\*\*Conflict)', re.DOTALL)
+MP_CONFLICT = register(
+    'mp_conflict', r'\*\*Conflict\*\*:?\s*(.*?)(?=\n\s*[-\*]|\*\*Trade-off)', re.DOTALL)
+MP_TRADEOFF = register(
+    'mp_tradeoff', r'\*\*Trade-off.*?\*\*:?\s*(.*?)(?=\n\s*[-\*]|\*\*Real-world|$)', re.DOTALL)
+MP_REAL_WORLD_CONSTRAINT = register(
+    'mp_real_world_constraint', r'\*\*Real-world constraint\*\*:?\s*(.*?)(?=\n\n|$)', re.DOTALL)
+MP_FAILURE_SCENARIO = register(
+    'mp_failure_scenario',
+    r'(?:^|\n)\s*(\d+)\.\s+\*\*Scenario\*\*:?\s*(.*?)\n\s+\*\*Broken Principle\*\*:?\s*(.*?)\n\s+\*\*Signature\*\*:?\s*(.*?)\n\s+\*\*Diagnosis\*\*:?\s*(.*?)\n\s+\*\*(?:Physics-based fix|Fix)\*\*:?\s*(.*?)(?=\n\s*\d+\.|\n###|\n##|\Z)',
+    re.DOTALL)
+MP_INLINE_CODE_REVIEW = register(
+    'mp_inline_code_review',
+    r'```(\w+)\n#\s*(\d+\..*?)\n.*?#\s*BEFORE\n(.*?)#\s*❌.*?Violates:?\s*(.*?)(?:\n#.*?)?#\s*AFTER\n(.*?)#\s*✅.*?Respects:?\s*(.*?)\n```',
+    re.DOTALL)
+
+# ---------------------------------------------------------------------------
+# code_fences.py (code review scanners; replace CP_CODE_REVIEW and
+# MP_INLINE_CODE_REVIEW, which stay registered as the reference behavior)
+# ---------------------------------------------------------------------------
+
+# Review labels with their optional colon and the whitespace after them
+CR_VIOLATES_LABEL = register('cr_violates_label', r'(?:Violates|violates):?(\s*)')
+CR_RESPECTS_LABEL = register('cr_respects_label', r'(?:Respects|respects):?(\s*)')
+CR_STRICT_VIOLATES_LABEL = register('cr_strict_violates_label', r'Violates:?(\s*)')
+CR_STRICT_RESPECTS_LABEL = register('cr_strict_respects_label', r'Respects:?(\s*)')
+
+# ```lang fence opening straight into a "# N." title comment
+CR_NUMBERED_FENCE = register('cr_numbered_fence', r'```(\w+)\n#\s*(\d+\.)')
+CR_BEFORE_COMMENT = register('cr_before_comment', r'#\s*BEFORE\n')
+CR_AFTER_COMMENT = register('cr_after_comment', r'#\s*AFTER\n')
+CR_BAD_MARKER = register('cr_bad_marker', r'#\s*❌')
+CR_GOOD_MARKER = register('cr_good_marker', r'#\s*✅')
+
+# ---------------------------------------------------------------------------
+# optimize_distribution.py (reclassification features)
+# ---------------------------------------------------------------------------
+
+RC_EQUATION = register('rc_equation', r'\$\$.*?\$\$|\$.*?\$|=\s*[A-Za-z]|→|∝|≈|∫|∆|Σ')
+RC_CODE = register('rc_code', r'```(?:python|go|java|rust|javascript)', re.IGNORECASE)
+RC_REVIEW_MARKERS = register('rc_review_markers', r'❌.*?Violates|✅.*?Respects|BEFORE|AFTER')
+RC_PHYSICAL_LAW = register(
+    'rc_physical_law',
+    r'Ohm|Kirchhoff|Carnot|Reynolds|Bernoulli|Shannon|Nyquist|conservation of|thermodynamic|CAP theorem|Little.*Law',
+    re.IGNORECASE)
+RC_PHILOSOPHY = register(
+    'rc_philosophy',
+    r'epistemology|phenomenology|ontology|consciousness|Husserl|Popper|Gödel|intentionality|epoché',
+    re.IGNORECASE)
+RC_FAILURE_KEYWORDS = register(
+    'rc_failure_keywords', r'failure|fail|error|bug|crash|fault|debug|broke', re.IGNORECASE)
+RC_PRINCIPLE_EXPLANATION = register(
+    'rc_principle_explanation',
+    r'principle|fundamental|governing equation|first principles|physical law|theorem',
+    re.IGNORECASE)
+RC_ELECTRICAL_TERMS = register(
+    'rc_electrical_terms', r'voltage|current|circuit|NEC|AWG|ampacity|breaker|resistance', re.IGNORECASE)
+
+# Characters on which str.lower() and IGNORECASE disagree for the keyword
+# features (dotted/dotless i, long s); such texts skip the substring fast path
+RC_FOLD_SENSITIVE = register('rc_fold_sensitive', r'[\u0130\u0131\u017f]')
+
+# Every reclassification feature, found in one pass
+RC_FEATURES = register_scanner(
+    'rc_features', equation=RC_EQUATION, code=RC_CODE, review_markers=RC_REVIEW_MARKERS,
+    physical_law=RC_PHYSICAL_LAW, philosophy=RC_PHILOSOPHY, failure=RC_FAILURE_KEYWORDS,
+    principle_explanation=RC_PRINCIPLE_EXPLANATION, electrical=RC_ELECTRICAL_TERMS)
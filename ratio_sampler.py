@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Ratio Sampler - One-pass sampling of an example stream to the 60/15/15/10 target
+Each category bucket keeps a quality-weighted reservoir (A-Res: the k
+largest keys u^(1/w)), so memory is O(k) per bucket however long the
+stream is
+"""
+
+import math
+import heapq
+import random
+
+# Share of the dataset per bucket (DatasetParser.target_distribution)
+TARGET_DISTRIBUTION = {
+    'technical': 0.60,
+    'philosophy': 0.15,
+    'code_review': 0.15,
+    'failure_analysis': 0.10
+}
+
+# Categories that make up each bucket
+CATEGORY_GROUPS = {
+    'technical': ['first_principles', 'electrical'],
+    'philosophy': ['philosophy'],
+    'code_review': ['code_review'],
+    'failure_analysis': ['failure_analysis']
+}
+
+def bucket_capacities(size: int, targets: dict = TARGET_DISTRIBUTION) -> dict:
+    """Split size over the buckets by ratio (largest remainder, so the sum is exact)"""
+    total = sum(targets.values())
+    exact = {name: size * ratio / total for name, ratio in targets.items()}
+    capacities = {name: int(share) for name, share in exact.items()}
+    leftover = size - sum(capacities.values())
+    for name in sorted(exact, key=lambda n: exact[n] - capacities[n], reverse=True)[:leftover]:
+        capacities[name] += 1
+    return capacities
+
+class TargetRatioSampler:
+    """Quality-weighted reservoir sample of a stream, split to target ratios
+
+    add() each example once; sample() then returns up to size examples in
+    the target ratios. If a bucket is short of examples, every bucket is cut
+    back in proportion so the ratios still hold.
+    """
+
+    def __init__(self, size: int, targets: dict = TARGET_DISTRIBUTION,
+                 groups: dict = CATEGORY_GROUPS, seed: int = None):
+        self.capacities = bucket_capacities(size, targets)
+        self.bucket_of = {cat: name for name, cats in groups.items() for cat in cats
+                          if name in self.capacities}
+        self.reservoirs = {name: [] for name in self.capacities}   # min-heaps of (key, seq, example)
+        self.seen = {name: 0 for name in self.capacities}
+        self.unbucketed = 0
+        self.rng = random.Random(seed)
+        self._seq = 0
+
+    def weight(self, example: dict) -> float:
+        """Sampling weight: the example's quality score"""
+        return max(float(example.get('quality_score') or 0), 1.0)
+
+    def add(self, example: dict):
+        """Offer one example to its category's reservoir"""
+        name = self.bucket_of.get(example.get('category'))
+        if name is None:
+            self.unbucketed += 1
+            return
+        self.seen[name] += 1
+        capacity = self.capacities[name]
+        if not capacity:
+            return
+
+        # log(u) / w orders like u ** (1 / w) without underflowing
+        key = math.log(1.0 - self.rng.random()) / self.weight(example)
+        reservoir = self.reservoirs[name]
+        self._seq += 1
+        if len(reservoir) < capacity:
+            heapq.heappush(reservoir, (key, self._seq, example))
+        elif key > reservoir[0][0]:
+            heapq.heapreplace(reservoir, (key, self._seq, example))
+
+    def add_all(self, examples):
+        """Offer every example of an iterable"""
+        for example in examples:
+            self.add(example)
+
+    def sample(self) -> list:
+        """The sampled examples, buckets in target proportion, shuffled"""
+        # Scale down to the scarcest bucket so the ratios survive a short bucket
+        scale = min((len(self.reservoirs[name]) / capacity
+                     for name, capacity in self.capacities.items() if capacity), default=0.0)
+        sampled = []
+        for name, capacity in self.capacities.items():
+            keep = int(capacity * scale + 1e-9)
+            sampled.extend(example for _, _, example in heapq.nlargest(keep, self.reservoirs[name]))
+        self.rng.shuffle(sampled)
+        return sampled
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Shard Writer - Splits the training set into size-bounded JSONL shards
+Shards roll over at a maximum number of examples and/or bytes, and a
+manifest.json lists every shard with its example count, byte size and
+sha256, so data loaders can fetch and verify shards in parallel without
+splitting a monolithic file first
+"""
+
+import os
+import hashlib
+from pathlib import Path
+
+from jsonl_writer import DEFAULT_BUFFER_SIZE, write_json_atomic
+from compressed_io import (COMPRESSION_SUFFIXES, FRAME_INDEX_SUFFIX, open_output,
+                           write_frame_index)
+
+MANIFEST_NAME = "manifest.json"
+
+class ShardedJsonlWriter:
+    """Writes serialized JSONL lines into numbered shards plus a manifest
+
+    With interleave, lines are spooled per category and only sharded on
+    close, taking one line from each category in turn (round robin), so
+    every shard mixes categories instead of following the source order.
+
+    With compression, shards are gzip/zstd files; the byte limit still
+    applies to the uncompressed JSONL, while the manifest's sha256 covers
+    the stored file. checkpoint_bytes makes each compressed shard seekable
+    (compressed_io.iter_lines).
+    """
+
+    def __init__(self, shard_dir: Path, max_examples: int = None, max_bytes: int = None,
+                 interleave: bool = False, prefix: str = "shard",
+                 buffer_size: int = DEFAULT_BUFFER_SIZE, compression: str = None,
+                 checkpoint_bytes: int = None):
+        self.shard_dir = Path(shard_dir)
+        self.max_examples = max_examples
+        self.max_bytes = max_bytes
+        self.interleave = interleave
+        self.prefix = prefix
+        self.buffer_size = buffer_size
+        self.compression = compression
+        self.checkpoint_bytes = checkpoint_bytes
+
+        self.shards = []        # Manifest entries of the finished shards
+        self.total = 0
+        self.total_bytes = 0
+        self._handle = None
+        self._entry = None
+        self._digest = None
+        self._spools = {}       # category -> (path, handle) while interleaving
+
+        # Shards and manifest of an earlier run would mix with this one
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        for stale in self.shard_dir.glob(f"{prefix}-*.jsonl*"):
+            stale.unlink()
+        (self.shard_dir / MANIFEST_NAME).unlink(missing_ok=True)
+
+    def write_line(self, json_line: str, category: str):
+        """Add one serialized example (ending in a newline)"""
+        data = json_line.encode('utf-8')
+        if self.interleave:
+            self._spool(category).write(data)
+        else:
+            self._emit(data, category)
+
+    def _spool(self, category: str):
+        """Append handle of a category's spool file"""
+        if category not in self._spools:
+            path = self.shard_dir / f".spool-{len(self._spools)}.{os.getpid()}.tmp"
+            self._spools[category] = (path, open(path, 'w+b', buffering=self.buffer_size))
+        return self._spools[category][1]
+
+    def _emit(self, data: bytes, category: str):
+        """Write one line to the current shard, starting a new one when it is full"""
+        entry = self._entry
+        if entry and ((self.max_examples and entry['examples'] >= self.max_examples) or
+                      (self.max_bytes and entry['bytes'] + len(data) > self.max_bytes)):
+            self._finish_shard()
+            entry = None
+        if entry is None:
+            entry = self._start_shard()
+
+        self._handle.write(data)
+        entry['examples'] += 1
+        entry['bytes'] += len(data)
+        entry['categories'][category] = entry['categories'].get(category, 0) + 1
+        self.total += 1
+        self.total_bytes += len(data)
+
+    def _start_shard(self) -> dict:
+        suffix = COMPRESSION_SUFFIXES.get(self.compression, '')
+        name = f"{self.prefix}-{len(self.shards):05d}.jsonl{suffix}"
+        self._digest = hashlib.sha256()
+        self._handle = open_output(self.shard_dir / name, self.compression, self.buffer_size,
+                                   self.checkpoint_bytes, digest=self._digest)
+        self._entry = {"file": name, "examples": 0, "bytes": 0, "sha256": None, "categories": {}}
+        return self._entry
+
+    def _finish_shard(self):
+        self._handle.close()
+        self._entry['sha256'] = self._digest.hexdigest()
+        if self.compression:
+            path = self.shard_dir / self._entry['file']
+            self._entry['compressed_bytes'] = path.stat().st_size
+            if write_frame_index(path, self._handle):
+                self._entry['frame_index'] = self._entry['file'] + FRAME_INDEX_SUFFIX
+        self.shards.append(self._entry)
+        self._handle = self._entry = self._digest = None
+
+    def _drain_spools(self):
+        """Shard the spooled lines, one per category in turn"""
+        readers = []
+        for category, (path, handle) in self._spools.items():
+            handle.flush()
+            handle.seek(0)
+            readers.append((category, handle))
+        while readers:
+            remaining = []
+            for category, handle in readers:
+                data = handle.readline()
+                if data:
+                    self._emit(data, category)
+                    remaining.append((category, handle))
+            readers = remaining
+
+    def _remove_spools(self):
+        for path, handle in self._spools.values():
+            handle.close()
+            path.unlink(missing_ok=True)
+        self._spools = {}
+
+    def manifest(self) -> dict:
+        """Manifest of the finished shards"""
+        return {
+            "total_examples": self.total,
+            "total_bytes": self.total_bytes,
+            "max_examples_per_shard": self.max_examples,
+            "max_bytes_per_shard": self.max_bytes,
+            "interleaved": self.interleave,
+            "compression": self.compression,
+            "checksum": "sha256",
+            "shards": self.shards
+        }
+
+    def close(self, commit: bool = True):
+        """Finish the last shard and write the manifest
+
+        Without commit (the run failed), no manifest is written, so the
+        partial shards are never mistaken for a complete set.
+        """
+        try:
+            if commit and self.interleave:
+                self._drain_spools()
+        finally:
+            self._remove_spools()
+            if self._handle is not None:
+                self._finish_shard()
+        if commit:
+            write_json_atomic(self.shard_dir / MANIFEST_NAME, self.manifest(), indent=2)
+
+    def summary(self) -> str:
+        """One-line shard report"""
+        return (f"📦 Sharded {self.total} examples into {len(self.shards)} shards: "
+                f"{self.shard_dir / MANIFEST_NAME}")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Stage Profiler - Per-stage timers, counters and an event stream for a parser run
+Instrumented methods (file read, every extractor, categorization, scoring)
+and output sinks (serialization, each JSONL file, shards, columnar export)
+accumulate calls, seconds, bytes in/out and items out per stage, while
+per-file progress is recorded as structured events. The report is written
+as JSON next to dataset_stats.json, with an optional cProfile/pstats dump.
+Console progress is printed by a listener on the same event stream
+"""
+
+import time
+import cProfile
+import functools
+from pathlib import Path
+
+from jsonl_writer import write_json_atomic
+
+STAGE_FIELDS = ('calls', 'seconds', 'bytes_in', 'bytes_out', 'items_out')
+
+def _size(value) -> int:
+    """Bytes of a str (UTF-8) or bytes-like value, 0 for anything else"""
+    if isinstance(value, str):
+        return len(value.encode('utf-8', 'replace'))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return 0
+
+def _items(result) -> int:
+    """Examples in a result: a list, or the examples of a (counts, examples) pair"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], list):
+        return len(result[1])
+    return 0
+
+class _TimedWriter:
+    """File handle proxy that times every write as one stage"""
+
+    def __init__(self, handle, profiler, stage: str):
+        self.handle = handle
+        self.profiler = profiler
+        self.stage = stage
+
+    def write(self, data):
+        start = time.perf_counter()
+        written = self.handle.write(data)
+        self.profiler.record(self.stage, time.perf_counter() - start, bytes_in=_size(data))
+        return written
+
+    def __getattr__(self, name):
+        return getattr(self.handle, name)
+
+class EventStream:
+    """Structured progress events, passed to every listener as they happen"""
+
+    def __init__(self):
+        self.listeners = []
+        self.started = time.perf_counter()
+
+    def subscribe(self, listener):
+        """Call listener(event) for every later event"""
+        self.listeners.append(listener)
+
+    def event(self, kind: str, **fields) -> dict:
+        """Emit one event, stamped with seconds since the start"""
+        event = {"event": kind, "t": round(time.perf_counter() - self.started, 6), **fields}
+        for listener in self.listeners:
+            listener(event)
+        return event
+
+class StageProfiler(EventStream):
+    """Collects stage totals and events for one run
+
+    Stages nest (extract_file includes run_extractors, which includes each
+    extract_*), so their seconds are inclusive and don't add up to the
+    wall time. Pool workers (--workers > 1) time their stages with their
+    own profiler and send the totals back with each file (take_stages),
+    which are merged here (merge_stages).
+    """
+
+    def __init__(self, cprofile_path: Path = None):
+        super().__init__()
+        self.stages = {}        # stage -> totals (STAGE_FIELDS)
+        self.events = []
+        self._last = {}         # stage -> seconds of its latest call
+        self.path = None        # Report file, once written
+        self.cprofile_path = Path(cprofile_path) if cprofile_path else None
+        self._cprofile = cProfile.Profile() if cprofile_path else None
+        if self._cprofile:
+            self._cprofile.enable()
+
+    def record(self, stage: str, seconds: float, bytes_in: int = 0,
+               bytes_out: int = 0, items_out: int = 0):
+        """Add one call to a stage's totals"""
+        totals = self.stages.get(stage)
+        if totals is None:
+            totals = self.stages[stage] = dict.fromkeys(STAGE_FIELDS, 0)
+        totals['calls'] += 1
+        totals['seconds'] += seconds
+        totals['bytes_in'] += bytes_in
+        totals['bytes_out'] += bytes_out
+        totals['items_out'] += items_out
+        self._last[stage] = seconds
+
+    def wrap(self, func, stage: str):
+        """func, timed as stage
+
+        bytes_in is the size of the first str/bytes positional argument,
+        bytes_out the size of a str/bytes result, items_out the examples
+        returned (see _items). A call that raises is still timed.
+        """
+        record = self.record
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            result = None
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                seconds = time.perf_counter() - start
+                text = next((arg for arg in args if isinstance(arg, (str, bytes))), None)
+                record(stage, seconds, _size(text), _size(result), _items(result))
+        return timed
+
+    def instrument(self, obj, methods):
+        """Time the named methods of obj (per instance), each as its own stage"""
+        for name in methods:
+            setattr(obj, name, self.wrap(getattr(obj, name), name))
+
+    def timed_writer(self, handle, stage: str):
+        """handle with every write() timed as stage"""
+        return _TimedWriter(handle, self, stage)
+
+    def pop_last(self, stage: str) -> float:
+        """Seconds of the latest call to stage, or None if it hasn't run since the last pop"""
+        return self._last.pop(stage, None)
+
+    def take_stages(self) -> dict:
+        """Stage totals since the previous take, resetting them (for a worker's profiler)"""
+        stages, self.stages = self.stages, {}
+        self._last.clear()
+        return stages
+
+    def merge_stages(self, stages: dict):
+        """Add stage totals taken elsewhere (e.g. in a pool worker) to this run's
+
+        Each merged stage's seconds also become its latest call, so
+        pop_last reports the worker's time for the file just merged.
+        """
+        for stage, theirs in stages.items():
+            totals = self.stages.get(stage)
+            if totals is None:
+                totals = self.stages[stage] = dict.fromkeys(STAGE_FIELDS, 0)
+            for field in STAGE_FIELDS:
+                totals[field] += theirs[field]
+            self._last[stage] = theirs['seconds']
+
+    def event(self, kind: str, **fields) -> dict:
+        """Emit one event and keep it for the report"""
+        event = super().event(kind, **fields)
+        self.events.append(event)
+        return event
+
+    def report(self, **info) -> dict:
+        """Report of the run so far (info is added at the top level)"""
+        stages = {}
+        for stage, totals in sorted(self.stages.items(), key=lambda item: -item[1]['seconds']):
+            stages[stage] = dict(totals)
+            if totals['seconds'] > 0:
+                stages[stage]['mb_per_s'] = (totals['bytes_in'] or totals['bytes_out']) / 1024 ** 2 / totals['seconds']
+        return {
+            **info,
+            "wall_seconds": time.perf_counter() - self.started,
+            "stages": stages,
+            "events": self.events,
+            "cprofile": str(self.cprofile_path) if self.cprofile_path else None,
+        }
+
+    def write(self, path: Path, **info):
+        """Write the report to path (and the pstats dump, if enabled)"""
+        if self._cprofile:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+        self.path = Path(path)
+        write_json_atomic(self.path, self.report(**info), indent=2)
+
+    def summary(self, top: int = 10) -> str:
+        """Slowest stages and where the report went"""
+        wall = time.perf_counter() - self.started
+        lines = [f"⏱️  Profile ({wall:.2f}s wall): {self.path}"]
+        if self.cprofile_path:
+            lines.append(f"   cProfile stats: {self.cprofile_path}")
+        slowest = sorted(self.stages.items(), key=lambda item: -item[1]['seconds'])[:top]
+        for stage, totals in slowest:
+            lines.append(f"   {stage:40s} {totals['seconds']:8.3f}s {totals['calls']:8d} calls")
+        return "\n".join(lines)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Stream Stats - Mergeable running aggregates over a stream of examples
+Counts per category, source and quality score, text-length quantiles
+(from a log-bucketed sketch with bounded relative error) and token
+estimates are updated as each example is written. Aggregates built over
+separate files or by parallel workers merge by adding counters, so the
+merged result is the same however the data was split
+"""
+
+import math
+import json
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from json_stream import iter_json_values
+
+# Rough characters per token of the target tokenizer, for token estimates
+CHARS_PER_TOKEN = 4
+
+# Quantile estimates are within this fraction of a true text length
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Reported text-length quantiles
+QUANTILES = {"p50": 0.50, "p90": 0.90, "p99": 0.99}
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text (CHARS_PER_TOKEN characters per token)"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+class LengthSketch:
+    """Quantile sketch of non-negative values, in logarithmic buckets
+
+    Bucket i holds values in (gamma^(i-1), gamma^i], so any quantile is
+    estimated within relative_accuracy of a value actually seen, and the
+    number of buckets grows only with the log of the largest value. Two
+    sketches with the same accuracy merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}       # bucket index -> count
+        self.zeros = 0
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        if value <= 0:
+            self.zeros += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: 'LengthSketch'):
+        """Add another sketch's values to this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.sum += other.sum
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float):
+        """Estimated q-quantile (0 <= q <= 1), or None if nothing was added"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket (in relative terms), kept within the seen range
+                estimate = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """min / max / mean and the QUANTILES, rounded to whole characters"""
+        if not self.count:
+            return {"count": 0}
+        summary = {"count": self.count, "min": self.min, "max": self.max,
+                   "mean": round(self.sum / self.count, 1)}
+        for name, q in QUANTILES.items():
+            summary[name] = round(self.quantile(q))
+        return summary
+
+class StreamingStats:
+    """Running counts and sketches over the examples written to a dataset
+
+    Distributions keep categories, sources and scores in first-seen order;
+    merging appends the other aggregate's new keys, so merging the parts
+    of a dataset in order reproduces the counts of a single pass.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.total = 0
+        self.category_counts = {}
+        self.source_counts = {}
+        self.quality_counts = {}        # str(score) -> count, as JSON keys
+        self.category_tokens = {}
+        self.text_lengths = LengthSketch(relative_accuracy)
+
+    def add(self, example: dict):
+        """Count one example"""
+        category = example['category']
+        self.total += 1
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+        self.source_counts[example['source']] = self.source_counts.get(example['source'], 0) + 1
+        score = str(example['quality_score'])
+        self.quality_counts[score] = self.quality_counts.get(score, 0) + 1
+        text = example['text']
+        self.text_lengths.add(len(text))
+        self.category_tokens[category] = self.category_tokens.get(category, 0) + estimate_tokens(text)
+
+    def add_all(self, examples):
+        for example in examples:
+            self.add(example)
+        return self
+
+    def merge(self, other: 'StreamingStats'):
+        """Add another aggregate (e.g. from a worker or a later shard) to this one"""
+        self.total += other.total
+        for mine, theirs in ((self.category_counts, other.category_counts),
+                             (self.source_counts, other.source_counts),
+                             (self.quality_counts, other.quality_counts),
+                             (self.category_tokens, other.category_tokens)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+        self.text_lengths.merge(other.text_lengths)
+        return self
+
+    def distributions(self) -> dict:
+        """The category / source / quality distributions of dataset_stats.json"""
+        return {
+            "category_distribution": self.category_counts,
+            "source_distribution": self.source_counts,
+            "quality_distribution": self.quality_counts
+        }
+
+    def category_percentages(self) -> dict:
+        """Share of each category, formatted as in dataset_stats.json"""
+        return {cat: f"{(count/self.total)*100:.1f}%" for cat, count in self.category_counts.items()}
+
+    def length_summary(self) -> dict:
+        """Text-length quantiles and token estimates, for the end of the stats file"""
+        return {
+            "text_length_chars": self.text_lengths.summary(),
+            "estimated_tokens": {
+                "total": sum(self.category_tokens.values()),
+                "chars_per_token": CHARS_PER_TOKEN,
+                "by_category": self.category_tokens
+            }
+        }
+
+    def to_dict(self) -> dict:
+        stats = {"total_examples": self.total, **self.distributions()}
+        if self.total:
+            stats["category_percentages"] = self.category_percentages()
+        stats.update(self.length_summary())
+        return stats
+
+def stats_for_file(path: Path, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> StreamingStats:
+    """Aggregate of one JSONL file (plain, .gz or .zst)"""
+    return StreamingStats(relative_accuracy).add_all(iter_json_values(path))
+
+def stats_for_files(paths: list, workers: int = 1,
+                    relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> StreamingStats:
+    """Aggregate of several JSONL files, one worker process per file, merged in order"""
+    merged = StreamingStats(relative_accuracy)
+    if workers <= 1:
+        for path in paths:
+            merged.merge(stats_for_file(path, relative_accuracy))
+        return merged
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(stats_for_file, paths, [relative_accuracy] * len(paths)):
+            merged.merge(part)
+    return merged
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('paths', nargs='+', type=Path,
+                            help="JSONL files to aggregate, e.g. the shards of a sharded run")
+    arg_parser.add_argument('--workers', type=int, default=1,
+                            help="Processes aggregating files in parallel (default: 1)")
+    arg_parser.add_argument('--relative-accuracy', type=float, default=DEFAULT_RELATIVE_ACCURACY,
+                            help=f"Relative error of the text-length quantiles (default: {DEFAULT_RELATIVE_ACCURACY:g})")
+    arg_parser.add_argument('--verify', action='store_true',
+                            help="Check the merged aggregate against one serial pass and exact quantiles")
+    args = arg_parser.parse_args()
+
+    merged = stats_for_files(args.paths, args.workers, args.relative_accuracy)
+    print(json.dumps(merged.to_dict(), indent=2))
+
+    if args.verify:
+        single, lengths = StreamingStats(args.relative_accuracy), []
+        for path in args.paths:
+            for example in iter_json_values(path):
+                single.add(example)
+                lengths.append(len(example['text']))
+        lengths.sort()
+        ok = single.to_dict() == merged.to_dict()
+        print(f"\n{'✅' if ok else '❌'} Merged aggregate matches a single pass")
+        for name, q in QUANTILES.items():
+            if not lengths:
+                break
+            exact = lengths[int(q * (len(lengths) - 1))]
+            estimate = merged.text_lengths.quantile(q)
+            error = abs(estimate - exact) / exact if exact else estimate
+            ok = ok and error <= args.relative_accuracy
+            print(f"  {name}: {estimate:10.1f} (exact {exact}, error {error:.2%})")
+        if not ok:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# The parsers are flat top-level scripts, imported from the checkout
+sys.path.insert(0, str(REPO_ROOT))
+
+@pytest.fixture(scope="session")
+def corpus_dir() -> Path:
+    """Small fixed corpus: synthetic and real source files plus files every parser skips"""
+    return FIXTURES / "corpus"
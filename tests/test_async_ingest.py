@@ -0,0 +1,87 @@
+"""
+Async read-ahead: ordering, the in-flight byte budget and cache-aware prefetching
+"""
+
+import io
+import threading
+from collections import deque
+from contextlib import redirect_stdout
+
+import pytest
+
+import async_ingest
+from async_ingest import AsyncFileReader
+from comprehensive_parser import ComprehensiveParser
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(12):
+        path = tmp_path / f"file{i:02d}.md"
+        path.write_text(f"{i:02d}" * 50, encoding='utf-8')     # 100 bytes each
+        paths.append(path)
+    return paths
+
+def test_contents_arrive_in_order(files):
+    reader = AsyncFileReader(concurrency=4)
+    assert list(reader.read_all(files)) == [(path, path.read_text()) for path in files]
+
+def test_budget_covers_the_file_being_processed(files):
+    reader = AsyncFileReader(concurrency=8, max_in_flight_bytes=350)
+    for _ in reader.read_all(files):
+        pass
+    assert 100 <= reader.peak_in_flight_bytes <= 350
+
+def test_manual_release_keeps_bytes_reserved_until_released(files):
+    reader = AsyncFileReader(concurrency=8, max_in_flight_bytes=350)
+    held = deque()
+    contents = []
+    for path, content, release in reader.read_all(files, manual_release=True):
+        contents.append(content)
+        held.append(release)
+        # Two files stay in use after the consumer moves on, as in a pool
+        if len(held) > 2:
+            held.popleft()()
+    for release in held:
+        release()
+        release()   # Idempotent, and harmless once reading is over
+    assert contents == [path.read_text() for path in files]
+    assert 300 <= reader.peak_in_flight_bytes <= 350
+
+def test_oversized_file_is_admitted_alone(files):
+    reader = AsyncFileReader(concurrency=4, max_in_flight_bytes=50)
+    assert [content for _, content in reader.read_all(files)] == [path.read_text() for path in files]
+    assert reader.peak_in_flight_bytes == 100
+
+def extracted(parser) -> list:
+    with redirect_stdout(io.StringIO()):
+        groups = parser.discover_files()
+        filepaths = [f for _, files in groups for f in files]
+        # Counts come back from the cache as lists
+        return [(path, counts and [list(count) for count in counts], examples)
+                for path, counts, examples in parser.extract_files(filepaths)]
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_prefetching_skips_reads_of_cache_hits(workers, corpus_dir, tmp_path, monkeypatch):
+    expected = extracted(ComprehensiveParser(str(corpus_dir)))
+    options = dict(workers=workers, cache_dir=tmp_path / "cache", read_concurrency=4,
+                   max_in_flight_bytes=4096, manifest=str(tmp_path / "manifest.json"))
+
+    reads = []
+    lock = threading.Lock()
+    read = async_ingest.AsyncFileReader._read
+    def counting_read(self, path):
+        with lock:
+            reads.append(path)
+        return read(self, path)
+    monkeypatch.setattr(async_ingest.AsyncFileReader, "_read", counting_read)
+
+    assert extracted(ComprehensiveParser(str(corpus_dir), **options)) == expected
+    assert len(reads) == len(expected)
+
+    reads.clear()
+    parser = ComprehensiveParser(str(corpus_dir), **options)
+    assert extracted(parser) == expected
+    # Skipped files aren't cached, so only they are read again
+    assert len(reads) == sum(counts is None for _, counts, _ in expected)
+    assert parser.cache.hits == len(expected) - len(reads)
@@ -0,0 +1,47 @@
+"""
+Columnar export: typed Arrow IPC / Parquet copies read back with filters
+"""
+
+import pytest
+
+import columnar_export
+from columnar_export import COLUMNAR_FORMATS
+
+EXAMPLES = [{"text": f"example {i} " + "é" * i, "source": ["a", "b"][i % 2],
+             "category": ["philosophy", "electrical", "code_review"][i % 3],
+             "quality_score": i % 10} for i in range(45)]
+
+@pytest.mark.parametrize("columnar", sorted(COLUMNAR_FORMATS))
+def test_round_trip_and_filters(columnar, tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / f"training_dataset{COLUMNAR_FORMATS[columnar]}"
+    writer = columnar_export.ColumnarWriter(path, row_group_size=10)
+    for example in EXAMPLES:
+        writer.write(example)
+    writer.close()
+    assert writer.rows == len(EXAMPLES)
+    assert not list(tmp_path.glob("*.tmp"))
+
+    table = columnar_export.read_examples(path)
+    assert table.schema == columnar_export.example_schema()
+    assert table.to_pylist() == EXAMPLES
+
+    high = columnar_export.read_examples(path, columns=['category'],
+                                         filters=[('quality_score', '>=', 8)])
+    assert high.column_names == ['category']
+    assert high.column('category').to_pylist() == \
+        [ex["category"] for ex in EXAMPLES if ex["quality_score"] >= 8]
+
+def test_abort_leaves_no_file(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / "training_dataset.parquet"
+    writer = columnar_export.ColumnarWriter(path)
+    writer.write(EXAMPLES[0])
+    writer.close(commit=False)
+    assert list(tmp_path.iterdir()) == []
+
+def test_missing_pyarrow_is_reported(monkeypatch):
+    monkeypatch.setattr(columnar_export, 'pa', None)
+    columnar_export.require_columnar(None)
+    with pytest.raises(ImportError, match="pyarrow"):
+        columnar_export.require_columnar('parquet')
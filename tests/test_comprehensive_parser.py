@@ -0,0 +1,20 @@
+"""
+ComprehensiveParser categorization and the chat-format JSON datasets
+"""
+
+from pathlib import Path
+
+import pytest
+
+from comprehensive_parser import ComprehensiveParser
+
+@pytest.mark.parametrize("text, category", [
+    ("```python\nx = 1\n```\nThis violates DRY", 'code_review'),
+    ("```go\nfmt.Println()\n```\n❌ before the review", 'code_review'),
+    # Unreviewed code is categorized like any other text, never None
+    ("```python\nraise ValueError('error')\n```", 'failure_analysis'),
+    ("```go\nreadVoltage()\n```", 'electrical'),
+    ("```python\nx = 1\n```", 'first_principles'),
+])
+def test_determine_category(text, category):
+    assert ComprehensiveParser(".").determine_category(text, Path("notes.md")) == category
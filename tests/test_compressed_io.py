@@ -0,0 +1,56 @@
+"""
+Compressed outputs: checkpointed frames seek to a line and read like the plain file
+"""
+
+import json
+
+import pytest
+
+import compressed_io
+from compressed_io import (COMPRESSION_SUFFIXES, open_text_output, write_frame_index,
+                           frame_index_path, iter_lines, open_input)
+
+# U+2028 inside a record must not split it
+LINES = [json.dumps({"text": f"line {i}   " + "x" * (i * 7 % 50)}, ensure_ascii=False) + "\n"
+         for i in range(2000)]
+
+def write(path, compression, checkpoint_bytes=None):
+    with open_text_output(path, compression, checkpoint_bytes=checkpoint_bytes) as f:
+        f.writelines(LINES)
+    write_frame_index(path, f)
+    return path
+
+@pytest.fixture(params=sorted(COMPRESSION_SUFFIXES))
+def compression(request):
+    if request.param == 'zstd':
+        pytest.importorskip('zstandard')
+    return request.param
+
+def test_checkpointed_file_seeks_to_any_line(compression, tmp_path):
+    path = write(tmp_path / f"data.jsonl{COMPRESSION_SUFFIXES[compression]}", compression,
+                 checkpoint_bytes=512)
+    frames = json.loads(frame_index_path(path).read_text())['frames']
+    assert len(frames) > 5
+    with open_input(path) as f:
+        assert f.read() == "".join(LINES)
+    for start in (0, 1, 37, frames[3]['first_line'], frames[3]['first_line'] - 1, 1999, 2000, 5000):
+        assert list(iter_lines(path, start)) == LINES[start:], start
+
+def test_streamed_file_reads_from_a_line(compression, tmp_path):
+    path = write(tmp_path / f"data.jsonl{COMPRESSION_SUFFIXES[compression]}", compression)
+    assert not frame_index_path(path).exists()
+    assert list(iter_lines(path, 1500)) == LINES[1500:]
+
+def test_rewrite_without_checkpoints_drops_the_sidecar(tmp_path):
+    path = write(tmp_path / "data.jsonl.gz", 'gzip', checkpoint_bytes=512)
+    assert frame_index_path(path).exists()
+    write(path, 'gzip')
+    assert not frame_index_path(path).exists()
+    assert list(iter_lines(path, 10)) == LINES[10:]
+
+def test_missing_zstandard_is_reported(monkeypatch, tmp_path):
+    monkeypatch.setattr(compressed_io, 'zstandard', None)
+    with pytest.raises(ImportError, match="zstandard"):
+        compressed_io.require_compression('zstd')
+    with pytest.raises(ImportError, match="zstandard"):
+        open_text_output(tmp_path / "data.jsonl.zst", 'zstd')
@@ -0,0 +1,65 @@
+"""
+Output options shared by the parsers' generate_outputs
+"""
+
+import io
+import json
+from contextlib import redirect_stdout
+
+import pytest
+
+from dataset_outputs import DatasetOutputs
+
+EXAMPLES = [{"text": f"example {i % 7}", "source": "s", "category": "philosophy",
+             "quality_score": 7} for i in range(20)]
+
+def test_open_wires_shards_and_indexes(tmp_path):
+    outputs = DatasetOutputs(shard_examples=3, index=True)
+    with outputs.open(tmp_path, {"training_dataset.jsonl": None}, "training_dataset.jsonl") as sinks:
+        sinks.write_all(EXAMPLES)
+    assert (tmp_path / "training_dataset.jsonl.idx").exists()
+    manifest = json.loads((tmp_path / "shards" / "manifest.json").read_text())
+    assert sum(shard["examples"] for shard in manifest["shards"]) == len(EXAMPLES)
+
+def test_exact_repeats_persist_across_runs(tmp_path):
+    index = tmp_path / "fingerprints.bin"
+    outputs = DatasetOutputs(fingerprint_index=str(index))
+    assert [outputs.is_repeat(ex["text"]) for ex in EXAMPLES].count(False) == 7
+    with redirect_stdout(io.StringIO()):
+        outputs.report()
+    assert outputs.dedup_stats() == {"exact_duplicates_removed": 13}
+
+    # seen() records nothing until shipped()
+    later = DatasetOutputs(fingerprint_index=str(index))
+    assert later.seen("example 1") and not later.seen("new text")
+    assert not later.seen("new text")
+    later.shipped("new text")
+    assert later.seen("new text")
+
+def test_off_by_default():
+    outputs = DatasetOutputs()
+    assert not outputs.is_repeat("a") and not outputs.is_repeat("a")
+    assert outputs.dedup_stats() == {}
+
+def test_missing_package_fails_up_front(monkeypatch):
+    import compressed_io
+    monkeypatch.setattr(compressed_io, "zstandard", None)
+    with pytest.raises(ImportError):
+        DatasetOutputs(compression="zstd")
+
+def test_cli_options_map_onto_dataset_outputs(monkeypatch):
+    import argparse
+    import inspect
+    import compressed_io
+    from dataset_outputs import add_output_arguments, output_options
+
+    arg_parser = argparse.ArgumentParser()
+    add_output_arguments(arg_parser)
+    args = arg_parser.parse_args(['--shard-examples', '5', '--index', '--compression', 'gzip'])
+    options = output_options(arg_parser, args)
+    assert list(options) == list(inspect.signature(DatasetOutputs).parameters)
+    assert options['shard_examples'] == 5 and options['index'] and options['compression'] == 'gzip'
+
+    monkeypatch.setattr(compressed_io, "zstandard", None)
+    with pytest.raises(SystemExit):
+        output_options(arg_parser, arg_parser.parse_args(['--compression', 'zstd']))
@@ -0,0 +1,59 @@
+"""
+Extraction engine presets against the parser scripts they reproduce
+"""
+
+import io
+import sys
+import shutil
+from contextlib import redirect_stdout
+
+import pytest
+
+from extraction_engine import ExtractionEngine, FAMILIES, verify_presets
+from file_discovery import TRAINING_DIR
+
+PRESETS = ['dataset', 'enhanced', 'final', 'comprehensive', 'maximum']
+
+@pytest.fixture
+def corpus_copy(corpus_dir, tmp_path):
+    """Writable copy of the fixture corpus (outputs land inside it)"""
+    shutil.copytree(corpus_dir, tmp_path / "corpus")
+    return tmp_path / "corpus"
+
+def output_files(base_dir) -> dict:
+    output_dir = base_dir / TRAINING_DIR / "output"
+    files = {path.name: path.read_bytes() for path in output_dir.iterdir()}
+    shutil.rmtree(output_dir)
+    return files
+
+def test_presets_yield_parser_examples_in_order(corpus_dir):
+    with redirect_stdout(io.StringIO()):
+        assert verify_presets(str(corpus_dir)) == 0
+
+@pytest.mark.parametrize("preset", PRESETS)
+def test_preset_writes_the_parser_outputs(preset, corpus_copy, tmp_path):
+    with redirect_stdout(io.StringIO()):
+        parser = FAMILIES[preset](str(corpus_copy))
+        parser.generate_outputs(parser.iter_examples())
+        expected = output_files(corpus_copy)
+
+        for workers, cache_dir in ((1, None), (2, tmp_path / "cache"), (1, tmp_path / "cache")):
+            engine = ExtractionEngine(str(corpus_copy), preset=preset, workers=workers,
+                                      cache_dir=cache_dir)
+            engine.generate_outputs()
+            assert output_files(corpus_copy) == expected, (workers, cache_dir)
+    # The last run was served entirely from the cache
+    assert engine.cache_hits and not engine.cache_misses
+
+@pytest.mark.parametrize("preset", ['dataset', 'enhanced', 'final'])
+def test_script_main_runs_its_preset(preset, corpus_copy, monkeypatch):
+    import extraction_engine
+    with redirect_stdout(io.StringIO()):
+        parser = FAMILIES[preset](str(corpus_copy))
+        parser.generate_outputs(parser.iter_examples())
+        expected = output_files(corpus_copy)
+
+        monkeypatch.setattr(extraction_engine, 'DEFAULT_BASE_DIR', str(corpus_copy))
+        monkeypatch.setattr('sys.argv', ['script'])
+        sys.modules[FAMILIES[preset].__module__].main()
+    assert output_files(corpus_copy) == expected
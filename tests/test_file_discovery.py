@@ -0,0 +1,68 @@
+"""
+File discovery rules against the skip lists the parsers used to hard-code
+"""
+
+from pathlib import Path
+
+import pytest
+
+from compressed_io import FRAME_INDEX_SUFFIX, compression_of
+from file_discovery import Discovery, ENGINEERING_DIR, PHILOSOPHY_DIR, TRAINING_DIR
+
+TREE = {
+    ENGINEERING_DIR: ['Power-Systems.md', 'Weighting-Value-Table.md', 'Weighting-Value-Table.md.bak',
+                      'notes.txt', 'UPPER.MD', 'sub/Nested.md'],
+    PHILOSOPHY_DIR: ['Philosophy-Of-Mind.md', 'README.md', 'Old-README-notes.md', 'EXECUTIVE_SUMMARY.md',
+                     'QUICK_START.md', 'Corys-Dossier.md', 'Consciousness.md', 'sub/Deep.md'],
+    f"{TRAINING_DIR}/aetherpro_docs": ['top.md', 'architecture/TRIAD-Complete-Build-Spec-Cory-Method.md',
+                                       'architecture/deeper/more.md', 'philosophy/Corys-Dossier-Sovereign-AI.md',
+                                       'skip.txt'],
+    TRAINING_DIR: ['a.json', 'b.json.gz', 'c.json.zst', 'd.json.zstd', 'a.json' + FRAME_INDEX_SUFFIX,
+                   'e.jsonl', 'f.gz', 'g.json.bz2', 'nested/h.json'],
+}
+
+@pytest.fixture(scope="module")
+def base_dir(tmp_path_factory):
+    base = tmp_path_factory.mktemp("discovery")
+    for root, names in TREE.items():
+        for name in names:
+            path = base / root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(name)
+    return base
+
+def skipping(paths, names) -> list:
+    return [path for path in paths if not any(skip in path.name for skip in names)]
+
+def legacy_groups(base: Path) -> dict:
+    """The per-parser glob loops and skip lists file_discovery replaced"""
+    def is_json(path):
+        if path.name.endswith(FRAME_INDEX_SUFFIX):
+            return False
+        return Path(path.stem).suffix == '.json' if compression_of(path) else path.suffix == '.json'
+
+    phil = list((base / PHILOSOPHY_DIR).glob("*.md"))
+    return {
+        'engineering': [path for path in (base / ENGINEERING_DIR).glob("*.md")
+                        if path.name != 'Weighting-Value-Table.md'],
+        'philosophy': skipping(phil, ['README', 'EXECUTIVE']),
+        'philosophy_curated': skipping(phil, ['README', 'EXECUTIVE', 'QUICK_START']),
+        'philosophy_enhanced': skipping(phil, ['README', 'EXECUTIVE', 'QUICK_START', 'Dossier']),
+        'aetherpro_docs': list((base / TRAINING_DIR / "aetherpro_docs").rglob("*.md")),
+        'messages': list(filter(is_json, (base / TRAINING_DIR).glob("*.json*"))),
+    }
+
+def test_groups_match_the_old_skip_lists_in_walk_order(base_dir):
+    discovery = Discovery(base_dir)
+    for group, expected in legacy_groups(base_dir).items():
+        assert discovery.files(group) == expected, group
+
+def test_key_docs_in_include_order(base_dir):
+    docs = base_dir / TRAINING_DIR / "aetherpro_docs"
+    assert Discovery(base_dir).ordered('aetherpro_key_docs') == [
+        docs / 'architecture/TRIAD-Complete-Build-Spec-Cory-Method.md',
+        docs / 'philosophy/Corys-Dossier-Sovereign-AI.md']
+
+def test_missing_roots_are_empty(tmp_path):
+    discovery = Discovery(tmp_path)
+    assert all(discovery.files(group) == [] for group in discovery.groups)
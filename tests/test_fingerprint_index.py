@@ -0,0 +1,51 @@
+"""
+Fingerprint index: normalization, persistence across runs and torn appends
+"""
+
+import pytest
+
+from fingerprint_index import FingerprintIndex, INDEX_MAGIC, FINGERPRINT_BYTES
+
+def test_whitespace_variants_are_repeats():
+    index = FingerprintIndex()
+    assert index.add("a  b\n c ")
+    assert not index.add("a b c")
+    assert index.add("a b c d")
+    assert index.duplicates == 1
+
+def test_persists_across_runs(tmp_path):
+    path = tmp_path / "fingerprints.bin"
+    first = FingerprintIndex(str(path))
+    for text in ("one", "two", "three"):
+        first.add(text)
+    first.save()
+    assert path.stat().st_size == len(INDEX_MAGIC) + 3 * FINGERPRINT_BYTES
+
+    second = FingerprintIndex(str(path))
+    assert second.loaded == 3
+    assert not second.add("two") and second.add("four")
+    second.save()
+    assert FingerprintIndex(str(path)).loaded == 4
+
+def test_torn_record_is_skipped_and_truncated(tmp_path):
+    path = tmp_path / "fingerprints.bin"
+    index = FingerprintIndex(str(path))
+    index.add("one")
+    index.add("two")
+    index.save()
+    # An interrupted save left half a record behind
+    with open(path, 'ab') as f:
+        f.write(b'\xff' * (FINGERPRINT_BYTES // 2))
+
+    reloaded = FingerprintIndex(str(path))
+    assert reloaded.loaded == 2 and not reloaded.add("one")
+    reloaded.add("three")
+    reloaded.save()
+    assert path.stat().st_size == len(INDEX_MAGIC) + 3 * FINGERPRINT_BYTES
+    assert FingerprintIndex(str(path)).fingerprints == reloaded.fingerprints
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "fingerprints.bin"
+    path.write_bytes(b'not an index')
+    with pytest.raises(ValueError):
+        FingerprintIndex(str(path))
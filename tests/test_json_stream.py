@@ -0,0 +1,44 @@
+"""
+Incremental JSON reading: JSON Lines, top-level arrays and chunk boundaries
+"""
+
+import json
+
+import pytest
+
+from json_stream import iter_json_values
+
+RECORDS = [{"messages": [{"role": "user", "content": "hi " * 20}]}, [1, [2, 3]], "text",
+           3.25e10, 17, True, None, {"nested": [[], {}]}]
+
+def write(tmp_path, text: str):
+    path = tmp_path / "data.json"
+    path.write_text(text, encoding='utf-8')
+    return path
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1024 * 1024])
+def test_json_lines_across_chunk_boundaries(tmp_path, chunk_size):
+    # Every value, bare numbers included, is split by a chunk boundary somewhere
+    path = write(tmp_path, ''.join(json.dumps(record) + '\n' for record in RECORDS))
+    assert list(iter_json_values(path, chunk_size=chunk_size)) == RECORDS
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1024 * 1024])
+def test_top_level_array_streams_its_elements(tmp_path, chunk_size):
+    path = write(tmp_path, json.dumps(RECORDS, indent=1))
+    assert list(iter_json_values(path, chunk_size=chunk_size)) == RECORDS
+
+def test_nested_arrays_are_values_not_flattened(tmp_path):
+    path = write(tmp_path, '[[1, 2], [[3]], []]\n[4, 5]\n')
+    assert list(iter_json_values(path, chunk_size=3)) == [[1, 2], [[3]], [], [4, 5]]
+
+def test_unclosed_top_level_array(tmp_path):
+    path = write(tmp_path, '[{"a": 1}, {"b": 2}')
+    with pytest.raises(ValueError, match="not closed"):
+        list(iter_json_values(path))
+
+def test_malformed_value_stops_without_reading_on(tmp_path):
+    path = write(tmp_path, '{"a": 1}\n{"b": ]}\n' + '{"c": 3}\n' * 1000)
+    values = iter_json_values(path, chunk_size=4)
+    assert next(values) == {"a": 1}
+    with pytest.raises(ValueError, match="malformed JSON value at character 9"):
+        next(values)
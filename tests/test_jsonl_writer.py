@@ -0,0 +1,43 @@
+"""
+JsonlFanout: category routes and atomic commit / abort
+"""
+
+import json
+
+import pytest
+
+from jsonl_writer import JsonlFanout
+
+EXAMPLES = [{"text": f"example {i}", "source": "s", "category": ["philosophy", "electrical"][i % 2],
+             "quality_score": i % 10} for i in range(10)]
+
+ROUTES = {"training_dataset.jsonl": None, "philosophy.jsonl": {"philosophy"}}
+
+def snapshot(directory) -> dict:
+    return {path.name: path.read_bytes() for path in directory.iterdir()}
+
+def test_routes_split_by_category(tmp_path):
+    with JsonlFanout(tmp_path, ROUTES, eager=["training_dataset.jsonl"]) as sinks:
+        sinks.write_all(EXAMPLES)
+    assert sinks.counts == {"training_dataset.jsonl": 10, "philosophy.jsonl": 5}
+    lines = (tmp_path / "philosophy.jsonl").read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == EXAMPLES[::2]
+
+@pytest.mark.parametrize("options", [{}, {"index": True}, {"compression": "gzip", "checkpoint_bytes": 64}],
+                         ids=["plain", "indexed", "gzip"])
+def test_atomic_abort_leaves_previous_files(options, tmp_path):
+    with JsonlFanout(tmp_path, ROUTES, atomic=True, **options) as sinks:
+        sinks.write_all(EXAMPLES)
+    before = snapshot(tmp_path)
+    assert len(before) > 1 and not any(name.endswith(".tmp") for name in before)
+
+    with pytest.raises(RuntimeError):
+        with JsonlFanout(tmp_path, ROUTES, atomic=True, **options) as sinks:
+            sinks.write_all(EXAMPLES[:3])
+            raise RuntimeError("extraction failed")
+    assert snapshot(tmp_path) == before
+
+    with JsonlFanout(tmp_path, ROUTES, atomic=True, **options) as sinks:
+        sinks.write_all(EXAMPLES[:3])
+    assert snapshot(tmp_path) != before
+    assert not any(name.endswith(".tmp") for name in snapshot(tmp_path))
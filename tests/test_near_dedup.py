@@ -0,0 +1,55 @@
+"""
+MinHash/LSH near-duplicate filtering over <think> blocks
+"""
+
+import io
+import sys
+import random
+from contextlib import redirect_stdout
+
+from conftest import REPO_ROOT
+from near_dedup import NearDuplicateFilter, deduplicate, reasoning_text
+
+sys.path.insert(0, str(REPO_ROOT / "First-Principles-Failures-Engineering-&-Deugging" / "scripts"))
+from merge_philisophical_datasets import deduplicate_by_reasoning
+
+WORDS = [f"word{i}" for i in range(500)]
+
+def reasoning(seed: int, length: int = 120) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+def example(question: str, thinking: str) -> dict:
+    text = f"<|user|>\n{question}\n<|end|>\n<|assistant|>\n<think>\n{thinking}\n</think>\nanswer\n<|end|>"
+    return {"text": text}
+
+def test_only_think_blocks_are_shingled():
+    text = example("What is the question?", "first thought")["text"] + "<think>second</think>"
+    assert reasoning_text(text) == "\nfirst thought\n\nsecond"
+    assert reasoning_text("plain text") == "plain text"
+
+def test_same_reasoning_under_other_questions_is_a_duplicate():
+    thinking = reasoning(1)
+    examples = [example("first question", thinking), example("another question", thinking),
+                example("first question", reasoning(2))]
+    assert deduplicate(examples) == [examples[0], examples[2]]
+
+def test_near_duplicates_cluster_on_the_first_kept():
+    base = reasoning(3).split()
+    edited = " ".join(base[:-2] + ["changed", "ending"])
+    dedup = NearDuplicateFilter(threshold=0.8)
+    assert [dedup.add(f"<think>{text}</think>") for text in
+            (" ".join(base), reasoning(4), edited, reasoning(5))] == [True, True, False, True]
+    assert dedup.kept_for == {2: 0}
+    assert dedup.clusters() == {0: [2]}
+    assert dedup.similarity[2] >= 0.8
+
+def test_deduplicate_by_reasoning_reports_counts_and_returns_the_mapping():
+    thinking = reasoning(6)
+    examples = [example(f"question {i}", thinking) for i in range(3)] + [example("q", reasoning(7))]
+    output = io.StringIO()
+    with redirect_stdout(output):
+        unique, kept_for = deduplicate_by_reasoning(examples)
+    assert unique == [examples[0], examples[3]]
+    assert kept_for == {1: 0, 2: 0}
+    assert output.getvalue() == "Dropped 2 near-duplicates in 1 clusters\n"
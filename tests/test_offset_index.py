@@ -0,0 +1,57 @@
+"""
+Offset index sidecars: random access, metadata filters and staleness
+"""
+
+import os
+import json
+
+import pytest
+
+from jsonl_writer import JsonlFanout
+from offset_index import IndexedJsonl, index_path
+
+EXAMPLES = [{"text": f"example {i} " + "é" * i, "source": ["a", "b"][i % 2],
+             "category": ["philosophy", "electrical", "code_review"][i % 3],
+             "quality_score": i % 10} for i in range(40)]
+
+@pytest.fixture(params=[False, True], ids=["direct", "atomic"])
+def dataset(request, tmp_path):
+    with JsonlFanout(tmp_path, {"data.jsonl": None}, atomic=request.param, index=True) as sinks:
+        sinks.write_all(EXAMPLES)
+    return tmp_path / "data.jsonl"
+
+def test_random_access_and_filters(dataset):
+    with IndexedJsonl(dataset) as indexed:
+        assert len(indexed) == len(EXAMPLES)
+        assert [indexed[i] for i in range(len(indexed))] == EXAMPLES
+        assert indexed[-1] == EXAMPLES[-1]
+        assert indexed.raw(3) == json.dumps(EXAMPLES[3], ensure_ascii=False).encode('utf-8')
+        assert indexed.metadata(4) == ("electrical", "a", 4)
+        assert indexed.matching(category="philosophy", source="b", min_score=5) == \
+            [i for i, ex in enumerate(EXAMPLES) if ex["category"] == "philosophy"
+             and ex["source"] == "b" and ex["quality_score"] >= 5]
+        sample = indexed.sample(5, seed=1, category={"electrical", "code_review"})
+        assert len(sample) == 5 and all(EXAMPLES[i] == ex for i, ex in sample)
+        with pytest.raises(IndexError):
+            indexed[len(EXAMPLES)]
+
+def test_appended_file_is_stale(dataset):
+    with open(dataset, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(EXAMPLES[0]) + '\n')
+    with pytest.raises(ValueError, match="stale"):
+        IndexedJsonl(dataset)
+
+def test_same_size_rewrite_is_stale(dataset):
+    data = dataset.read_bytes()
+    stat = dataset.stat()
+    dataset.write_bytes(data.replace(b'example 1 ', b'example X '))
+    # A coarse timestamp could leave the rewrite on the indexed mtime
+    os.utime(dataset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert dataset.stat().st_size == stat.st_size
+    with pytest.raises(ValueError, match="modified after it was indexed"):
+        IndexedJsonl(dataset)
+
+def test_index_dropped_when_rewritten_without_one(dataset):
+    with JsonlFanout(dataset.parent, {"data.jsonl": None}) as sinks:
+        sinks.write_all(EXAMPLES[:3])
+    assert not index_path(dataset).exists()
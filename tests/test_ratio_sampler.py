@@ -0,0 +1,57 @@
+"""
+Ratio sampler: target proportions, short buckets and quality weighting
+"""
+
+from collections import Counter
+
+from ratio_sampler import TargetRatioSampler, CATEGORY_GROUPS, bucket_capacities
+
+def stream(counts: dict, score=lambda i: 5):
+    return [{"text": f"{category} {i}", "category": category, "quality_score": score(i)}
+            for category, count in counts.items() for i in range(count)]
+
+def bucket_counts(sample) -> Counter:
+    bucket_of = {cat: name for name, cats in CATEGORY_GROUPS.items() for cat in cats}
+    return Counter(bucket_of[example["category"]] for example in sample)
+
+def test_capacities_sum_exactly():
+    assert bucket_capacities(100) == {'technical': 60, 'philosophy': 15,
+                                      'code_review': 15, 'failure_analysis': 10}
+    for size in (1, 7, 33, 999):
+        assert sum(bucket_capacities(size).values()) == size
+
+def test_sample_hits_the_target_ratios():
+    sampler = TargetRatioSampler(200, seed=3)
+    sampler.add_all(stream({'first_principles': 500, 'electrical': 500, 'philosophy': 300,
+                            'code_review': 300, 'failure_analysis': 300, 'unknown': 50}))
+    sample = sampler.sample()
+    assert bucket_counts(sample) == {'technical': 120, 'philosophy': 30,
+                                     'code_review': 30, 'failure_analysis': 20}
+    assert sampler.unbucketed == 50
+    assert len({example["text"] for example in sample}) == len(sample)
+
+def test_short_bucket_scales_every_bucket():
+    sampler = TargetRatioSampler(200, seed=3)
+    # failure_analysis only has half its 20 slots' worth of examples
+    sampler.add_all(stream({'electrical': 1000, 'philosophy': 300, 'code_review': 300,
+                            'failure_analysis': 10}))
+    assert bucket_counts(sampler.sample()) == {'technical': 60, 'philosophy': 15,
+                                               'code_review': 15, 'failure_analysis': 10}
+
+def test_higher_quality_is_favoured():
+    sampler = TargetRatioSampler(100, seed=1)
+    sampler.add_all(stream({'electrical': 2000}, score=lambda i: 10 if i % 2 else 1))
+    # Only the technical bucket has examples, so scale is 0; inspect its reservoir
+    kept = [example for _, _, example in sampler.reservoirs['technical']]
+    assert len(kept) == 60
+    assert sum(example["quality_score"] == 10 for example in kept) > 45
+
+def test_same_seed_same_sample():
+    examples = stream({'electrical': 300, 'philosophy': 100, 'code_review': 100,
+                       'failure_analysis': 100})
+    samples = []
+    for _ in range(2):
+        sampler = TargetRatioSampler(50, seed=7)
+        sampler.add_all(examples)
+        samples.append(sampler.sample())
+    assert samples[0] == samples[1]
@@ -0,0 +1,211 @@
+"""
+Equivalence of the optimized extractors with the original implementations
+
+The originals are kept here verbatim (inline regexes and all), and the
+golden digests in fixtures/baseline_outputs.json were produced by the
+parsers as they were before any optimization, on fixtures/corpus.
+"""
+
+import io
+import re
+import json
+import hashlib
+import random
+from contextlib import redirect_stdout
+
+import pytest
+
+import patterns
+import optimize_distribution
+from conftest import FIXTURES
+from pattern_benchmark import rewrite_pairs
+from parser import DatasetParser
+from enhanced_parser import EnhancedParser
+from final_parser import FinalParser
+from comprehensive_parser import ComprehensiveParser
+from maximum_extraction_parser import MaximumExtractionParser
+
+PARSER_CLASSES = [DatasetParser, EnhancedParser, FinalParser,
+                  ComprehensiveParser, MaximumExtractionParser]
+
+# Hand-written edge cases: list boundaries, unterminated constructs and the
+# characters on which str.lower() and IGNORECASE disagree
+EDGE_CASES = [
+    "",
+    "1. **Only item** with no boundary after it" + " filler" * 400,
+    "1. **First**\nbody\n2. **Second**\n  \n\t3. Third plain\n## Heading\n4.",
+    "**1. Bold number**\n\n\n   **2. Next**\ntext\n\n## Done",
+    "1.\n2.\n3.\n",
+    "intro\n 10. **Ten** 11. not a boundary\n 12. **Twelve**\n",
+    "```python\nx = 1\n```\n❌ Violates: Ohm's Law\n```python\nx = 2\n```\n✅ Respects: Ohm's Law\n",
+    "```go\n# 1. Title\n# BEFORE\nbad()\n# ❌ Violates: KISS\n# AFTER\ngood()\n# ✅ Respects: KISS\n```",
+    "```\n<|user|>\nhi\n<|end|>\n```\n```\n<|user|>\nunterminated\n```",
+    "### Dialogue 1: A\nbody\n#### Dialogue 2: B\nmore\n###### Dialogue 3: C\nend",
+    "FAİLURE in the cİrcuİt: voltage ∝ current, ſhannon limit, K Kelvin",
+    "PHENOMENOLOGY and Gödel; epoché $x$ = y → Σ",
+    "$$ unterminated math = a and a fault",
+    "BEFORE ✅ AFTER ❌ Violates Respects little's law",
+]
+
+def original_numbered_segments(content: str) -> list:
+    """(title, chunk) per item, as the original extract_numbered_principles cut them"""
+    pattern = r'(?:^|\n)\s*(?:\*?\*?(\d+)\.\s*\*?\*?(.+?)\*?\*?|\*?\*?(\d+)\.\s+(.+?)\n)'
+    segments = []
+    for match in re.finditer(pattern, content, re.MULTILINE):
+        title = match.group(2) or match.group(4)
+        pos = match.end()
+        next_match = re.search(r'\n\s*(?:\*?\*?\d+\.|\#\#)', content[pos:])
+        if next_match:
+            chunk = content[pos:pos+next_match.start()]
+        else:
+            chunk = content[pos:pos+1500]  # Limit size
+        segments.append((title.strip().rstrip('*'), chunk))
+    return segments
+
+def original_reclassification(example):
+    """analyze_example_for_reclassification as first written (one re.search per feature)"""
+    text = example['text']
+    current_category = example['category']
+
+    has_equation = bool(re.search(r'\$\$.*?\$\$|\$.*?\$|=\s*[A-Za-z]|→|∝|≈|∫|∆|Σ', text))
+    has_code = bool(re.search(r'```(?:python|go|java|rust|javascript)', text, re.IGNORECASE))
+    has_review_markers = bool(re.search(r'❌.*?Violates|✅.*?Respects|BEFORE|AFTER', text))
+    has_physical_law = bool(re.search(
+        r'Ohm|Kirchhoff|Carnot|Reynolds|Bernoulli|Shannon|Nyquist|conservation of|thermodynamic|CAP theorem|Little.*Law',
+        text, re.IGNORECASE
+    ))
+    has_philosophy = bool(re.search(
+        r'epistemology|phenomenology|ontology|consciousness|Husserl|Popper|Gödel|intentionality|epoché',
+        text, re.IGNORECASE
+    ))
+    has_failure_keywords = bool(re.search(
+        r'failure|fail|error|bug|crash|fault|debug|broke',
+        text, re.IGNORECASE
+    ))
+    has_principle_explanation = bool(re.search(
+        r'principle|fundamental|governing equation|first principles|physical law|theorem',
+        text, re.IGNORECASE
+    ))
+
+    if has_philosophy:
+        return 'philosophy'
+    if has_code and has_review_markers:
+        return 'code_review'
+    if (has_equation or has_physical_law) and has_principle_explanation:
+        return 'first_principles'
+    if re.search(r'voltage|current|circuit|NEC|AWG|ampacity|breaker|resistance', text, re.IGNORECASE):
+        if has_physical_law or has_equation:
+            return 'electrical'
+    if has_failure_keywords and not (has_equation and has_principle_explanation):
+        return 'failure_analysis'
+    return current_category
+
+def digest(items) -> str:
+    """sha256 of items serialized one JSON line each, as the JSONL outputs are"""
+    h = hashlib.sha256()
+    for item in items:
+        h.update(json.dumps(item, ensure_ascii=False).encode('utf-8') + b'\n')
+    return h.hexdigest()
+
+def parse(parser_cls, corpus_dir) -> list:
+    parser = parser_cls(str(corpus_dir))
+    with redirect_stdout(io.StringIO()):
+        parser.process_all_files()
+    return parser.examples
+
+@pytest.fixture(scope="module")
+def baseline():
+    with open(FIXTURES / "baseline_outputs.json", encoding='utf-8') as f:
+        return json.load(f)
+
+@pytest.fixture(scope="module")
+def documents(corpus_dir) -> list:
+    """Every fixture file (skipped ones too) plus the edge cases"""
+    files = sorted(corpus_dir.rglob("*.md"))
+    return [path.read_text(encoding='utf-8') for path in files] + EDGE_CASES
+
+@pytest.fixture(scope="module")
+def examples(corpus_dir) -> list:
+    """ComprehensiveParser examples of the fixture corpus"""
+    return parse(ComprehensiveParser, corpus_dir)
+
+def shuffled_texts(documents: list, count: int = 300) -> list:
+    """Fragments of the documents spliced together, to reach odd feature combinations"""
+    rng = random.Random(0)
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            doc = rng.choice(documents)
+            start = rng.randrange(len(doc) + 1)
+            parts.append(doc[start:start + rng.randint(0, 400)])
+        texts.append(''.join(parts))
+    return texts
+
+@pytest.mark.parametrize("parser_cls", PARSER_CLASSES, ids=lambda cls: cls.__name__)
+def test_parser_examples_match_baseline(parser_cls, corpus_dir, baseline):
+    examples = parse(parser_cls, corpus_dir)
+    expected = baseline[parser_cls.__name__]
+    assert len(examples) == expected['examples']
+    assert digest(examples) == expected['sha256']
+
+def test_segment_numbered_items_matches_original(documents):
+    parser = ComprehensiveParser(".")
+    for document in documents:
+        assert parser.segment_numbered_items(document) == original_numbered_segments(document)
+
+def test_feature_scanners_match_per_pattern_search(documents, examples):
+    scanners = {name: scanner for name, scanner in patterns.PATTERNS.items()
+                if isinstance(scanner, patterns.FeatureScanner)}
+    assert scanners
+    texts = documents + [ex['text'] for ex in examples] + shuffled_texts(documents)
+    for name, scanner in scanners.items():
+        for text in texts:
+            assert scanner.scan(text) == scanner.scan_reference(text), (name, text[:80])
+            # Subsets (as the DatasetParser rescan of thinking uses) too
+            subset = tuple(scanner.features)[1:]
+            assert scanner.scan(text, subset) == scanner.scan_reference(text, subset), (name, text[:80])
+
+@pytest.mark.parametrize("label", [label for label, _, _ in rewrite_pairs(ComprehensiveParser("."))])
+def test_linear_rewrites_match_regex(label, documents):
+    _, rewrite, reference = next(pair for pair in rewrite_pairs(ComprehensiveParser("."))
+                                 if pair[0] == label)
+    for document in documents:
+        assert rewrite(document) == reference(document), document[:80]
+
+def test_feature_flags_match_original_searches(documents, examples):
+    for text in documents + [ex['text'] for ex in examples] + shuffled_texts(documents):
+        expected = set(patterns.RC_FEATURES.scan_reference(text))
+        assert optimize_distribution.feature_flags(text) == expected, text[:80]
+
+def reclassification_inputs(documents, examples) -> list:
+    categories = ['first_principles', 'philosophy', 'code_review', 'failure_analysis', 'electrical']
+    extra = [{"text": text, "category": categories[i % len(categories)]}
+             for i, text in enumerate(EDGE_CASES + shuffled_texts(documents))]
+    return examples + extra
+
+def test_reclassify_batch_matches_original_numpy(documents, examples):
+    pytest.importorskip("numpy")
+    inputs = reclassification_inputs(documents, examples)
+    result = optimize_distribution.reclassify_batch(inputs)
+    expected = [original_reclassification(ex) for ex in inputs]
+    assert result.categories == expected
+    assert result.reclassified_count == sum(new != ex['category'] for new, ex in zip(expected, inputs))
+
+def test_reclassify_batch_matches_original_without_numpy(documents, examples, monkeypatch):
+    monkeypatch.setattr(optimize_distribution, "np", None)
+    inputs = reclassification_inputs(documents, examples)
+    result = optimize_distribution.reclassify_batch(inputs)
+    assert result.categories == [original_reclassification(ex) for ex in inputs]
+
+def test_reclassification_matches_baseline(examples, baseline):
+    categories = [optimize_distribution.analyze_example_for_reclassification(ex) for ex in examples]
+    assert digest(categories) == baseline['reclassification']['sha256']
+
+def test_reclassify_stream_matches_batch(documents, examples):
+    inputs = reclassification_inputs(documents, examples)
+    expected = optimize_distribution.reclassify_batch(inputs)
+    result = optimize_distribution.reclassify_stream(iter(inputs), chunk_size=7)
+    assert result == expected
+    assert list(result.original_distribution) == list(expected.original_distribution)
+    assert list(result.new_distribution) == list(expected.new_distribution)
@@ -0,0 +1,62 @@
+"""
+Sharded outputs: rollover limits, manifest checksums and stale shards
+"""
+
+import json
+import hashlib
+
+from shard_writer import ShardedJsonlWriter, MANIFEST_NAME
+from compressed_io import iter_lines
+
+LINES = [(json.dumps({"text": f"example {i}" + "x" * (i % 5)}) + "\n",
+          ["philosophy", "electrical", "code_review"][i % 3]) for i in range(25)]
+
+def write(shard_dir, lines=LINES, **options):
+    writer = ShardedJsonlWriter(shard_dir, **options)
+    for line, category in lines:
+        writer.write_line(line, category)
+    writer.close()
+    return json.loads((shard_dir / MANIFEST_NAME).read_text())
+
+def shard_lines(shard_dir, manifest) -> list:
+    return [line for shard in manifest["shards"] for line in iter_lines(shard_dir / shard["file"])]
+
+def test_rollover_and_checksums(tmp_path):
+    manifest = write(tmp_path, max_examples=4, max_bytes=60)
+    assert shard_lines(tmp_path, manifest) == [line for line, _ in LINES]
+    assert manifest["total_examples"] == len(LINES)
+    for shard in manifest["shards"]:
+        data = (tmp_path / shard["file"]).read_bytes()
+        assert 0 < shard["examples"] <= 4 and shard["bytes"] == len(data) <= 60
+        assert shard["sha256"] == hashlib.sha256(data).hexdigest()
+        assert sum(shard["categories"].values()) == shard["examples"]
+
+def test_compressed_shards_checksum_the_stored_file(tmp_path):
+    manifest = write(tmp_path, max_examples=10, compression='gzip', checkpoint_bytes=100)
+    assert [shard["examples"] for shard in manifest["shards"]] == [10, 10, 5]
+    assert shard_lines(tmp_path, manifest) == [line for line, _ in LINES]
+    for shard in manifest["shards"]:
+        stored = (tmp_path / shard["file"]).read_bytes()
+        assert shard["sha256"] == hashlib.sha256(stored).hexdigest()
+        assert shard["compressed_bytes"] == len(stored)
+        assert (tmp_path / shard["frame_index"]).exists()
+
+def test_interleave_mixes_categories(tmp_path):
+    manifest = write(tmp_path, max_examples=3, interleave=True)
+    assert all(len(shard["categories"]) == 3 for shard in manifest["shards"][:-1])
+    assert sorted(shard_lines(tmp_path, manifest)) == sorted(line for line, _ in LINES)
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_rerun_removes_stale_shards(tmp_path):
+    write(tmp_path, max_examples=2)
+    assert len(list(tmp_path.glob("shard-*.jsonl"))) == 13
+    manifest = write(tmp_path, lines=LINES[:5], max_examples=2)
+    assert sorted(path.name for path in tmp_path.glob("shard-*")) == \
+        [shard["file"] for shard in manifest["shards"]]
+
+def test_failed_run_writes_no_manifest(tmp_path):
+    write(tmp_path, max_examples=10)
+    writer = ShardedJsonlWriter(tmp_path, max_examples=10)
+    writer.write_line(*LINES[0])
+    writer.close(commit=False)
+    assert not (tmp_path / MANIFEST_NAME).exists()
@@ -0,0 +1,61 @@
+"""
+Streaming stats: merged parts equal one pass, and quantiles stay within the sketch's accuracy
+"""
+
+import json
+import random
+
+import pytest
+
+from stream_stats import LengthSketch, StreamingStats, stats_for_files, QUANTILES
+
+def make_examples(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [{"text": "x" * int(rng.lognormvariate(6, 1.2)),
+             "source": rng.choice(["a", "b", "c"]),
+             "category": rng.choice(["philosophy", "electrical", "code_review"]),
+             "quality_score": rng.randint(1, 10)} for _ in range(count)]
+
+EXAMPLES = make_examples(3000)
+
+def test_merged_parts_equal_a_single_pass():
+    single = StreamingStats().add_all(EXAMPLES)
+    for cuts in ((1000, 2000), (1, 2999), (0, 1500), (3000, 3000)):
+        bounds = (0, *cuts, len(EXAMPLES))
+        merged = StreamingStats()
+        for start, end in zip(bounds, bounds[1:]):
+            merged.merge(StreamingStats().add_all(EXAMPLES[start:end]))
+        assert merged.to_dict() == single.to_dict(), cuts
+        assert json.dumps(merged.to_dict()) == json.dumps(single.to_dict())
+
+def test_quantiles_within_relative_accuracy():
+    sketch = LengthSketch(0.01)
+    lengths = sorted(len(example["text"]) for example in EXAMPLES)
+    for length in lengths:
+        sketch.add(length)
+    for q in (*QUANTILES.values(), 0.0, 1.0):
+        exact = lengths[int(q * (len(lengths) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact, q
+
+def test_sketches_of_different_accuracy_do_not_merge():
+    with pytest.raises(ValueError):
+        LengthSketch(0.01).merge(LengthSketch(0.02))
+
+def test_empty_stats():
+    stats = StreamingStats()
+    assert stats.to_dict()["text_length_chars"] == {"count": 0}
+    assert stats.merge(StreamingStats()).total == 0
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_files_aggregate_in_order(workers, tmp_path):
+    paths = []
+    for part in range(3):
+        path = tmp_path / f"shard-{part}.jsonl"
+        with open(path, 'w', encoding='utf-8') as f:
+            for example in EXAMPLES[part::3]:
+                f.write(json.dumps(example) + "\n")
+        paths.append(path)
+    expected = StreamingStats()
+    for part in range(3):
+        expected.add_all(EXAMPLES[part::3])
+    assert stats_for_files(paths, workers=workers).to_dict() == expected.to_dict()